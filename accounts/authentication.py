@@ -0,0 +1,66 @@
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from config.db_routers import pin_primary_if_sticky
+
+
+# settings.CACHES 의 관리자 인증 정보 캐시 별칭
+PRINCIPAL_CACHE_ALIAS = 'principals'
+
+def make_principal_cache_key(admin_id) :
+    return f'admin-principal:{admin_id}'
+
+# 관리자 비활성화/삭제/권한 변경 시 호출 (캐시 오류는 TTL 만료로 정리되므로 무시)
+def invalidate_principal(admin_id) :
+    try :
+        caches[PRINCIPAL_CACHE_ALIAS].delete(make_principal_cache_key(admin_id))
+    except Exception as e :
+        print(f'🛑 오류: 관리자 인증 캐시 삭제 실패: {e}')
+
+# JWT 인증 + 관리자 조회 결과 캐시 (대시보드 동시 요청마다 admin 테이블을 조회하지 않도록)
+class CachedJWTAuthentication(JWTAuthentication) :
+    def authenticate(self, request) :
+        result = super().authenticate(request)
+        # 최근 쓰기를 한 관리자의 읽기는 복제 지연 없이 주 DB 에서
+        if result is not None :
+            pin_primary_if_sticky(result[0].pk)
+        return result
+
+    def get_user(self, validated_token) :
+        try :
+            admin_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e :
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        cache = caches[PRINCIPAL_CACHE_ALIAS]
+        cache_key = make_principal_cache_key(admin_id)
+        try :
+            admin = cache.get(cache_key)
+        except Exception as e :
+            print(f'🛑 오류: 관리자 인증 캐시 조회 실패: {e}')
+            admin = None
+
+        if admin is None :
+            # DB 조회 및 활성 여부 / 비밀번호 변경 확인
+            admin = super().get_user(validated_token)
+            # 권한 목록도 함께 캐시 (PermissionsMixin 의 _perm_cache 등에 저장됨)
+            admin.get_all_permissions()
+            try :
+                cache.set(cache_key, admin)
+            except Exception as e :
+                print(f'🛑 오류: 관리자 인증 캐시 저장 실패: {e}')
+            return admin
+
+        # 캐시된 관리자도 토큰 단위 검사는 매번 수행
+        if api_settings.CHECK_USER_IS_ACTIVE and not admin.is_active :
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN :
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(admin.password) :
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return admin
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from accounts.token_blacklist import prune_expired_tokens, PRUNE_BATCH_SIZE
+
+
+class Command(BaseCommand) :
+    help = '만료된 Outstanding/Blacklisted 토큰을 배치 단위로 삭제'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=PRUNE_BATCH_SIZE,
+            help=f'한 트랜잭션에서 삭제할 토큰 수 (기본: {PRUNE_BATCH_SIZE})'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size <= 0 :
+            self.stdout.write(self.style.ERROR('--batch-size 는 1 이상이어야 합니다.'))
+            return
+
+        def print_progress(batch_count, deleted_count) :
+            self.stdout.write(f'{batch_count}번째 배치 삭제, 누적 {deleted_count}건')
+
+        result = prune_expired_tokens(batch_size, on_progress=print_progress)
+        self.stdout.write(self.style.SUCCESS(
+            f"만료 토큰 정리 완료: {result['deleted_count']}건 ({result['batch_count']}개 배치)"
+        ))
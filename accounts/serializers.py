@@ -1,8 +1,14 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
 from accounts.models import Admin
+from accounts.token_blacklist import FilteredRefreshToken
 
 class AdminSerializers(serializers.ModelSerializer) :
     class Meta:
         model = Admin
         fields = ['id', 'name', 'email', 'is_superuser', 'is_staff']
-        read_only_fields = ['id', 'name', 'email', 'is_superuser', 'is_staff']
\ No newline at end of file
+        read_only_fields = ['id', 'name', 'email', 'is_superuser', 'is_staff']
+
+# 토큰 갱신 시 블랙리스트 확인을 워커별 필터로 (대부분 DB 조회 없음)
+class FilteredTokenRefreshSerializer(TokenRefreshSerializer) :
+    token_class = FilteredRefreshToken
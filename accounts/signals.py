@@ -0,0 +1,25 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from accounts.models import Admin
+from accounts.authentication import invalidate_principal
+
+
+# 관리자 정보 변경(비활성화/삭제 포함) 시 인증 캐시 삭제
+@receiver(post_save, sender=Admin)
+@receiver(post_delete, sender=Admin)
+def invalidate_admin_principal(sender, instance, **kwargs) :
+    invalidate_principal(instance.pk)
+
+# 관리자 그룹/권한 변경 시 인증 캐시 삭제
+@receiver(m2m_changed, sender=Admin.groups.through)
+@receiver(m2m_changed, sender=Admin.user_permissions.through)
+def invalidate_admin_permissions(sender, instance, action, reverse, pk_set, **kwargs) :
+    if not action.startswith('post_') :
+        return
+
+    if not reverse :
+        invalidate_principal(instance.pk)
+    else :
+        # 그룹/권한 쪽에서 변경한 경우 영향받는 관리자 모두 삭제
+        for admin_id in pk_set or () :
+            invalidate_principal(admin_id)
@@ -1,3 +1,76 @@
-from django.test import TestCase
+import uuid
+from django.test import SimpleTestCase
+from accounts.token_blacklist import BloomFilter
+from accounts.throttle import LoginThrottle, LocalMemoryStore
 
-# Create your tests here.
+
+class BloomFilterTests(SimpleTestCase) :
+    def test_added_values_are_found(self) :
+        bloom = BloomFilter(100)
+        values = [uuid.uuid4().hex for _ in range(100)]
+        for value in values :
+            bloom.add(value)
+
+        self.assertTrue(all(value in bloom for value in values))
+        self.assertEqual(bloom.count, 100)
+
+    def test_false_positive_rate(self) :
+        bloom = BloomFilter(1000, false_positive_rate=0.01)
+        for _ in range(1000) :
+            bloom.add(uuid.uuid4().hex)
+
+        false_positives = sum(uuid.uuid4().hex in bloom for _ in range(5000))
+        self.assertLess(false_positives / 5000, 0.05)
+
+    def test_empty_filter(self) :
+        bloom = BloomFilter(0)
+        self.assertNotIn('jti', bloom)
+
+
+class LoginThrottleTests(SimpleTestCase) :
+    def make_throttle(self, ip_capacity=10, name_capacity=2, threshold=3) :
+        # 테스트 중에는 토큰이 회복되지 않도록 회복 속도를 매우 느리게 설정
+        return LoginThrottle(
+            store=LocalMemoryStore(),
+            rates={
+                'ip': {'capacity': ip_capacity, 'refill_rate': 1 / 3600},
+                'name': {'capacity': name_capacity, 'refill_rate': 1 / 3600},
+            },
+            backoff={'threshold': threshold, 'base_seconds': 60, 'max_seconds': 300},
+        )
+
+    def test_limits_attempts_per_name(self) :
+        throttle = self.make_throttle()
+
+        self.assertEqual(throttle.allow('10.0.0.1', 'admin'), (True, 0))
+        self.assertEqual(throttle.allow('10.0.0.2', 'Admin'), (True, 0))
+        allowed, retry_after = throttle.allow('10.0.0.3', 'ADMIN')
+        self.assertFalse(allowed)
+        self.assertGreater(retry_after, 0)
+        self.assertTrue(throttle.allow('10.0.0.3', 'other')[0])
+
+    def test_limits_attempts_per_ip(self) :
+        throttle = self.make_throttle(ip_capacity=2, name_capacity=10)
+
+        self.assertTrue(throttle.allow('10.0.0.1', 'a')[0])
+        self.assertTrue(throttle.allow('10.0.0.1', 'b')[0])
+        self.assertFalse(throttle.allow('10.0.0.1', 'c')[0])
+        self.assertTrue(throttle.allow('10.0.0.2', 'c')[0])
+
+    def test_blocks_after_repeated_failures(self) :
+        throttle = self.make_throttle(name_capacity=10, threshold=1)
+
+        throttle.record_failure('10.0.0.1', 'admin')
+        self.assertTrue(throttle.allow('10.0.0.1', 'admin')[0])
+        throttle.record_failure('10.0.0.1', 'admin')
+        allowed, retry_after = throttle.allow('10.0.0.2', 'admin')
+        self.assertFalse(allowed)
+        self.assertGreaterEqual(retry_after, 60)
+
+    def test_success_resets_name_state(self) :
+        throttle = self.make_throttle(threshold=0)
+
+        throttle.record_failure('10.0.0.1', 'admin')
+        self.assertFalse(throttle.allow('10.0.0.2', 'admin')[0])
+        throttle.record_success('10.0.0.1', 'admin')
+        self.assertTrue(throttle.allow('10.0.0.1', 'admin')[0])
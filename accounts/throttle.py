@@ -0,0 +1,162 @@
+import time
+import threading
+from django.conf import settings
+from django.core.cache import caches
+
+
+# 토큰 버킷 (capacity 만큼 연속 시도 가능, 초당 refill_rate 개씩 회복)
+LOGIN_THROTTLE_RATES = getattr(settings, 'LOGIN_THROTTLE_RATES', {
+    'ip': {'capacity': 10, 'refill_rate': 10 / 60},
+    'name': {'capacity': 5, 'refill_rate': 5 / 300},
+})
+# 연속 실패 횟수가 threshold 를 넘으면 base_seconds * 2^(초과 횟수) 만큼 차단 (최대 max_seconds)
+LOGIN_THROTTLE_BACKOFF = getattr(settings, 'LOGIN_THROTTLE_BACKOFF', {
+    'threshold': 3,
+    'base_seconds': 1,
+    'max_seconds': 300,
+})
+# 'local' 또는 settings.CACHES 별칭 (redis 등 공유 백엔드면 모든 워커가 같은 버킷 사용)
+LOGIN_THROTTLE_STORE = getattr(settings, 'LOGIN_THROTTLE_STORE', 'local')
+# nginx 가 설정한 X-Real-IP 사용 여부
+LOGIN_THROTTLE_TRUST_PROXY = getattr(settings, 'LOGIN_THROTTLE_TRUST_PROXY', True)
+
+
+# 워커(프로세스) 메모리 저장소
+class LocalMemoryStore :
+    max_entries = 10000
+
+    def __init__(self) :
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key) :
+        entry = self._data.get(key)
+        if entry is None :
+            return None
+        state, expires_at = entry
+        if expires_at < time.time() :
+            self._data.pop(key, None)
+            return None
+        return dict(state)
+
+    def set(self, key, state, timeout) :
+        with self._lock :
+            # 오래된 항목 정리 (공격 IP 가 많아도 메모리가 무한히 늘지 않도록)
+            if len(self._data) >= self.max_entries :
+                now = time.time()
+                for expired_key in [k for k, (_, expires_at) in self._data.items() if expires_at < now] :
+                    del self._data[expired_key]
+                if len(self._data) >= self.max_entries :
+                    self._data.pop(next(iter(self._data)))
+            self._data[key] = (dict(state), time.time() + timeout)
+
+    def delete(self, key) :
+        self._data.pop(key, None)
+
+# Django 캐시 저장소 (공유 백엔드)
+class CacheStore :
+    def __init__(self, alias) :
+        self.cache = caches[alias]
+
+    def get(self, key) :
+        return self.cache.get(key)
+
+    def set(self, key, state, timeout) :
+        self.cache.set(key, state, timeout)
+
+    def delete(self, key) :
+        self.cache.delete(key)
+
+def get_store(name=LOGIN_THROTTLE_STORE) :
+    if name == 'local' :
+        return LocalMemoryStore()
+    return CacheStore(name)
+
+# 로그인 시도 제한 (비밀번호 해시 계산 전에 검사)
+class LoginThrottle :
+    def __init__(self, store=None, rates=LOGIN_THROTTLE_RATES, backoff=LOGIN_THROTTLE_BACKOFF) :
+        self.store = store or get_store()
+        self.rates = rates
+        self.backoff = backoff
+
+    def _key(self, scope, value) :
+        return f'login-throttle:{scope}:{value}'
+
+    # 상태 보관 시간 (버킷이 가득 찰 때까지 또는 차단 해제까지)
+    def _timeout(self, scope, state) :
+        rate = self.rates[scope]
+        refill_seconds = rate['capacity'] / rate['refill_rate']
+        blocked_seconds = max(state.get('blocked_until', 0) - time.time(), 0)
+        return int(max(refill_seconds, blocked_seconds, 1)) + 1
+
+    def _load(self, scope, value, now) :
+        rate = self.rates[scope]
+        state = self.store.get(self._key(scope, value)) or {
+            'tokens': rate['capacity'],
+            'updated_at': now,
+            'failures': 0,
+            'blocked_until': 0,
+        }
+        # 경과 시간만큼 토큰 회복
+        elapsed = max(now - state['updated_at'], 0)
+        state['tokens'] = min(rate['capacity'], state['tokens'] + elapsed * rate['refill_rate'])
+        state['updated_at'] = now
+        return state
+
+    def _save(self, scope, value, state) :
+        self.store.set(self._key(scope, value), state, self._timeout(scope, state))
+
+    # 시도 가능 여부와 재시도 대기 시간(초) 반환, 허용 시 토큰 1개 소비
+    def allow(self, ip, name) :
+        now = time.time()
+        targets = [('ip', ip), ('name', name.lower())]
+        states = [(scope, value, self._load(scope, value, now)) for scope, value in targets if value]
+
+        retry_after = 0
+        for scope, value, state in states :
+            if state['blocked_until'] > now :
+                retry_after = max(retry_after, state['blocked_until'] - now)
+            elif state['tokens'] < 1 :
+                retry_after = max(retry_after, (1 - state['tokens']) / self.rates[scope]['refill_rate'])
+
+        if retry_after > 0 :
+            return False, int(retry_after) + 1
+
+        for scope, value, state in states :
+            state['tokens'] -= 1
+            self._save(scope, value, state)
+        return True, 0
+
+    # 인증 실패: 연속 실패 횟수에 따라 점점 길게 차단
+    def record_failure(self, ip, name) :
+        now = time.time()
+        for scope, value in [('ip', ip), ('name', name.lower())] :
+            if not value :
+                continue
+            state = self._load(scope, value, now)
+            state['failures'] += 1
+            excess = state['failures'] - self.backoff['threshold']
+            if excess > 0 :
+                delay = min(self.backoff['base_seconds'] * (2 ** (excess - 1)), self.backoff['max_seconds'])
+                state['blocked_until'] = now + delay
+            self._save(scope, value, state)
+
+    # 인증 성공: 해당 계정의 실패 기록 초기화 (IP 는 버킷만 유지)
+    def record_success(self, ip, name) :
+        self.store.delete(self._key('name', name.lower()))
+        if ip :
+            now = time.time()
+            state = self._load('ip', ip, now)
+            state['failures'] = 0
+            state['blocked_until'] = 0
+            self._save('ip', ip, state)
+
+# 요청한 클라이언트 IP
+def get_client_ip(request) :
+    if LOGIN_THROTTLE_TRUST_PROXY :
+        real_ip = request.META.get('HTTP_X_REAL_IP')
+        if real_ip :
+            return real_ip.strip()
+    return request.META.get('REMOTE_ADDR')
+
+login_throttle = LoginThrottle()
@@ -0,0 +1,193 @@
+import math
+import time
+from datetime import timedelta
+import hashlib
+import threading
+from django.conf import settings
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+
+# 증분 갱신 주기 (다른 워커에서 블랙리스트된 토큰은 최대 이 시간 후 반영)
+FILTER_REFRESH_SECONDS = getattr(settings, 'TOKEN_BLACKLIST_FILTER_REFRESH_SECONDS', 5)
+# 전체 재생성 주기 (정리된 토큰 제거 및 크기 재조정)
+FILTER_REBUILD_SECONDS = getattr(settings, 'TOKEN_BLACKLIST_FILTER_REBUILD_SECONDS', 600)
+# blacklisted_at 은 커밋 순서가 아니라 INSERT 시각이므로 마지막 위치보다 이만큼 앞에서 다시 읽음 (늦게 커밋된 블랙리스트 반영)
+FILTER_REFRESH_OVERLAP_SECONDS = getattr(settings, 'TOKEN_BLACKLIST_FILTER_REFRESH_OVERLAP_SECONDS', 60)
+FILTER_FALSE_POSITIVE_RATE = getattr(settings, 'TOKEN_BLACKLIST_FILTER_FALSE_POSITIVE_RATE', 0.01)
+
+# 만료 토큰 정리 주기 / 배치 크기
+PRUNE_INTERVAL_SECONDS = getattr(settings, 'TOKEN_PRUNE_INTERVAL_SECONDS', 3600)
+PRUNE_BATCH_SIZE = getattr(settings, 'TOKEN_PRUNE_BATCH_SIZE', 1000)
+
+
+# 블룸 필터 (없다고 하면 확실히 없음, 있다고 하면 오탐 가능)
+class BloomFilter :
+    def __init__(self, capacity, false_positive_rate=FILTER_FALSE_POSITIVE_RATE) :
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.size = max(int(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2)), 8)
+        self.hash_count = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    # 128비트 해시를 두 개로 나누어 hash_count 개의 위치 계산 (double hashing)
+    def _positions(self, value) :
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, value) :
+        for position in self._positions(value) :
+            self.bits[position // 8] |= 1 << (position % 8)
+        self.count += 1
+
+    def __contains__(self, value) :
+        return all(self.bits[position // 8] & (1 << (position % 8)) for position in self._positions(value))
+
+# 워커(프로세스) 단위 블랙리스트 JTI 필터
+class BlacklistFilter :
+    def __init__(self) :
+        self._lock = threading.Lock()
+        self._filter = None
+        self._built_at = 0
+        self._refreshed_at = 0
+        self._last_blacklisted_at = None
+
+    # 전체 블랙리스트로 필터 재생성 (여유 있게 현재 개수의 2배 크기)
+    def _rebuild(self) :
+        rows = list(BlacklistedToken.objects.values_list('token__jti', 'blacklisted_at'))
+        bloom = BloomFilter(max(len(rows) * 2, 1024))
+        last_blacklisted_at = None
+        for jti, blacklisted_at in rows :
+            bloom.add(jti)
+            if last_blacklisted_at is None or blacklisted_at > last_blacklisted_at :
+                last_blacklisted_at = blacklisted_at
+
+        self._filter = bloom
+        self._last_blacklisted_at = last_blacklisted_at
+        self._built_at = self._refreshed_at = time.monotonic()
+
+    # 마지막 확인 이후 추가된 블랙리스트만 반영 (겹쳐 읽은 항목은 이미 들어 있으므로 개수에 다시 세지 않음)
+    def _refresh(self) :
+        queryset = BlacklistedToken.objects.all()
+        if self._last_blacklisted_at is not None :
+            queryset = queryset.filter(blacklisted_at__gte=self._last_blacklisted_at - timedelta(seconds=FILTER_REFRESH_OVERLAP_SECONDS))
+
+        for jti, blacklisted_at in queryset.values_list('token__jti', 'blacklisted_at') :
+            if jti not in self._filter :
+                self._filter.add(jti)
+            if self._last_blacklisted_at is None or blacklisted_at > self._last_blacklisted_at :
+                self._last_blacklisted_at = blacklisted_at
+        self._refreshed_at = time.monotonic()
+
+    def _ensure_fresh(self) :
+        now = time.monotonic()
+        with self._lock :
+            if (
+                self._filter is None
+                or now - self._built_at >= FILTER_REBUILD_SECONDS
+                or self._filter.count > self._filter.capacity
+            ) :
+                self._rebuild()
+            elif now - self._refreshed_at >= FILTER_REFRESH_SECONDS :
+                self._refresh()
+
+    def might_contain(self, jti) :
+        self._ensure_fresh()
+        return jti in self._filter
+
+    # 현재 워커에서 블랙리스트한 토큰은 즉시 반영
+    def add(self, jti) :
+        with self._lock :
+            if self._filter is not None :
+                self._filter.add(jti)
+
+blacklist_filter = BlacklistFilter()
+
+# 블랙리스트 여부 (필터에 없으면 DB 조회 없이 False)
+def is_blacklisted(jti) :
+    try :
+        if not blacklist_filter.might_contain(jti) :
+            return False
+    except Exception as e :
+        print(f'🛑 오류: 블랙리스트 필터 갱신 실패, DB 로 확인합니다: {e}')
+    return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+# 블랙리스트 확인에 필터를 사용하는 Refresh Token
+class FilteredRefreshToken(RefreshToken) :
+    def check_blacklist(self) :
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if is_blacklisted(jti) :
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self) :
+        result = super().blacklist()
+        blacklist_filter.add(self.payload[api_settings.JTI_CLAIM])
+        return result
+
+# 만료된 Outstanding/Blacklisted 토큰을 id 순서로 batch_size 만큼씩 삭제
+def prune_expired_tokens(batch_size=PRUNE_BATCH_SIZE, on_progress=None) :
+    now = aware_utcnow()
+    id_queryset = OutstandingToken.objects.filter(expires_at__lte=now).order_by('id').values_list('id', flat=True)
+
+    deleted_count = 0
+    batch_count = 0
+    last_id = None
+    while True :
+        batch_queryset = id_queryset if last_id is None else id_queryset.filter(id__gt=last_id)
+        ids = list(batch_queryset[:batch_size])
+        if not ids :
+            break
+
+        # 짧은 트랜잭션으로 블랙리스트 -> 발급 토큰 순서로 삭제
+        with transaction.atomic() :
+            BlacklistedToken.objects.filter(token_id__in=ids).delete()
+            deleted_count += OutstandingToken.objects.filter(id__in=ids).delete()[0]
+
+        batch_count += 1
+        last_id = ids[-1]
+        if on_progress :
+            on_progress(batch_count, deleted_count)
+
+        if len(ids) < batch_size :
+            break
+
+    return {
+        'deleted_count': deleted_count,
+        'batch_count': batch_count,
+    }
+
+_last_prune_at = 0
+_prune_lock = threading.Lock()
+
+# 워커별로 PRUNE_INTERVAL_SECONDS 에 한 번, 백그라운드 스레드에서 만료 토큰 정리
+def schedule_prune() :
+    global _last_prune_at
+    if PRUNE_INTERVAL_SECONDS <= 0 :
+        return
+
+    with _prune_lock :
+        now = time.monotonic()
+        if _last_prune_at and now - _last_prune_at < PRUNE_INTERVAL_SECONDS :
+            return
+        _last_prune_at = now
+
+    def run() :
+        from django.db import connections
+        try :
+            result = prune_expired_tokens()
+            if result['deleted_count'] :
+                print(f"만료 토큰 정리 완료: {result['deleted_count']}건 ({result['batch_count']}개 배치)")
+        except Exception as e :
+            print(f'🛑 오류: 만료 토큰 정리 실패: {e}')
+        finally :
+            connections.close_all()
+
+    threading.Thread(target=run, name='token-prune', daemon=True).start()
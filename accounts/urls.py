@@ -1,8 +1,9 @@
 from django.urls import path
-from accounts.views import LoginView, LogoutView, AdminInfoView
+from accounts.views import LoginView, LogoutView, TokenRefreshView, AdminInfoView
 
 urlpatterns = [
     path('login', LoginView.as_view(), name="login"),
     path('logout', LogoutView.as_view(), name="logout"),
+    path('token/refresh', TokenRefreshView.as_view(), name="token-refresh"),
     path('admin/me', AdminInfoView.as_view(), name="admin-info"),
 ]
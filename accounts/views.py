@@ -1,12 +1,16 @@
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from accounts.authentication import CachedJWTAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import TokenError
+from django.core.exceptions import ObjectDoesNotExist
 from rest_framework.views import APIView
 from django.http import JsonResponse
 from django.contrib.auth import authenticate
 from accounts.models import Admin
-from accounts.serializers import AdminSerializers
+from accounts.serializers import AdminSerializers, FilteredTokenRefreshSerializer
+from accounts.token_blacklist import FilteredRefreshToken, schedule_prune
+from accounts.throttle import login_throttle, get_client_ip
 
 # 로그인
 class LoginView(APIView) :
@@ -20,13 +24,31 @@ class LoginView(APIView) :
             return JsonResponse({
                 'message' : '아이디 또는 패스워드를 입력해주세요.'
             }, status=status.HTTP_400_BAD_REQUEST)
+
+        if not isinstance(name, str) or not isinstance(password, str) :
+            return JsonResponse({
+                'message' : '아이디와 패스워드는 문자열이어야 합니다.'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
+        # 시도 제한 (비밀번호 해시 계산 전에 IP / 아이디별로 검사)
+        client_ip = get_client_ip(request)
+        allowed, retry_after = login_throttle.allow(client_ip, name)
+        if not allowed :
+            response = JsonResponse({
+                'message' : f'로그인 시도가 너무 많습니다. {retry_after}초 후 다시 시도해주세요.'
+            }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+            response['Retry-After'] = str(retry_after)
+            return response
+
         # 사용자 인증
         admin = authenticate(request, username=name, password=password)
         # 인증 완료 시,
         if admin is not None : 
+            login_throttle.record_success(client_ip, name)
             # 로그인
-            token = RefreshToken.for_user(admin)
+            token = FilteredRefreshToken.for_user(admin)
+            # 로그인마다 발급 토큰이 쌓이므로 주기적으로 만료 토큰 정리 (백그라운드)
+            schedule_prune()
 
             # 사용자 정보 직렬화
             serializer = AdminSerializers(admin)
@@ -39,21 +61,52 @@ class LoginView(APIView) :
             }, status=status.HTTP_200_OK)
         else :
             # 인증 실패
+            login_throttle.record_failure(client_ip, name)
             return JsonResponse({
                 'message' : '아이디 또는 패스워드가 올바르지 않습니다.'
             }, status=status.HTTP_401_UNAUTHORIZED)
 
+# Access Token 재발급 (Refresh Token 의 블랙리스트 여부는 워커별 필터로 확인)
+class TokenRefreshView(APIView) :
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def post(self, request) :
+        refresh_token = request.data.get('refresh_token')
+        if not refresh_token or not isinstance(refresh_token, str) :
+            return JsonResponse({
+                'message' : 'Refresh Token 이 필요합니다.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = FilteredTokenRefreshSerializer(data={'refresh': refresh_token})
+        try :
+            serializer.is_valid(raise_exception=True)
+        except (TokenError, AuthenticationFailed, ObjectDoesNotExist) :
+            return JsonResponse({
+                'message' : '만료되었거나 사용할 수 없는 Refresh Token 입니다.'
+            }, status=status.HTTP_401_UNAUTHORIZED)
+
+        data = {
+            'message' : '토큰 재발급 성공',
+            'access_token' : serializer.validated_data['access'],
+        }
+        # ROTATE_REFRESH_TOKENS 설정 시 새 Refresh Token 도 함께 전달
+        if 'refresh' in serializer.validated_data :
+            data['refresh_token'] = serializer.validated_data['refresh']
+        return JsonResponse(data, status=status.HTTP_200_OK)
+
 # 로그아웃
 class LogoutView(APIView) :
     # 인증된 사용자만 접근 가능
     permission_classes = [IsAuthenticated]
     # JWT 인증 방식 사용
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
 
     def post(self, request) :
         try :
             refresh_token = request.data.get('refresh_token')
-            token = RefreshToken(refresh_token)
+            # 블랙리스트 확인은 워커별 필터로 (대부분 DB 조회 없음)
+            token = FilteredRefreshToken(refresh_token)
             token.blacklist()
 
             return JsonResponse({
@@ -70,7 +123,7 @@ class AdminInfoView(APIView) :
     # 인증된 사용자만 접근 가능
     permission_classes = [IsAuthenticated]
     # JWT 인증 방식 사용
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
 
     def get(self, request) :
         admin = request.user
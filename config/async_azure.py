@@ -0,0 +1,124 @@
+import httpx
+from openai import AsyncAzureOpenAI
+from azure.storage.blob import ContentSettings
+from azure.storage.blob.aio import BlobServiceClient as AsyncBlobServiceClient
+from azure.core.exceptions import ResourceNotFoundError
+from config.blob_manifest import is_known_container, aget_manifest, get_versioned_url, anotify_change
+
+
+# 비동기 Azure OpenAI 클라이언트 (async with 로 사용 후 연결 정리)
+def get_async_azure_openai_client(api_key, endpoint, api_version) :
+    if not all([api_key, endpoint]):
+        print("ERROR: Azure OpenAI API KEY 또는 ENDPOINT가 설정되지 않았습니다.")
+        return None
+
+    try :
+        return AsyncAzureOpenAI(
+            api_key=api_key,
+            azure_endpoint=endpoint,
+            api_version=api_version
+        )
+    except Exception as e :
+        print(f'Azure OpenAI 비동기 클라이언트 초기화 실패 {e}')
+        return None
+
+# 비동기 Azure Blob Storage 유틸 (aiohttp 필요, async with 로 사용)
+class AsyncAzureBlobStorageUtil :
+    def __init__(self, connection_string) :
+        if not connection_string :
+            raise ValueError("ERROR: Azure Blob Storage 연결 문자열이 설정되지 않았습니다.")
+
+        try :
+            self.blob_service_client = AsyncBlobServiceClient.from_connection_string(connection_string)
+        except Exception as e :
+            raise Exception(f'Azure Blob Storage 비동기 클라이언트 초기화 실패: {e}')
+
+    async def __aenter__(self) :
+        await self.blob_service_client.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info) :
+        await self.blob_service_client.close()
+
+    # Azure Blob Storage 컨테이너를 가져오거나 생성, 공개 접근 정책 설정
+    async def get_or_create_container(self, container_name, public=False) :
+        try :
+            container_client = self.blob_service_client.get_container_client(container_name)
+            # 이 워커가 목록을 캐시한 컨테이너는 이미 생성/설정된 것이므로 왕복 생략
+            if is_known_container(container_client) :
+                return container_client
+            try :
+                await container_client.get_container_properties()
+            except ResourceNotFoundError :
+                await container_client.create_container()
+                print(f"\n>> 신규 컨테이너 '{container_name}' 생성 완료.\n")
+
+            # 컨테이너의 공개 접근 정책을 'blob'으로 설정 (익명 읽기 가능)
+            if public :
+                await container_client.set_container_access_policy(signed_identifiers={}, public_access='blob')
+            return container_client
+        except Exception as e :
+            raise Exception(f'ERROR: Azure Blob Storage 컨테이너 처리 실패: {e}')
+
+    # 캐시된 컨테이너 목록으로 존재 여부 확인 (목록이 없거나 다른 워커가 바꿨을 때만 다시 조회), versioned 면 속성 조회로 받은 ETag 버전을 붙인 URL
+    async def get_existing_blob_url(self, container_client, blob_name, versioned=False) :
+        try :
+            blobs = await aget_manifest(container_client)
+        except Exception as e :
+            raise Exception(f"ERROR: Blob 존재 여부 확인 중 오류 발생: {e}")
+        if blob_name not in blobs :
+            return None
+        blob_client = container_client.get_blob_client(blob=blob_name)
+        blob_url = blob_client.url
+        # immutable 로 캐시되는 URL 이므로 버전은 캐시된 목록이 아니라 이번에 조회한 ETag 로 (다른 워커가 덮어썼을 수 있음)
+        if versioned :
+            try :
+                etag = (await blob_client.get_blob_properties()).etag
+            except ResourceNotFoundError :
+                await anotify_change(container_client)
+                return None
+            except Exception as e :
+                raise Exception(f"ERROR: Blob 속성 조회 중 오류 발생: {e}")
+            blob_url = get_versioned_url(blob_url, etag)
+        print(f"\n>> 이미 존재하는 데이터: {blob_url}\n")
+        return blob_url
+
+    # Azure Blob Storage 에 데이터 업로드 (versioned 면 ETag 버전을 붙인 URL 반환)
+    async def upload_blob(self, blob_client, data, content_type='application/octet-stream', overwrite=True, cache_control=None, versioned=False) :
+        try :
+            content_settings_obj = ContentSettings(content_type=content_type, cache_control=cache_control)
+            result = await blob_client.upload_blob(data, overwrite=overwrite, content_settings=content_settings_obj)
+            await anotify_change(blob_client)
+            if versioned :
+                return get_versioned_url(blob_client.url, result.get('etag'))
+            return blob_client.url
+        except Exception as e :
+            raise Exception(f"ERROR: Blob 업로드 실패 ({blob_client.blob_name}): {e}")
+
+    # 존재 확인 없이 한 번에 삭제 (없는 blob 은 성공으로 처리), 실제로 삭제했으면 True
+    async def delete_blob(self, container_client, blob_name) :
+        try :
+            await container_client.delete_blob(blob_name)
+            deleted = True
+        except ResourceNotFoundError :
+            deleted = False
+        except Exception as e :
+            raise Exception(f"ERROR: Blob 삭제 실패 ({blob_name}): {e}")
+        await anotify_change(container_client)
+        return deleted
+
+    # Azure Blob Strorage 에서 파일 다운로드
+    async def download_blob_as_text(self, container_client, blob_name) :
+        blob_client = container_client.get_blob_client(blob=blob_name)
+        try :
+            download_stream = await blob_client.download_blob()
+            return (await download_stream.readall()).decode('utf-8')
+        except Exception as e :
+            raise Exception(f"ERROR: Blob 다운로드 실패 ({blob_name}): {e}")
+
+# DALL-E 가 생성한 임시 이미지 다운로드
+async def download_image(image_url, timeout=60) :
+    async with httpx.AsyncClient(timeout=timeout) as client :
+        response = await client.get(image_url)
+        response.raise_for_status() # 200 OK가 아닌 경우 예외 발생
+        return response.content
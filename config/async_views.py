@@ -0,0 +1,51 @@
+import json
+from asgiref.sync import sync_to_async
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from django.http import JsonResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from django.utils.decorators import method_decorator
+from accounts.authentication import CachedJWTAuthentication
+
+
+# ASGI 에서 이벤트 루프를 막지 않는 async View 기반 클래스
+# - DRF APIView 는 async 핸들러를 지원하지 않으므로 JWT 인증과 request.data 파싱을 직접 수행
+# - 핸들러(post/put ...)는 모두 async def 로 작성
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncAuthView(View) :
+    # JWT 인증 방식 사용
+    authentication_class = CachedJWTAuthentication
+
+    async def dispatch(self, request, *args, **kwargs) :
+        # 인증된 사용자만 접근 가능 (사용자 조회는 DB 접근이므로 스레드에서 실행)
+        try :
+            auth_result = await sync_to_async(self.authentication_class().authenticate)(request)
+        except (AuthenticationFailed, InvalidToken, TokenError) as e :
+            return JsonResponse({
+                'message': f'인증 실패: {e}'
+            }, status=status.HTTP_401_UNAUTHORIZED)
+
+        if auth_result is None :
+            return JsonResponse({
+                'message': '인증 정보가 제공되지 않았습니다.'
+            }, status=status.HTTP_401_UNAUTHORIZED)
+        request.user, request.auth = auth_result
+
+        try :
+            request.data = self._parse_data(request)
+        except ValueError :
+            return JsonResponse({
+                'message': '요청 본문이 올바른 JSON 이 아닙니다.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return await super().dispatch(request, *args, **kwargs)
+
+    # APIView 의 request.data 와 같이 JSON / form 본문을 dict 로 제공
+    def _parse_data(self, request) :
+        if request.content_type == 'application/json' :
+            return json.loads(request.body or b'{}')
+        if request.method == 'POST' :
+            return request.POST
+        return {}
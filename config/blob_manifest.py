@@ -0,0 +1,100 @@
+import time
+import threading
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from azure.core.exceptions import ResourceNotFoundError
+from game.cache import get_version, bump_version
+
+
+# 워커(프로세스) 단위 컨테이너 목록 캐시 {(account, container): (built_at, version, {blob_name: etag})}
+# 앱에서 올리거나 지우면 컨테이너 버전(CacheVersion)을 올려 모든 워커가 다음 조회 때 목록을 다시 받음
+# 앱 밖에서 바뀐 내용은 TTL 이후 반영
+BLOB_MANIFEST_TTL_SECONDS = getattr(settings, 'BLOB_MANIFEST_TTL_SECONDS', 300)
+
+# 내용 버전이 URL 에 들어가는 이미지는 브라우저/CDN 이 재검증 없이 1년간 캐시
+IMAGE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+_manifests = {}
+_manifests_lock = threading.Lock()
+
+
+# 컨테이너/ blob 클라이언트 모두 account_name, container_name 을 가짐
+def get_manifest_key(client) :
+    return client.account_name, client.container_name
+
+def get_version_key(key) :
+    return f'blob:{key[0]}/{key[1]}'
+
+# version 이 주어지면 캐시를 만든 시점의 버전과 같을 때만 사용
+def _get_fresh(key, version=None) :
+    cached = _manifests.get(key)
+    if cached and time.monotonic() - cached[0] < BLOB_MANIFEST_TTL_SECONDS and (version is None or cached[1] == version) :
+        return cached[2]
+    return None
+
+def _store(key, version, blobs) :
+    with _manifests_lock :
+        _manifests[key] = (time.monotonic(), version, blobs)
+    return blobs
+
+# 목록이 캐시되어 있으면 컨테이너가 존재하는 것 (get_or_create_container 왕복 생략용)
+def is_known_container(client) :
+    return _get_fresh(get_manifest_key(client)) is not None
+
+# 한 번의 목록 조회로 {blob 이름: ETag} 생성 (목록 전에 읽은 버전으로 저장하므로 조회 중 변경은 다음 조회에서 반영)
+def get_manifest(container_client) :
+    key = get_manifest_key(container_client)
+    version = get_version(get_version_key(key))
+    blobs = _get_fresh(key, version)
+    if blobs is not None :
+        return blobs
+    return _store(key, version, {blob.name: blob.etag for blob in container_client.list_blobs()})
+
+async def aget_manifest(container_client) :
+    key = get_manifest_key(container_client)
+    version = await sync_to_async(get_version)(get_version_key(key))
+    blobs = _get_fresh(key, version)
+    if blobs is not None :
+        return blobs
+    return _store(key, version, {blob.name: blob.etag async for blob in container_client.list_blobs()})
+
+def blob_exists(container_client, blob_name) :
+    return blob_name in get_manifest(container_client)
+
+async def ablob_exists(container_client, blob_name) :
+    return blob_name in await aget_manifest(container_client)
+
+# ETag 로 버전을 붙인 URL (내용이 바뀌면 ETag 가 바뀌므로 URL 도 바뀜)
+# 업로드 결과나 속성 조회로 방금 받은 ETag 만 사용 (캐시된 목록의 ETag 는 다른 워커가 덮어쓴 이전 내용일 수 있음)
+def get_versioned_url(url, etag) :
+    if not etag :
+        return url
+    version = etag.strip('"').lower().removeprefix('0x')
+    return f'{url}?v={version}'
+
+# 앱에서 올리거나 지운 내용을 모든 워커에 알림 (이 워커 포함, 다음 조회 때 목록을 다시 받음)
+def notify_change(client) :
+    key = get_manifest_key(client)
+    with _manifests_lock :
+        _manifests.pop(key, None)
+    try :
+        bump_version(get_version_key(key))
+    except Exception as e :
+        print(f'🛑 오류: {key[1]} 컨테이너 목록 버전 갱신 실패: {e}')
+
+async def anotify_change(client) :
+    await sync_to_async(notify_change)(client)
+
+def forget_container(client) :
+    with _manifests_lock :
+        _manifests.pop(get_manifest_key(client), None)
+
+# 존재 확인 없이 한 번에 삭제 (이미 없으면 성공으로 처리), 실제로 삭제했으면 True
+def delete_blob(container_client, blob_name) :
+    try :
+        container_client.delete_blob(blob_name)
+        deleted = True
+    except ResourceNotFoundError :
+        deleted = False
+    notify_change(container_client)
+    return deleted
@@ -0,0 +1,179 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connections, router, transaction
+
+
+# 필터에 허용되는 조회 방식
+ALLOWED_LOOKUPS = {'exact', 'in', 'gt', 'gte', 'lt', 'lte'}
+
+# 한 번에 업데이트할 기본 행 수
+DEFAULT_BATCH_SIZE = getattr(settings, 'BULK_UPDATE_BATCH_SIZE', 500)
+MAX_BATCH_SIZE = getattr(settings, 'BULK_UPDATE_MAX_BATCH_SIZE', 5000)
+
+# 요청의 ids / filters 로 업데이트 대상 QuerySet 생성 (잘못된 값이면 ValueError)
+def build_target_queryset(model, ids=None, filters=None, filter_fields=()) :
+    # 대상 조회와 업데이트 모두 쓰기 DB 에서 (복제본 지연 방지)
+    queryset = model.objects.db_manager(router.db_for_write(model)).all()
+
+    if ids is not None :
+        if not isinstance(ids, list) :
+            raise ValueError('ids 는 목록이어야 합니다.')
+        try :
+            queryset = queryset.filter(pk__in=ids)
+        except (ValueError, TypeError, ValidationError) as e :
+            raise ValueError(f'잘못된 ids 입니다: {e}')
+
+    if filters :
+        if not isinstance(filters, dict) :
+            raise ValueError('filters 는 객체여야 합니다.')
+
+        for key, value in filters.items() :
+            field_name, _, lookup = key.partition('__')
+            if field_name not in filter_fields or (lookup and lookup not in ALLOWED_LOOKUPS) :
+                raise ValueError(f'허용되지 않는 필터입니다: {key}')
+        # 필드 형식에 맞지 않는 값 (예: bool 필드에 목록, in 에 숫자) 은 400 으로 응답하도록 ValueError 로 변환
+        try :
+            queryset = queryset.filter(**filters)
+        except (ValueError, TypeError, ValidationError) as e :
+            raise ValueError(f'잘못된 필터 값입니다: {e}')
+
+    return queryset
+
+# 요청의 batch_size 정리 (기본값 / 최대값 적용)
+def get_batch_size(value) :
+    try :
+        batch_size = int(value) if value is not None else DEFAULT_BATCH_SIZE
+    except (TypeError, ValueError) :
+        raise ValueError('batch_size 는 숫자여야 합니다.')
+
+    if batch_size <= 0 :
+        raise ValueError('batch_size 는 1 이상이어야 합니다.')
+    return min(batch_size, MAX_BATCH_SIZE)
+
+# 기본 키 순서로 batch_size 만큼 나누어 짧은 트랜잭션으로 업데이트
+def update_in_batches(queryset, update_fields, batch_size=DEFAULT_BATCH_SIZE, on_progress=None) :
+    model = queryset.model
+    db = queryset.db
+    pk_queryset = queryset.order_by('pk').values_list('pk', flat=True)
+
+    updated_count = 0
+    batch_count = 0
+    last_pk = None
+
+    while True :
+        # 마지막으로 처리한 기본 키 이후부터 다음 배치 조회 (OFFSET 없이 인덱스 범위 스캔)
+        batch_queryset = pk_queryset if last_pk is None else pk_queryset.filter(pk__gt=last_pk)
+        pks = list(batch_queryset[:batch_size])
+        if not pks :
+            break
+
+        with transaction.atomic(using=db) :
+            updated_count += model.objects.using(db).filter(pk__in=pks).update(**update_fields)
+
+        batch_count += 1
+        last_pk = pks[-1]
+
+        if on_progress :
+            on_progress(batch_count, updated_count)
+
+        if len(pks) < batch_size :
+            break
+
+    return {
+        'updated_count': updated_count,
+        'batch_count': batch_count,
+    }
+
+# 모델에 실제로 있는 필드만 반환 (예: Scenario/Story 에는 name 이 없음)
+def get_model_fields(model, field_names) :
+    concrete_field_names = {field.name for field in model._meta.concrete_fields}
+    return [field_name for field_name in field_names if field_name in concrete_field_names]
+
+# 변경된 컬럼만 UPDATE ... WHERE pk = ... RETURNING 한 번으로 수정하고 수정된 인스턴스 반환 (없으면 None)
+def update_returning(model, pk, changes) :
+    db = router.db_for_write(model)
+    connection = connections[db]
+    quote_name = connection.ops.quote_name
+    opts = model._meta
+
+    # 기본 키 형식이 잘못되었으면 존재하지 않는 것으로 처리
+    try :
+        pk = opts.pk.to_python(pk)
+    except ValidationError :
+        return None
+
+    # 필드 값이 잘못되었으면 ValidationError
+    set_sql = []
+    params = []
+    for field_name, value in changes.items() :
+        field = opts.get_field(field_name)
+        set_sql.append(f'{quote_name(field.column)} = %s')
+        params.append(field.get_db_prep_save(field.to_python(value), connection))
+    params.append(opts.pk.get_db_prep_value(pk, connection))
+
+    returning_sql = ', '.join(quote_name(field.column) for field in opts.concrete_fields)
+    sql = (
+        f'UPDATE {quote_name(opts.db_table)} SET {", ".join(set_sql)} '
+        f'WHERE {quote_name(opts.pk.column)} = %s RETURNING {returning_sql}'
+    )
+
+    # RawQuerySet 으로 실행해야 JSONField 등 DB 값 변환이 그대로 적용됨
+    instances = list(model.objects.db_manager(db).raw(sql, params))
+    return instances[0] if instances else None
+
+# 요청 항목 [{"id": ..., 필드: 값}, ...] 을 검사하여 (항목 id, 변경 필드) 목록과 오류 결과 반환
+def parse_batch_items(model, items, allowed_fields) :
+    if not isinstance(items, list) or not items :
+        raise ValueError('items 는 비어있지 않은 목록이어야 합니다.')
+
+    parsed_items = []
+    results = {}
+    for item in items :
+        if not isinstance(item, dict) or not item.get('id') :
+            raise ValueError('각 항목에는 id 가 필요합니다.')
+
+        item_id = str(item['id'])
+        try :
+            item_id = str(model._meta.pk.to_python(item_id))
+            changes = {
+                field_name: model._meta.get_field(field_name).to_python(item[field_name])
+                for field_name in get_model_fields(model, allowed_fields)
+                if field_name in item and item[field_name] is not None
+            }
+        except ValidationError as e :
+            results[item_id] = {'id': item_id, 'status': 'invalid', 'message': ' '.join(e.messages)}
+            continue
+
+        if not changes :
+            results[item_id] = {'id': item_id, 'status': 'invalid', 'message': '업데이트할 필드가 필요합니다.'}
+            continue
+        parsed_items.append((item_id, changes))
+
+    return parsed_items, results
+
+# id 별로 다른 값을 변경 필드 조합마다 bulk_update(CASE WHEN) 한 번씩으로 적용
+def batch_update_by_id(model, parsed_items, batch_size=DEFAULT_BATCH_SIZE) :
+    db = router.db_for_write(model)
+    results = {}
+
+    # 존재하는 id 확인 (SELECT 1회)
+    item_ids = [item_id for item_id, _ in parsed_items]
+    existing_ids = {
+        str(pk) for pk in model.objects.using(db).filter(pk__in=item_ids).values_list('pk', flat=True)
+    }
+
+    # 변경 필드 조합별로 묶기 (같은 조합은 UPDATE 한 번)
+    groups = {}
+    for item_id, changes in parsed_items :
+        if item_id not in existing_ids :
+            results[item_id] = {'id': item_id, 'status': 'not_found'}
+            continue
+        groups.setdefault(tuple(sorted(changes)), []).append(model(pk=item_id, **changes))
+
+    with transaction.atomic(using=db) :
+        for fields, instances in groups.items() :
+            model.objects.using(db).bulk_update(instances, fields, batch_size=batch_size)
+            for instance in instances :
+                results[str(instance.pk)] = {'id': str(instance.pk), 'status': 'updated', 'fields': list(fields)}
+
+    return results
@@ -0,0 +1,134 @@
+import re
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+
+
+# 이 길이를 넘는 원문은 조각별 요약(map) 후 합친 요약으로 기존 분석 프롬프트 실행(reduce)
+LONG_TEXT_THRESHOLD_CHARS = getattr(settings, 'LONG_TEXT_THRESHOLD_CHARS', 24000)
+LONG_TEXT_CHUNK_CHARS = getattr(settings, 'LONG_TEXT_CHUNK_CHARS', 8000)
+# 동시에 보낼 조각 요약 요청 수 (Azure OpenAI 분당 요청/토큰 한도 보호)
+LONG_TEXT_SUMMARY_CONCURRENCY = getattr(settings, 'LONG_TEXT_SUMMARY_CONCURRENCY', 4)
+LONG_TEXT_SUMMARY_MAX_TOKENS = getattr(settings, 'LONG_TEXT_SUMMARY_MAX_TOKENS', 1000)
+
+# 합친 요약이 여전히 길 때 다시 요약하는 최대 횟수
+MAX_SUMMARY_ROUNDS = 3
+
+CHUNK_SUMMARY_OPTIONS = {
+    'temperature': 0.3,
+    'max_tokens': LONG_TEXT_SUMMARY_MAX_TOKENS,
+}
+
+PARAGRAPH_SEPARATOR = re.compile(r'\n\s*\n')
+SENTENCE_SEPARATOR = re.compile(r'(?<=[.!?。…"”])\s+')
+
+
+# 한 단락이 조각보다 길면 문장 단위로, 문장도 길면 글자 수로 자름
+def _split_long_block(block, max_chars) :
+    if len(block) <= max_chars :
+        return [block]
+
+    pieces = []
+    for sentence in SENTENCE_SEPARATOR.split(block) :
+        while len(sentence) > max_chars :
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if sentence :
+            pieces.append(sentence)
+    return pieces
+
+# 단락 경계를 지키며 max_chars 이하의 조각으로 나눔 (단락 순서 유지)
+def split_text(text, max_chars=LONG_TEXT_CHUNK_CHARS) :
+    chunks = []
+    current = []
+    current_length = 0
+
+    for paragraph in PARAGRAPH_SEPARATOR.split(text) :
+        paragraph = paragraph.strip()
+        if not paragraph :
+            continue
+        for piece in _split_long_block(paragraph, max_chars) :
+            if current and current_length + len(piece) + 2 > max_chars :
+                chunks.append('\n\n'.join(current))
+                current = []
+                current_length = 0
+            current.append(piece)
+            current_length += len(piece) + 2
+    if current :
+        chunks.append('\n\n'.join(current))
+    return chunks
+
+# 조각 요약 요청 메시지
+def build_chunk_summary_messages(chunk, index, total) :
+    system = {
+        "role": "system",
+        "content": "너는 긴 이야기를 나누어 읽는 요약가다. 사건의 순서, 등장인물과 관계, 갈등, 장소, 중요한 대사를 빠짐없이 보존해서 요약한다. 원문에 없는 내용은 만들지 않는다.",
+    }
+    user = {
+        "role": "user",
+        "content": f"""전체 {total}개 부분 중 {index}번째 부분이다. 이 부분의 내용만 시간 순서대로 요약해라. (원문 언어 유지, 설명 없이 요약문만)
+                ---
+                {chunk}
+                ---"""
+    }
+    return [system, user]
+
+def merge_summaries(summaries) :
+    return '\n\n'.join(f'[{index}/{len(summaries)}]\n{summary}' for index, summary in enumerate(summaries, start=1))
+
+def _summarize_chunk(client, model, chunk, index, total) :
+    try :
+        response = client.chat.completions.create(
+            model=model,
+            messages=build_chunk_summary_messages(chunk, index, total),
+            **CHUNK_SUMMARY_OPTIONS
+        )
+        return response.choices[0].message.content.strip()
+    except Exception as e :
+        raise Exception(f'긴 원문 요약 실패 ({index}/{total} 부분): {e}')
+
+async def _asummarize_chunk(client, model, chunk, index, total, semaphore) :
+    async with semaphore :
+        try :
+            response = await client.chat.completions.create(
+                model=model,
+                messages=build_chunk_summary_messages(chunk, index, total),
+                **CHUNK_SUMMARY_OPTIONS
+            )
+            return response.choices[0].message.content.strip()
+        except Exception as e :
+            raise Exception(f'긴 원문 요약 실패 ({index}/{total} 부분): {e}')
+
+# 긴 원문이면 조각을 동시에 요약해서 합친 요약 반환, 짧으면 원문 그대로 반환
+# (응답 시간은 원문 길이가 아니라 가장 느린 조각 요약에 좌우됨)
+def summarize_long_text(client, model, text, threshold=LONG_TEXT_THRESHOLD_CHARS, concurrency=LONG_TEXT_SUMMARY_CONCURRENCY) :
+    for _ in range(MAX_SUMMARY_ROUNDS) :
+        if len(text) <= threshold :
+            break
+        chunks = split_text(text)
+        if not chunks :
+            break
+        print(f">> 긴 원문({len(text)}자)을 {len(chunks)}개 부분으로 나누어 요약합니다.")
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(chunks))) as executor :
+            summaries = list(executor.map(
+                lambda args : _summarize_chunk(client, model, args[1], args[0], len(chunks)),
+                enumerate(chunks, start=1)
+            ))
+        text = merge_summaries(summaries)
+    return text
+
+async def asummarize_long_text(client, model, text, threshold=LONG_TEXT_THRESHOLD_CHARS, concurrency=LONG_TEXT_SUMMARY_CONCURRENCY) :
+    for _ in range(MAX_SUMMARY_ROUNDS) :
+        if len(text) <= threshold :
+            break
+        chunks = split_text(text)
+        if not chunks :
+            break
+        print(f">> 긴 원문({len(text)}자)을 {len(chunks)}개 부분으로 나누어 요약합니다.")
+        semaphore = asyncio.Semaphore(concurrency)
+        summaries = await asyncio.gather(*[
+            _asummarize_chunk(client, model, chunk, index, len(chunks), semaphore)
+            for index, chunk in enumerate(chunks, start=1)
+        ])
+        text = merge_summaries(summaries)
+    return text
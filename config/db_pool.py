@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.db import connections
+
+
+# 현재 워커의 별칭별 커넥션 풀 상태 (psycopg_pool 통계 + 포화도)
+def get_pool_stats() :
+    stats = {}
+    for alias in settings.DATABASES :
+        connection = connections[alias]
+        pool = getattr(connection, 'pool', None)
+
+        # 풀 미사용: 지속 커넥션 정보만 반환
+        if pool is None :
+            stats[alias] = {
+                'pooled': False,
+                'conn_max_age': connection.settings_dict.get('CONN_MAX_AGE'),
+                'health_checks': connection.settings_dict.get('CONN_HEALTH_CHECKS'),
+                'connected': connection.connection is not None,
+            }
+            continue
+
+        pool_stats = pool.get_stats()
+        pool_size = pool_stats.get('pool_size', 0)
+        in_use = pool_size - pool_stats.get('pool_available', 0)
+        stats[alias] = {
+            'pooled': True,
+            'min_size': pool.min_size,
+            'max_size': pool.max_size,
+            'in_use': in_use,
+            # 사용 중 커넥션 / 최대 크기 (1 에 가까우면 풀 크기 부족)
+            'saturation': round(in_use / pool.max_size, 2) if pool.max_size else 0,
+            **pool_stats,
+        }
+    return stats
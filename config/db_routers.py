@@ -1,3 +1,81 @@
+import random
+import contextvars
+from django.conf import settings
+from django.core.cache import caches
+
+
+# 요청 단위 주 DB 고정 상태 {'pinned': 읽기를 주 DB 로, 'written': 쓰기 발생 여부, 'replicas': {주 DB: 요청에서 사용할 복제본}}
+_primary_state = contextvars.ContextVar('db_primary_state', default=None)
+
+# 쓰기 발생 -> 현재 요청(또는 작업)의 이후 읽기를 주 DB 로 고정
+def pin_primary() :
+    state = _primary_state.get()
+    if state is None :
+        state = {}
+        _primary_state.set(state)
+    state['pinned'] = True
+    state['written'] = True
+
+# 읽기만 주 DB 로 고정 (최근 쓰기를 한 관리자의 요청)
+def pin_primary_reads() :
+    state = _primary_state.get()
+    if state is None :
+        state = {}
+        _primary_state.set(state)
+    state['pinned'] = True
+
+def is_primary_pinned() :
+    state = _primary_state.get()
+    return bool(state and state.get('pinned'))
+
+def has_written() :
+    state = _primary_state.get()
+    return bool(state and state.get('written'))
+
+# 요청 시작 시 고정 여부 설정, 반환된 토큰으로 요청 종료 시 복원
+def start_primary_state(pinned) :
+    return _primary_state.set({'pinned': pinned, 'written': False})
+
+def reset_primary_state(token) :
+    _primary_state.reset(token)
+
+# settings.CACHES 의 쓰기 후 주 DB 고정 기록 캐시 별칭 (워커가 여러 개면 redis 등 공유 백엔드 필요)
+PRIMARY_STICKY_CACHE_ALIAS = 'db_sticky'
+
+def make_sticky_cache_key(admin_id) :
+    return f'db-primary-sticky:{admin_id}'
+
+# 관리자가 쓰기를 한 뒤 seconds 동안 같은 관리자의 요청을 주 DB 로 (쿠키를 보내지 않는 교차 출처 클라이언트도 적용)
+def mark_primary_sticky(admin_id, seconds) :
+    try :
+        caches[PRIMARY_STICKY_CACHE_ALIAS].set(make_sticky_cache_key(admin_id), True, seconds)
+    except Exception as e :
+        print(f'🛑 오류: 주 DB 고정 기록 실패: {e}')
+
+def pin_primary_if_sticky(admin_id) :
+    try :
+        sticky = caches[PRIMARY_STICKY_CACHE_ALIAS].get(make_sticky_cache_key(admin_id))
+    except Exception as e :
+        print(f'🛑 오류: 주 DB 고정 기록 조회 실패: {e}')
+        sticky = False
+    if sticky :
+        pin_primary_reads()
+
+# 읽기 DB 선택: 고정되지 않았고 복제본이 있으면 복제본 중 하나, 아니면 주 DB
+# 요청 안에서는 처음 고른 복제본을 계속 사용 (복제본마다 지연이 달라 캐시 버전과 데이터를 서로 다른 시점에서 읽는 문제 방지)
+def get_read_db(primary) :
+    replicas = getattr(settings, 'DATABASE_REPLICAS', {}).get(primary)
+    if not replicas or is_primary_pinned() :
+        return primary
+
+    state = _primary_state.get()
+    if state is None :
+        return random.choice(replicas)
+    chosen = state.setdefault('replicas', {})
+    if primary not in chosen :
+        chosen[primary] = random.choice(replicas)
+    return chosen[primary]
+
 class TestDBRouter :
     # project_test 에서 사용하는 앱
     route_app_labels = {
@@ -6,11 +84,13 @@ class TestDBRouter :
 
     def db_for_read(self, model, **hints) :
         if model._meta.app_label in self.route_app_labels :
-            return 'test'
+            return get_read_db('test')
         return None
     
     def db_for_write(self, model, **hints) :
         if model._meta.app_label in self.route_app_labels :
+            # 쓰기 이후 같은 요청의 읽기는 복제 지연 없이 주 DB 에서
+            pin_primary()
             return 'test'
         return None
     
@@ -32,11 +112,13 @@ class ProdDBRouter :
 
     def db_for_read(self, model, **hints) :
         if model._meta.app_label in self.route_app_labels :
-            return 'prod'
+            return get_read_db('prod')
         return None
     
     def db_for_write(self, model, **hints) :
         if model._meta.app_label in self.route_app_labels :
+            # 쓰기 이후 같은 요청의 읽기는 복제 지연 없이 주 DB 에서
+            pin_primary()
             return 'prod'
         return None
     
@@ -0,0 +1,26 @@
+from django.conf import settings
+from config.db_routers import start_primary_state, reset_primary_state, has_written, mark_primary_sticky
+
+
+# 쓰기 요청 이후 일정 시간 동안의 읽기를 주 DB 로 고정 (복제 지연으로 방금 쓴 값이 안 보이는 문제 방지)
+# 관리자 SPA 는 다른 출처에서 Bearer JWT 로 호출하므로 쿠키 대신 관리자 id 로 기록하고, 인증 시 확인 (CachedJWTAuthentication)
+class PrimaryStickinessMiddleware :
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response) :
+        self.get_response = get_response
+
+    def __call__(self, request) :
+        sticky_seconds = getattr(settings, 'DATABASE_PRIMARY_STICKY_SECONDS', 0)
+        # 쓰기 요청은 처음부터 주 DB 에서 읽기
+        token = start_primary_state(request.method not in self.safe_methods)
+        try :
+            response = self.get_response(request)
+            # 이번 요청에서 쓰기가 있었으면 같은 관리자의 다음 요청들도 고정 시간 동안 주 DB 사용
+            # (DRF 인증 후 request.user 에 관리자가 설정됨)
+            user = getattr(request, 'user', None)
+            if has_written() and sticky_seconds > 0 and user is not None and user.is_authenticated :
+                mark_primary_sticky(user.pk, sticky_seconds)
+            return response
+        finally :
+            reset_primary_state(token)
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import importlib.util
 from pathlib import Path
 from datetime import timedelta
 from dotenv import load_dotenv
@@ -82,6 +83,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'config.middleware.PrimaryStickinessMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -114,13 +116,47 @@ SIMPLE_JWT = {
     # refresh 토큰 갱신 시, 새 토큰 생성
     'ROTATE_REFRESH_TOKENS' : False,
     # 토큰 생성 후, 이전 토큰 블랙리스트에 추가
-    'BLACKLIST_AFTER_ROTATION' : True
+    'BLACKLIST_AFTER_ROTATION' : True,
+    # 토큰 갱신 시 블랙리스트 확인을 워커별 필터로
+    'TOKEN_REFRESH_SERIALIZER' : 'accounts.serializers.FilteredTokenRefreshSerializer',
 }
 
+# 블랙리스트 확인용 워커별 블룸 필터 (증분 갱신 / 전체 재생성 주기, 오탐률)
+TOKEN_BLACKLIST_FILTER_REFRESH_SECONDS = int(os.getenv('TOKEN_BLACKLIST_FILTER_REFRESH_SECONDS', 5))
+TOKEN_BLACKLIST_FILTER_REBUILD_SECONDS = int(os.getenv('TOKEN_BLACKLIST_FILTER_REBUILD_SECONDS', 600))
+# 증분 갱신 시 마지막 위치보다 앞에서 다시 읽는 시간 (늦게 커밋된 블랙리스트 반영)
+TOKEN_BLACKLIST_FILTER_REFRESH_OVERLAP_SECONDS = int(os.getenv('TOKEN_BLACKLIST_FILTER_REFRESH_OVERLAP_SECONDS', 60))
+TOKEN_BLACKLIST_FILTER_FALSE_POSITIVE_RATE = float(os.getenv('TOKEN_BLACKLIST_FILTER_FALSE_POSITIVE_RATE', 0.01))
+# 만료 토큰 정리 (워커별 주기, 0 이면 python manage.py prune_tokens 로만 정리)
+TOKEN_PRUNE_INTERVAL_SECONDS = int(os.getenv('TOKEN_PRUNE_INTERVAL_SECONDS', 3600))
+TOKEN_PRUNE_BATCH_SIZE = int(os.getenv('TOKEN_PRUNE_BATCH_SIZE', 1000))
+
+# 세션 내보내기 시 서버 측 커서로 한 번에 가져올 행 수
+SESSION_EXPORT_CHUNK_SIZE = int(os.getenv('SESSION_EXPORT_CHUNK_SIZE', 2000))
+
+# 스토리모드 세션 이벤트 로그 동기화 (python manage.py sync_session_events)
+SESSION_EVENT_SYNC_BATCH_SIZE = int(os.getenv('SESSION_EVENT_SYNC_BATCH_SIZE', 500))
+SESSION_EVENT_SYNC_OVERLAP_SECONDS = int(os.getenv('SESSION_EVENT_SYNC_OVERLAP_SECONDS', 60))
+# 스토리 분기 퍼널 집계 (python manage.py update_branch_funnel)
+STORY_FUNNEL_BATCH_SIZE = int(os.getenv('STORY_FUNNEL_BATCH_SIZE', 5000))
+STORY_FUNNEL_GAP_TIMEOUT_SECONDS = int(os.getenv('STORY_FUNNEL_GAP_TIMEOUT_SECONDS', 600))
+
+# 이미지 컨테이너 blob 목록 워커별 캐시 유지 시간 (다른 워커의 변경은 이 시간 이후 반영)
+BLOB_MANIFEST_TTL_SECONDS = int(os.getenv('BLOB_MANIFEST_TTL_SECONDS', 300))
+
+# 긴 스토리/시나리오 원문 분석 (기준 길이를 넘으면 조각별 요약을 동시에 실행 후 합친 요약으로 분석)
+LONG_TEXT_THRESHOLD_CHARS = int(os.getenv('LONG_TEXT_THRESHOLD_CHARS', 24000))
+LONG_TEXT_CHUNK_CHARS = int(os.getenv('LONG_TEXT_CHUNK_CHARS', 8000))
+LONG_TEXT_SUMMARY_CONCURRENCY = int(os.getenv('LONG_TEXT_SUMMARY_CONCURRENCY', 4))
+LONG_TEXT_SUMMARY_MAX_TOKENS = int(os.getenv('LONG_TEXT_SUMMARY_MAX_TOKENS', 1000))
+
+# 로그인 시도 제한 저장소 ('local' = 워커별 메모리, 그 외에는 CACHES 별칭)
+LOGIN_THROTTLE_STORE = os.getenv('LOGIN_THROTTLE_STORE', 'local')
+
 # RestFramework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES' : (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -135,6 +171,39 @@ DATABASE_PASSWORD = os.environ.get('DATABASE_PASSWORD')
 DATABASE_HOST = os.environ.get('DATABASE_HOST')
 DATABASE_PORT = os.environ.get('DATABASE_PORT')
 
+# 커넥션 풀 (psycopg 3 + psycopg_pool)
+# 별칭별 min/max 크기를 DATABASE_POOL_<ALIAS>_MIN_SIZE / _MAX_SIZE 로 설정, 체크아웃 시 상태 확인
+# 최대 커넥션 수 = gunicorn 워커 수(4) x 별칭별 MAX_SIZE 합계 -> Postgres max_connections 보다 작게 설정
+# psycopg_pool 이 없거나 DATABASE_POOL_ENABLED=false 이면 워커별 지속 커넥션(CONN_MAX_AGE) 재사용
+DATABASE_POOL_ENABLED = (
+    os.getenv('DATABASE_POOL_ENABLED', 'true').lower() == 'true'
+    and importlib.util.find_spec('psycopg_pool') is not None
+)
+DATABASE_CONN_MAX_AGE = int(os.getenv('DATABASE_CONN_MAX_AGE', 60))
+
+def get_database_pool_settings(alias) :
+    if not DATABASE_POOL_ENABLED :
+        return {
+            'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+
+    prefix = f'DATABASE_POOL_{alias.upper()}'
+    return {
+        'CONN_MAX_AGE': 0,          # 풀 사용 시 지속 커넥션 옵션은 0 이어야 함
+        'CONN_HEALTH_CHECKS': True, # 풀에서 꺼낼 때 커넥션 상태 확인
+        'OPTIONS': {
+            'pool': {
+                'name': alias,
+                'min_size': int(os.getenv(f'{prefix}_MIN_SIZE', 1)),
+                'max_size': int(os.getenv(f'{prefix}_MAX_SIZE', 2)),
+                'timeout': float(os.getenv(f'{prefix}_TIMEOUT', 10)),
+                'max_idle': float(os.getenv(f'{prefix}_MAX_IDLE', 600)),
+            },
+        },
+    }
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql_psycopg2',
@@ -143,6 +212,7 @@ DATABASES = {
         'PASSWORD' : DATABASE_PASSWORD,
         'HOST' : DATABASE_HOST,
         'PORT' : DATABASE_PORT,
+        **get_database_pool_settings('default'),
     },
     'test': {
         'ENGINE': 'django.db.backends.postgresql_psycopg2',
@@ -151,12 +221,77 @@ DATABASES = {
         'PASSWORD' : DATABASE_PASSWORD,
         'HOST' : DATABASE_HOST,
         'PORT' : DATABASE_PORT,
+        **get_database_pool_settings('test'),
     },
 }
 
+# 읽기 전용 복제본 (DATABASE_TEST_REPLICA_HOSTS=host1,host2 -> 'test_replica_1', 'test_replica_2')
+# 통계/세션 목록/카탈로그 목록 등 읽기는 복제본으로, 쓰기와 쓰기 직후 요청의 읽기는 주 DB 로
+DATABASE_REPLICAS = {}
+for primary in ('test',) :
+    hosts = [host.strip() for host in os.getenv(f'DATABASE_{primary.upper()}_REPLICA_HOSTS', '').split(',') if host.strip()]
+    for index, host in enumerate(hosts, start=1) :
+        alias = f'{primary}_replica_{index}'
+        DATABASES[alias] = {
+            **DATABASES[primary],
+            'HOST' : host,
+            **get_database_pool_settings(alias),
+            'TEST' : {'MIRROR': primary},
+        }
+        DATABASE_REPLICAS.setdefault(primary, []).append(alias)
+
+# 쓰기 후 이 시간(초) 동안 같은 관리자의 읽기를 주 DB 로 고정 (복제 지연보다 길게)
+DATABASE_PRIMARY_STICKY_SECONDS = int(os.getenv('DATABASE_PRIMARY_STICKY_SECONDS', 5))
+
 DATABASE_ROUTERS = ['config.db_routers.TestDBRouter']
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# 사용자 세션 조회 응답 캐시 백엔드 (locmem / file / db / redis)
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'db': 'django.core.cache.backends.db.DatabaseCache',       # python manage.py createcachetable 필요
+    'redis': 'django.core.cache.backends.redis.RedisCache',    # redis 패키지 필요
+}
+SESSION_CACHE_BACKEND = os.getenv('SESSION_CACHE_BACKEND', 'locmem')
+SESSION_CACHE_LOCATION = os.getenv('SESSION_CACHE_LOCATION', 'user_session_cache')
+# 진행 중 세션의 choice_history 는 변경 시각이 없으므로 TTL 로 최대 지연을 제한
+SESSION_CACHE_TIMEOUT = int(os.getenv('SESSION_CACHE_TIMEOUT', 60))
+
+# JWT 인증 시 관리자(Admin) 조회 결과 캐시
+# locmem 은 워커별 캐시라 다른 워커의 변경은 TTL 이후 반영 -> 즉시 반영이 필요하면 redis 등 공유 백엔드 사용
+PRINCIPAL_CACHE_BACKEND = os.getenv('PRINCIPAL_CACHE_BACKEND', 'locmem')
+PRINCIPAL_CACHE_LOCATION = os.getenv('PRINCIPAL_CACHE_LOCATION', 'admin_principal_cache')
+PRINCIPAL_CACHE_TIMEOUT = int(os.getenv('PRINCIPAL_CACHE_TIMEOUT', 30))
+
+# 쓰기 후 주 DB 고정 기록 (관리자 id 기준)
+# locmem 은 워커별이라 다른 워커로 간 요청은 고정되지 않음 -> 워커가 여러 개면 redis 등 공유 백엔드 사용
+DB_STICKY_CACHE_BACKEND = os.getenv('DB_STICKY_CACHE_BACKEND', 'locmem')
+DB_STICKY_CACHE_LOCATION = os.getenv('DB_STICKY_CACHE_LOCATION', 'db_sticky_cache')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'sessions': {
+        'BACKEND': CACHE_BACKENDS[SESSION_CACHE_BACKEND],
+        'LOCATION': SESSION_CACHE_LOCATION,
+        'TIMEOUT': SESSION_CACHE_TIMEOUT,
+    },
+    'principals': {
+        'BACKEND': CACHE_BACKENDS[PRINCIPAL_CACHE_BACKEND],
+        'LOCATION': PRINCIPAL_CACHE_LOCATION,
+        'TIMEOUT': PRINCIPAL_CACHE_TIMEOUT,
+    },
+    'db_sticky': {
+        'BACKEND': CACHE_BACKENDS[DB_STICKY_CACHE_BACKEND],
+        'LOCATION': DB_STICKY_CACHE_LOCATION,
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -16,6 +16,7 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from config.views import DatabasePoolStatusView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -23,4 +24,5 @@ urlpatterns = [
     path('game/', include('game.urls')),
     path('storymode/', include('storymode.urls')),
     path('user/', include('user.urls')),
+    path('status/db-pool', DatabasePoolStatusView.as_view(), name='db_pool_status'),
 ]
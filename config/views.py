@@ -0,0 +1,20 @@
+import os
+from rest_framework import status
+from django.http import JsonResponse
+from game.mixins import AuthMixin
+from config.db_pool import get_pool_stats
+
+
+# DB 커넥션 풀 상태 조회 (요청을 처리한 gunicorn 워커 기준)
+class DatabasePoolStatusView(AuthMixin) :
+    def get(self, request) :
+        try :
+            return JsonResponse({
+                'message': 'DB 커넥션 풀 상태 조회 성공',
+                'worker_pid': os.getpid(),
+                'pools': get_pool_stats(),
+            }, status=status.HTTP_200_OK)
+        except Exception as e :
+            return JsonResponse({
+                'message': f'DB 커넥션 풀 상태 조회 실패: {e}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,302 @@
+import json
+import httpx
+from asgiref.sync import sync_to_async
+from rest_framework import status
+from django.http import JsonResponse
+from game.models import Scenario, Character
+from game.serializers import ScenarioSerializer, CharacterSerializer
+from game.cache import invalidate_model
+from game.sources import hash_text, find_generated_target, mark_generated
+from game.views import (AppSettings, JSON_COMPLETION_OPTIONS, DALLE_IMAGE_OPTIONS,
+                        build_scenario_messages, save_scenario, build_character_messages, save_characters,
+                        build_character_summary_prompt, build_dalle_request_prompt)
+from config.async_views import AsyncAuthView
+from config.async_azure import get_async_azure_openai_client, AsyncAzureBlobStorageUtil, download_image
+from config.chunked_analysis import asummarize_long_text
+from config.blob_manifest import IMAGE_CACHE_CONTROL
+
+
+# 직렬화 (관계 필드 조회가 있을 수 있으므로 스레드에서 실행)
+@sync_to_async
+def serialize(serializer_class, instance, many=False) :
+    return serializer_class(instance, many=many).data
+
+# Azure Blob Storage 에 업로드된 시나리오 파일을 읽어서 DB 에 데이터 저장 (ASGI 비동기)
+class AsyncSenarioCreateView(AsyncAuthView) :
+    async def post(self, request) :
+        scenario_name = request.data.get('scenario_name')
+        blob_name = request.data.get('blob_name')
+
+        if not scenario_name or not blob_name :
+            return JsonResponse({
+                'message' : '시나리오 이름 혹은 업로드 파일 url 이 필요합니다.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # 같은 파일로 이미 생성된 시나리오가 있으면 다운로드와 AI 분석 생략
+        existing = await sync_to_async(find_generated_target)('scenario', blob_name=blob_name)
+        if existing :
+            return await self._existing_response(existing)
+
+        # 1. Azure Blob Storage 에서 파일 내용 가져오기
+        try :
+            async with AsyncAzureBlobStorageUtil(AppSettings.AZURE_BLOB_STORAGE_CONNECT_KEY_FOR_FILE) as blob_util :
+                container_client = await blob_util.get_or_create_container('scenarios')
+                scenario_text = await blob_util.download_blob_as_text(container_client, blob_name)
+        except Exception as e :
+            print(f"🛑 오류: Azure Blob Storage에서 파일을 다운로드하는 데 실패했습니다. 오류: {e}")
+            return JsonResponse({
+                'message' : '파일 다운로드 실패'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        # 다른 이름으로 올라온 같은 내용의 파일도 재사용
+        content_hash = hash_text(scenario_text)
+        existing = await sync_to_async(find_generated_target)('scenario', content_hash=content_hash)
+        if existing :
+            return await self._existing_response(existing)
+
+        # 2. Azure OpenAI 클라이언트 초기화
+        client = get_async_azure_openai_client(
+            AppSettings.AZURE_OPENAI_API_KEY,
+            AppSettings.AZURE_OPENAI_ENDPOINT,
+            AppSettings.AZURE_OPENAI_VERSION
+        )
+
+        if not client :
+            return JsonResponse({
+                'message': 'AI 서비스 연결 실패: OpenAI 클라이언트 초기화 오류'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        # 3. Azure OpenAI 요청 (응답을 기다리는 동안 다른 요청 처리, 긴 원문은 조각별 요약을 동시에 실행 후 합쳐서 사용)
+        try :
+            async with client :
+                source_text = await asummarize_long_text(client, AppSettings.AZURE_OPENAI_DEPLOYMENT, scenario_text)
+                response = await client.chat.completions.create(
+                    model=AppSettings.AZURE_OPENAI_DEPLOYMENT,
+                    messages=build_scenario_messages(source_text),
+                    **JSON_COMPLETION_OPTIONS
+                )
+            senario_json = json.loads(response.choices[0].message.content)
+        except Exception as e :
+            print(f"🛑 오류: AI를 호출하는 중에 오류가 발생했습니다: {e}")
+            return JsonResponse({
+                'message': f'AI 처리 중 오류 발생: {e}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        # 4. AI 응답 데이터 DB 저장
+        try :
+            scenario, created = await sync_to_async(save_scenario)(scenario_name, senario_json)
+            await sync_to_async(mark_generated)('scenario', content_hash, blob_name, scenario.id)
+            data = await serialize(ScenarioSerializer, scenario)
+
+            if created :
+                message = '새로운 시나리오가 성공적으로 저장되었습니다.'
+                status_code = status.HTTP_201_CREATED
+            else :
+                message = '이미 존재하는 시나리오입니다.'
+                status_code = status.HTTP_200_OK
+
+            return JsonResponse({
+                'message' : message,
+                'data' : data,
+            }, status=status_code)
+        except Exception as e :
+            print(f"🛑 오류: AI 응답 데이터를 DB에 저장하는 데 실패했습니다. 오류: {e}")
+            return JsonResponse({
+                'message' : 'AI 응답 데이터 DB 저장 실패',
+                'ai_response' : senario_json
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    async def _existing_response(self, scenario) :
+        return JsonResponse({
+            'message' : '같은 파일로 생성된 시나리오가 있습니다.',
+            'data' : await serialize(ScenarioSerializer, scenario),
+        }, status=status.HTTP_200_OK)
+
+# 캐릭터 생성 (ASGI 비동기)
+class AsyncCharacterCreateView(AsyncAuthView) :
+    async def post(self, request) :
+        scenario_id = request.data.get('scenario_id')
+        description = request.data.get('description')
+
+        if not scenario_id or not description :
+            return JsonResponse({
+                'message' : '시나리오 정보가 필요합니다.',
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # 1. 시나리오 DB 정보 조회
+        try :
+            scenario = await Scenario.objects.aget(id=scenario_id)
+        except Exception as e :
+            return JsonResponse({
+                'message' : '시나리오 조회 실패'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        # 2. Azure OpenAI 클라이언트 초기화
+        client = get_async_azure_openai_client(
+            AppSettings.AZURE_OPENAI_API_KEY,
+            AppSettings.AZURE_OPENAI_ENDPOINT,
+            AppSettings.AZURE_OPENAI_VERSION
+        )
+
+        if not client :
+            return JsonResponse({
+                'message': 'AI 서비스 연결 실패: OpenAI 클라이언트 초기화 오류'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        # 3. Azure OpenAI 요청
+        try :
+            async with client :
+                response = await client.chat.completions.create(
+                    model=AppSettings.AZURE_OPENAI_DEPLOYMENT,
+                    messages=build_character_messages(scenario),
+                    **JSON_COMPLETION_OPTIONS
+                )
+            characters_data = json.loads(response.choices[0].message.content).get('characters', [])
+            if not characters_data :
+                return JsonResponse({
+                    'message': f'AI 가 캐릭터 데이터를 생성하지 못했습니다.'
+                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        except Exception as e :
+            print(f"🛑 오류: AI를 호출하는 중에 오류가 발생했습니다: {e}")
+            return JsonResponse({
+                'message': f'AI 처리 중 오류 발생: {e}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        # 4. AI 응답 데이터 DB 저장
+        try :
+            created_characters, created = await sync_to_async(save_characters)(scenario, characters_data)
+            data = await serialize(CharacterSerializer, created_characters, many=True)
+
+            if created :
+                message = '캐릭터가 성공적으로 저장되었습니다.'
+                status_code = status.HTTP_201_CREATED
+            else :
+                message = '이미 존재하는 캐릭터입니다.'
+                status_code = status.HTTP_200_OK
+
+            return JsonResponse({
+                'message' : message,
+                'characters' : [data]
+            }, status=status_code)
+        except Exception as e :
+            print(f"🛑 오류: AI 응답 데이터를 DB에 저장하는 데 실패했습니다. 오류: {e}")
+            return JsonResponse({
+                'message' : 'AI 응답 데이터 DB 저장 실패',
+                'ai_response' : characters_data
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# 캐릭터 이미지 생성 (ASGI 비동기)
+class AsyncCharacterImageCreateView(AsyncAuthView) :
+    async def put(self, request, character_id) :
+        scenario_title = request.data.get('scenario_title')
+        character_name = request.data.get('character_name')
+        character_role = request.data.get('character_role')
+        character_description = request.data.get('character_description')
+
+        if not all([character_id, scenario_title, character_name, character_role, character_description]):
+            return JsonResponse({
+                "error": "필수 요청 파라미터(character_id, scenario_title, character_name, character_role, character_description)가 누락되었습니다."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        container_name = scenario_title.lower().replace(' ', '-')
+        blob_name = f'{character_name}.png'
+
+        try :
+            async with AsyncAzureBlobStorageUtil(AppSettings.AZURE_BLOB_STORAGE_CONNECT_KEY_FOR_IMAGE) as blob_util :
+                container_client = await blob_util.get_or_create_container(container_name, public=True)
+                blob_client = container_client.get_blob_client(blob=blob_name)
+
+                # 기존 이미지는 ETag 버전 URL 을 그대로 사용 (내용이 같으면 URL 도 같아 캐시 유지)
+                existing_image_url = await blob_util.get_existing_blob_url(container_client, blob_name, versioned=True)
+                if existing_image_url :
+                    await self._update_character_image_path(character_id, existing_image_url)
+                    return JsonResponse({
+                        'message': '이미지 생성 완료 (기존 이미지 사용)',
+                        'character_id': character_id,
+                        'image_url': existing_image_url,
+                    }, status=status.HTTP_200_OK)
+
+                temp_image_url = await self._generate_image(character_name, character_role, character_description, character_id)
+                try :
+                    image_data = await download_image(temp_image_url)
+                except httpx.HTTPError as e :
+                    raise Exception(f"생성된 이미지 다운로드 실패 (Character ID: {character_id}): {e}")
+                final_image_url = await blob_util.upload_blob(blob_client, image_data, content_type='image/png', cache_control=IMAGE_CACHE_CONTROL, versioned=True)
+
+            await self._update_character_image_path(character_id, final_image_url)
+
+            return JsonResponse({
+                'message': '이미지 개별 생성 및 업로드 완료',
+                'character_id': character_id,
+                'image_url': final_image_url,
+            }, status=status.HTTP_200_OK)
+        except Exception as e:
+            return JsonResponse({
+                'message': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    # 캐릭터 요약 -> DALL-E 프롬프트 -> 이미지 생성 (임시 이미지 URL 반환)
+    async def _generate_image(self, character_name, character_role, character_description, character_id) :
+        gpt_client = get_async_azure_openai_client(
+            AppSettings.AZURE_OPENAI_API_KEY,
+            AppSettings.AZURE_OPENAI_ENDPOINT,
+            AppSettings.AZURE_OPENAI_VERSION
+        )
+        dalle_client = get_async_azure_openai_client(
+            AppSettings.AZURE_OPENAI_DALLE_APIKEY,
+            AppSettings.AZURE_OPENAI_DALLE_ENDPOINT,
+            AppSettings.AZURE_OPENAI_DALLE_VERSION
+        )
+        if not gpt_client or not dalle_client :
+            raise Exception('AI 서비스 연결 실패: OpenAI 클라이언트 초기화 오류')
+
+        async with gpt_client, dalle_client :
+            # GPT 를 사용하여 캐릭터 정보 생성 (실패 시 기본 정보 사용)
+            try :
+                response = await gpt_client.chat.completions.create(
+                    model=AppSettings.AZURE_OPENAI_DEPLOYMENT,
+                    messages=[{"role": "user", "content": build_character_summary_prompt(character_name, character_role, character_description)}],
+                    temperature=0.5,
+                    max_tokens=150
+                )
+                character_info = response.choices[0].message.content.strip()
+            except Exception as e :
+                print(f"🛑 오류: 동적 캐릭터 정보 생성 실패: {e}. 기본 정보를 사용합니다.")
+                character_info = "A group of adventurers."
+
+            # GPT 를 사용하여 DALL-E 프롬프트 생성
+            try :
+                gpt_response = await gpt_client.chat.completions.create(
+                    model=AppSettings.AZURE_OPENAI_DEPLOYMENT,
+                    messages=[{"role": "user", "content": build_dalle_request_prompt(character_info)}],
+                    temperature=0.7,
+                    max_tokens=250
+                )
+                dalle_prompt = gpt_response.choices[0].message.content.strip()
+            except Exception as e :
+                raise Exception(f"GPT 프롬프트 생성 실패: {e}")
+
+            # DALL-E 3를 사용하여 이미지 생성
+            try :
+                dalle_response = await dalle_client.images.generate(
+                    model=AppSettings.AZURE_OPENAI_DALLE_DEPLOYMENT,
+                    prompt=dalle_prompt,
+                    **DALLE_IMAGE_OPTIONS
+                )
+                temp_image_url = dalle_response.data[0].url if dalle_response.data else None
+            except Exception as e :
+                raise Exception(f"DALL-E 3 이미지 생성 실패 (Character ID: {character_id}): {e}")
+
+        if not temp_image_url :
+            raise Exception("DALL-E 3 이미지 생성 실패: 이미지 URL을 가져올 수 없습니다.")
+        return temp_image_url
+
+    # Character DB의 image_path 업데이트
+    async def _update_character_image_path(self, character_id, image_path) :
+        try :
+            updated = await Character.objects.filter(id=character_id).aupdate(image_path=image_path)
+            if not updated :
+                raise Character.DoesNotExist(f'Character {character_id} 없음')
+            await sync_to_async(invalidate_model)(Character)
+        except Exception as e :
+            raise Exception(f"DB 업데이트 실패 (Character ID: {character_id}): {e}")
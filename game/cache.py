@@ -0,0 +1,72 @@
+import threading
+from django.db import IntegrityError, router, transaction
+from django.db.models import F
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from game.models import CacheVersion
+
+
+# 워커(프로세스) 단위 카탈로그 캐시 {key: (version, data)}
+_catalog_cache = {}
+_catalog_cache_lock = threading.Lock()
+
+# 모델의 캐시 키 (테이블 이름)
+def get_cache_key(model) :
+    return model._meta.db_table
+
+# 현재 버전 조회 (버전 행이 없으면 0)
+def get_version(key) :
+    version = CacheVersion.objects.filter(key=key).values_list('version', flat=True).first()
+    return version or 0
+
+# 버전 증가 -> 모든 워커의 캐시가 다음 조회 시 무효화됨
+def bump_version(key) :
+    updated = CacheVersion.objects.filter(key=key).update(version=F('version') + 1)
+    if updated :
+        return
+
+    # 버전 행이 아직 없으면 생성 (동시에 생성된 경우 다시 증가)
+    try :
+        with transaction.atomic(using=router.db_for_write(CacheVersion)) :
+            CacheVersion.objects.create(key=key, version=1)
+    except IntegrityError :
+        CacheVersion.objects.filter(key=key).update(version=F('version') + 1)
+
+# 모델 변경 시 호출
+def invalidate_model(model) :
+    try :
+        bump_version(get_cache_key(model))
+    except Exception as e :
+        print(f'🛑 오류: {model.__name__} 캐시 버전 갱신 실패: {e}')
+
+# 버전이 같으면 캐시된 데이터를, 다르면 builder 결과를 캐시 후 반환
+def get_or_build(key, builder, version=None) :
+    if version is None :
+        version = get_version(key)
+
+    cached = _catalog_cache.get(key)
+    if cached and cached[0] == version :
+        return cached[1]
+
+    # 조회 전에 읽은 버전으로 저장하므로, 조회 중 변경이 생겨도 다음 요청에서 다시 만들어짐
+    data = builder()
+    with _catalog_cache_lock :
+        _catalog_cache[key] = (version, data)
+    return data
+
+# 버전 기반 강한 ETag (예: "character-<scenario_id>-v3")
+def make_etag(key, version, *extra) :
+    return quote_etag('-'.join([key, *[str(value) for value in extra], f'v{version}']))
+
+# If-None-Match 가 현재 ETag 와 일치하면 304 응답, 아니면 None
+def get_not_modified_response(request, etag) :
+    response = get_conditional_response(request, etag=etag)
+    if response is not None :
+        set_etag_headers(response, etag)
+    return response
+
+# 응답에 ETag 와 재검증 헤더 설정 (항상 서버에 버전 확인)
+def set_etag_headers(response, etag) :
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,222 @@
+import io
+import csv
+import json
+import zipfile
+from django.db import connections, router, transaction
+from django.utils import timezone
+from game.models import Genre, Difficulty, Mode, Scenario, Character
+from game.cache import invalidate_model
+from storymode.models import Story, StorymodeMoment, StorymodeChoice
+
+
+# 카탈로그 아카이브 형식 버전 (컬럼 구성이 바뀌면 올림)
+CATALOG_FORMAT_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+
+# COPY / CSV 에서 NULL 표시 (빈 문자열과 구분)
+NULL_MARKER = '\\N'
+
+# 불러올 때 FK 순서 (Story.start_moment 는 분기점 이후 별도로 갱신)
+CATALOG_MODELS = [Genre, Difficulty, Mode, Scenario, Character, Story, StorymodeMoment, StorymodeChoice]
+STORY_START_MOMENT_FILE = 'story_start_moment.csv'
+
+BULK_CREATE_BATCH_SIZE = 5000
+
+
+def get_file_name(model) :
+    return f'{model._meta.db_table}.csv'
+
+# 아카이브에 저장할 컬럼 (Story.start_moment 는 순환 FK 이므로 제외)
+def get_export_fields(model) :
+    return [
+        field for field in model._meta.concrete_fields
+        if not (model is Story and field.name == 'start_moment')
+    ]
+
+def get_catalog_db(database=None) :
+    return database or router.db_for_write(Genre)
+
+# CSV 셀 값 (COPY FROM ... WITH (FORMAT csv) 가 그대로 읽을 수 있는 형식)
+def to_csv_value(field, value) :
+    if value is None :
+        return NULL_MARKER
+    if field.get_internal_type() == 'JSONField' :
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, bool) :
+        return 't' if value else 'f'
+    if hasattr(value, 'isoformat') :
+        return value.isoformat()
+    return str(value)
+
+def from_csv_value(field, value) :
+    if value == NULL_MARKER :
+        return None
+    if field.get_internal_type() == 'JSONField' :
+        return json.loads(value)
+    return field.to_python(value)
+
+def write_table(archive, name, header, rows) :
+    with archive.open(name, 'w') as raw :
+        with io.TextIOWrapper(raw, encoding='utf-8', newline='') as text :
+            writer = csv.writer(text)
+            writer.writerow(header)
+            count = 0
+            for row in rows :
+                writer.writerow(row)
+                count += 1
+    return count
+
+# 카탈로그 전체를 zip 아카이브로 저장 (테이블별 CSV + manifest.json)
+def export_catalog(path, database=None, on_progress=None) :
+    database = get_catalog_db(database)
+    counts = {}
+
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive :
+        for model in CATALOG_MODELS :
+            fields = get_export_fields(model)
+            queryset = model.objects.using(database).order_by('pk').values_list(*[field.attname for field in fields])
+            rows = (
+                [to_csv_value(field, value) for field, value in zip(fields, row)]
+                for row in queryset.iterator(chunk_size=BULK_CREATE_BATCH_SIZE)
+            )
+            counts[model._meta.db_table] = write_table(archive, get_file_name(model), [field.column for field in fields], rows)
+            if on_progress :
+                on_progress(model._meta.db_table, counts[model._meta.db_table])
+
+        start_moments = Story.objects.using(database).filter(start_moment__isnull=False).order_by('pk').values_list('id', 'start_moment_id')
+        counts[STORY_START_MOMENT_FILE] = write_table(
+            archive, STORY_START_MOMENT_FILE, ['id', 'start_moment_id'],
+            ([str(story_id), str(moment_id)] for story_id, moment_id in start_moments.iterator())
+        )
+
+        archive.writestr(MANIFEST_NAME, json.dumps({
+            'format_version': CATALOG_FORMAT_VERSION,
+            'exported_at': timezone.now().isoformat(),
+            'database': database,
+            'tables': [model._meta.db_table for model in CATALOG_MODELS],
+            'columns': {model._meta.db_table: [field.column for field in get_export_fields(model)] for model in CATALOG_MODELS},
+            'counts': counts,
+        }, ensure_ascii=False, indent=2))
+
+    return counts
+
+def read_manifest(archive) :
+    try :
+        manifest = json.loads(archive.read(MANIFEST_NAME))
+    except KeyError :
+        raise ValueError(f'{MANIFEST_NAME} 이 없는 아카이브입니다.')
+    if manifest.get('format_version') != CATALOG_FORMAT_VERSION :
+        raise ValueError(
+            f"지원하지 않는 아카이브 버전입니다: {manifest.get('format_version')} (현재 {CATALOG_FORMAT_VERSION})"
+        )
+    return manifest
+
+# 대상 DB 에 이미 있는 id 수 (COPY 는 충돌 행을 건너뛸 수 없으므로 미리 확인)
+def count_existing_ids(archive, model, database) :
+    with archive.open(get_file_name(model)) as raw :
+        reader = csv.reader(io.TextIOWrapper(raw, encoding='utf-8', newline=''))
+        header = next(reader)
+        pk_index = header.index(model._meta.pk.column)
+        ids = [row[pk_index] for row in reader]
+
+    existing = 0
+    for start in range(0, len(ids), BULK_CREATE_BATCH_SIZE) :
+        existing += model.objects.using(database).filter(pk__in=ids[start:start + BULK_CREATE_BATCH_SIZE]).count()
+    return existing
+
+# PostgreSQL COPY FROM STDIN 으로 CSV 그대로 적재
+def copy_table(connection, model, archive, columns) :
+    quote_name = connection.ops.quote_name
+    sql = (
+        f'COPY {quote_name(model._meta.db_table)} ({", ".join(quote_name(column) for column in columns)}) '
+        f"FROM STDIN WITH (FORMAT csv, HEADER true, NULL '{NULL_MARKER}')"
+    )
+    with archive.open(get_file_name(model)) as raw, connection.cursor() as cursor :
+        if hasattr(cursor.cursor, 'copy') :
+            # psycopg 3
+            with cursor.cursor.copy(sql) as copy :
+                while chunk := raw.read(1024 * 1024) :
+                    copy.write(chunk)
+        else :
+            # psycopg2
+            cursor.cursor.copy_expert(sql, io.TextIOWrapper(raw, encoding='utf-8', newline=''))
+        return cursor.cursor.rowcount
+
+# COPY 를 쓸 수 없으면 (다른 DB, 기존 행 건너뛰기) 큰 배치의 bulk_create 로 적재, 실제로 추가한 행의 id 목록 반환
+def bulk_create_table(model, archive, database, ignore_conflicts=False) :
+    fields_by_column = {field.column: field for field in model._meta.concrete_fields}
+    inserted_ids = []
+
+    # 기존 행을 건너뛸 때는 배치마다 이미 있는 id 를 빼고 추가 (건너뛴 행이 추가 건수에 섞이지 않도록)
+    def create_batch(batch) :
+        if ignore_conflicts :
+            existing = {str(pk) for pk in model.objects.using(database).filter(pk__in=[obj.pk for obj in batch]).values_list('pk', flat=True)}
+            batch = [obj for obj in batch if str(obj.pk) not in existing]
+        model.objects.using(database).bulk_create(batch, ignore_conflicts=ignore_conflicts)
+        inserted_ids.extend(str(obj.pk) for obj in batch)
+
+    with archive.open(get_file_name(model)) as raw :
+        reader = csv.reader(io.TextIOWrapper(raw, encoding='utf-8', newline=''))
+        fields = [fields_by_column[column] for column in next(reader)]
+        batch = []
+        for row in reader :
+            batch.append(model(**{field.attname: from_csv_value(field, value) for field, value in zip(fields, row)}))
+            if len(batch) >= BULK_CREATE_BATCH_SIZE :
+                create_batch(batch)
+                batch = []
+        if batch :
+            create_batch(batch)
+    return inserted_ids
+
+# 스토리 시작 분기점 연결 (story_ids 가 주어지면 이번에 추가한 스토리만, 건너뛴 기존 스토리는 그대로 둠)
+def update_start_moments(archive, database, story_ids=None) :
+    with archive.open(STORY_START_MOMENT_FILE) as raw :
+        reader = csv.reader(io.TextIOWrapper(raw, encoding='utf-8', newline=''))
+        next(reader)
+        stories = [
+            Story(id=story_id, start_moment_id=moment_id) for story_id, moment_id in reader
+            if story_ids is None or story_id in story_ids
+        ]
+    Story.objects.using(database).bulk_update(stories, ['start_moment'], batch_size=BULK_CREATE_BATCH_SIZE)
+    return len(stories)
+
+# 아카이브를 FK 순서대로 한 트랜잭션에서 적재 (UUID 유지)
+def import_catalog(path, database=None, skip_existing=False, on_progress=None) :
+    database = get_catalog_db(database)
+    connection = connections[database]
+    counts = {}
+
+    with zipfile.ZipFile(path) as archive :
+        manifest = read_manifest(archive)
+
+        for model in CATALOG_MODELS :
+            existing = count_existing_ids(archive, model, database)
+            if existing and not skip_existing :
+                raise ValueError(
+                    f'{model._meta.db_table} 에 이미 존재하는 id 가 {existing}개 있습니다. '
+                    f'--skip-existing 옵션으로 기존 행을 건너뛸 수 있습니다.'
+                )
+            counts[model._meta.db_table] = existing
+
+        inserted_story_ids = None
+        with transaction.atomic(using=database) :
+            for model in CATALOG_MODELS :
+                table = model._meta.db_table
+                # 기존 행이 없으면 COPY, 있으면 기존 행을 건너뛰는 bulk_create (추가한 행 수만 집계)
+                if connection.vendor == 'postgresql' and not counts[table] :
+                    loaded = copy_table(connection, model, archive, manifest['columns'][table])
+                else :
+                    inserted_ids = bulk_create_table(model, archive, database, ignore_conflicts=bool(counts[table]))
+                    if model is Story and counts[table] :
+                        inserted_story_ids = set(inserted_ids)
+                    loaded = len(inserted_ids)
+                counts[table] = loaded
+                if on_progress :
+                    on_progress(table, loaded)
+
+            counts[STORY_START_MOMENT_FILE] = update_start_moments(archive, database, inserted_story_ids)
+
+    # 워커 캐시에 남은 목록 무효화
+    for model in (Genre, Difficulty, Mode, Scenario, Character, Story) :
+        invalidate_model(model)
+    return counts
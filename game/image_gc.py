@@ -0,0 +1,206 @@
+import urllib.parse
+from datetime import timedelta
+from django.utils import timezone
+from azure.storage.blob import BlobServiceClient
+from game.models import Scenario, Character
+from storymode.models import Story, StorymodeMoment
+from config.blob_manifest import notify_change
+
+
+# Blob Batch API 한 요청에 담을 수 있는 최대 삭제 수
+BLOB_BATCH_SIZE = 256
+
+# 업로드 후 DB 에 image_path 가 저장되기 전의 blob 을 지우지 않도록 이보다 최근 blob 은 건너뜀
+DEFAULT_MIN_AGE_MINUTES = 60
+
+# 배치 삭제 하위 응답 중 삭제로 보는 상태 (404 는 이미 없는 blob)
+DELETED_STATUS_CODES = (202, 404)
+
+# 원본 파일 컨테이너 (파일 계정과 이미지 계정이 같아도 기본 정리 대상에서 제외, --container 로 지정해야만 확인)
+SOURCE_FILE_CONTAINERS = ('scenarios', 'stories')
+
+# image_path 를 가진 모델과 살아 있는 행 조건
+# soft delete 된 행은 복구될 수 있으므로 기본적으로 이미지를 남기고, purge_deleted 일 때만 이미지 삭제 + image_path 비움
+IMAGE_SOURCES = [
+    (Scenario, {'is_deleted': False}),
+    (Character, {'is_deleted': False, 'scenario__is_deleted': False}),
+    (Story, {'is_deleted': False}),
+    (StorymodeMoment, {'story__is_deleted': False}),
+]
+
+
+# URL 을 비교용 경로로 변환 (호스트/쿼리 스트링 무시, 퍼센트 인코딩 해제)
+# Azurite 처럼 경로에 계정 이름이 들어가는 경우도 컨테이너 URL 기준으로 같은 형태가 됨
+def normalize_image_path(url) :
+    return urllib.parse.unquote(urllib.parse.urlparse(url).path).rstrip('/')
+
+def get_image_rows(model) :
+    return model.objects.filter(image_path__isnull=False).exclude(image_path='')
+
+# DB 에서 참조 중인 이미지 경로 집합 (live_only 가 아니면 soft delete 된 행도 포함)
+def collect_referenced_paths(live_only=False) :
+    referenced = set()
+    for model, live_filter in IMAGE_SOURCES :
+        queryset = get_image_rows(model)
+        if live_only :
+            queryset = queryset.filter(**live_filter)
+        for image_path in queryset.values_list('image_path', flat=True).iterator(chunk_size=5000) :
+            referenced.add(normalize_image_path(image_path))
+    return referenced
+
+# 이미지 생성 뷰가 시나리오/스토리 제목으로 만드는 컨테이너 이름
+def get_image_container_name(title) :
+    return title.lower().replace(' ', '-')
+
+# 기본 정리 대상 컨테이너: 시나리오/스토리 제목 컨테이너와 image_path 가 가리키는 컨테이너 중 실제로 있는 것
+def collect_image_containers(blob_service_client) :
+    names = set()
+    for model in (Scenario, Story) :
+        names.update(get_image_container_name(title) for title in model.objects.values_list('title', flat=True).iterator(chunk_size=5000))
+    for model, _ in IMAGE_SOURCES :
+        for image_path in get_image_rows(model).values_list('image_path', flat=True).iterator(chunk_size=5000) :
+            location = split_image_path(blob_service_client.url, image_path)
+            if location :
+                names.add(location[0])
+
+    names -= set(SOURCE_FILE_CONTAINERS)
+    return [container.name for container in blob_service_client.list_containers() if container.name in names]
+
+# soft delete 된 행 중 살아 있는 행과 이미지를 공유하지 않는 행 [(모델 이름, 행)]
+def collect_deleted_image_rows() :
+    live_paths = collect_referenced_paths(live_only=True)
+    rows = []
+    for model, live_filter in IMAGE_SOURCES :
+        for row in get_image_rows(model).exclude(**live_filter).only('pk', 'image_path').iterator(chunk_size=2000) :
+            if normalize_image_path(row.image_path) not in live_paths :
+                rows.append((model.__name__, row))
+    return rows
+
+# 컨테이너 목록을 페이지 단위로 읽으며 참조되지 않은 blob 이름을 chunk_size 씩 반환
+def iter_orphan_chunks(container_client, referenced, min_age_minutes=DEFAULT_MIN_AGE_MINUTES, chunk_size=BLOB_BATCH_SIZE, stats=None) :
+    container_path = normalize_image_path(container_client.url)
+    cutoff = timezone.now() - timedelta(minutes=min_age_minutes)
+    stats = stats if stats is not None else {}
+    chunk = []
+
+    for blob in container_client.list_blobs() :
+        stats['scanned'] = stats.get('scanned', 0) + 1
+        if f'{container_path}/{blob.name}' in referenced :
+            continue
+        if blob.last_modified and blob.last_modified > cutoff :
+            stats['skipped_recent'] = stats.get('skipped_recent', 0) + 1
+            continue
+        chunk.append(blob.name)
+        if len(chunk) >= chunk_size :
+            yield chunk
+            chunk = []
+    if chunk :
+        yield chunk
+
+# Blob Batch API 로 한 번에 삭제 (batch_size 개씩), {blob 이름: 상태 코드} 반환 (202 삭제, 404 이미 없음)
+def delete_blob_batch(container_client, blob_names, batch_size=BLOB_BATCH_SIZE) :
+    blob_names = list(dict.fromkeys(blob_names))
+    statuses = {}
+    for start in range(0, len(blob_names), batch_size) :
+        chunk = blob_names[start:start + batch_size]
+        responses = container_client.delete_blobs(*chunk, raise_on_any_failure=False)
+        for blob_name, response in zip(chunk, responses) :
+            statuses[blob_name] = response.status_code
+    # 배치마다 한 번만 다른 워커의 목록 캐시 무효화
+    if any(status_code in DELETED_STATUS_CODES for status_code in statuses.values()) :
+        notify_change(container_client)
+    return statuses
+
+# image_path 를 (컨테이너, blob 이름) 으로 분리 (계정 URL 경로 접두사는 제외, 형식이 다르면 None)
+def split_image_path(account_url, image_path) :
+    account_path = normalize_image_path(account_url)
+    path = normalize_image_path(image_path)
+    if account_path and path.startswith(f'{account_path}/') :
+        path = path[len(account_path):]
+    parts = path.lstrip('/').split('/', 1)
+    if len(parts) < 2 or not all(parts) :
+        return None
+    return parts[0], parts[1]
+
+# 여러 행의 이미지를 컨테이너별 Blob Batch 로 삭제하고, 삭제된(또는 이미 없던) 행만 모델별 한 번의 bulk_update 로 image_path 를 비움
+# 항목별 결과 [{'type', 'id', 'image_path', 'status'}] 반환 (status: deleted / not_found / failed / invalid_path / no_image)
+# rows 는 (항목 종류, 모델 인스턴스) 목록
+def delete_row_images(blob_service_client, rows) :
+    results = []
+    by_container = {}
+    for row_type, row in rows :
+        result = {'type': row_type, 'id': str(row.pk), 'image_path': row.image_path}
+        results.append(result)
+        if not row.image_path :
+            result['status'] = 'no_image'
+            continue
+        location = split_image_path(blob_service_client.url, row.image_path)
+        if not location :
+            result['status'] = 'invalid_path'
+            continue
+        by_container.setdefault(location[0], []).append((row, result, location[1]))
+
+    cleared = {}
+    for container_name, items in by_container.items() :
+        container_client = blob_service_client.get_container_client(container_name)
+        try :
+            statuses = delete_blob_batch(container_client, [blob_name for _, _, blob_name in items])
+        except Exception as e :
+            print(f'🛑 오류: 이미지 일괄 삭제 실패 ({container_name}): {e}')
+            statuses = {}
+        for row, result, blob_name in items :
+            status_code = statuses.get(blob_name)
+            if status_code in DELETED_STATUS_CODES :
+                result['status'] = 'deleted' if status_code == 202 else 'not_found'
+                row.image_path = None
+                cleared.setdefault(type(row), []).append(row)
+            else :
+                result['status'] = 'failed'
+
+    for model, model_rows in cleared.items() :
+        model.objects.bulk_update(model_rows, ['image_path'])
+    return results
+
+# 상태별 항목 수
+def count_image_results(results) :
+    counts = {}
+    for result in results :
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    return counts
+
+# 이미지 컨테이너를 돌며 DB 에서 참조하지 않는 blob 삭제 (dry_run 이면 목록만 집계)
+# containers 를 지정하지 않으면 이미지 뷰가 쓰는 컨테이너만 확인 (같은 계정의 다른 컨테이너는 건드리지 않음)
+# purge_deleted 면 먼저 soft delete 된 행의 이미지를 지우고 image_path 를 비움 (복구해도 이미지는 돌아오지 않음)
+def collect_image_garbage(connection_string, containers=None, dry_run=False, purge_deleted=False,
+                          min_age_minutes=DEFAULT_MIN_AGE_MINUTES, batch_size=BLOB_BATCH_SIZE, on_progress=None) :
+    blob_service_client = BlobServiceClient.from_connection_string(connection_string)
+    stats = {'containers': 0, 'purged_rows': 0, 'scanned': 0, 'skipped_recent': 0, 'orphaned': 0, 'deleted': 0, 'failed': 0}
+
+    if purge_deleted :
+        deleted_rows = collect_deleted_image_rows()
+        if dry_run :
+            stats['purged_rows'] = len(deleted_rows)
+        else :
+            for start in range(0, len(deleted_rows), batch_size) :
+                results = delete_row_images(blob_service_client, deleted_rows[start:start + batch_size])
+                stats['purged_rows'] += len([result for result in results if result['status'] in ('deleted', 'not_found')])
+
+    # image_path 를 비우지 못한 행은 계속 참조로 계산 (dry_run 이면 삭제 예정인 soft delete 행의 이미지도 정리 대상으로 집계)
+    referenced = collect_referenced_paths(live_only=purge_deleted and dry_run)
+    stats['referenced'] = len(referenced)
+    container_names = containers or collect_image_containers(blob_service_client)
+    for container_name in container_names :
+        container_client = blob_service_client.get_container_client(container_name)
+        stats['containers'] += 1
+
+        for chunk in iter_orphan_chunks(container_client, referenced, min_age_minutes, batch_size, stats) :
+            stats['orphaned'] += len(chunk)
+            failed = []
+            if not dry_run :
+                statuses = delete_blob_batch(container_client, chunk, batch_size)
+                failed = [blob_name for blob_name in chunk if statuses.get(blob_name) not in DELETED_STATUS_CODES]
+                stats['deleted'] += len(chunk) - len(failed)
+                stats['failed'] += len(failed)
+            if on_progress :
+                on_progress(container_name, chunk, failed)
+    return stats
@@ -0,0 +1,260 @@
+import time
+import uuid
+from statistics import median
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router
+from game.models import Character, GameRoomSelectScenario, SinglemodeSession, MultimodeSession
+from storymode.models import StorymodeMoment, StorymodeChoice, StorymodeSession
+from user.models import User
+
+
+# 조회 예시 값 (EXPLAIN 용)
+SAMPLE_ID = uuid.UUID(int=0)
+
+# 각 View 가 필요로 하는 인덱스 (게임 테이블은 managed = False 라 Django 가 인덱스를 만들지 않음)
+# - 장르/모드/난이도/시나리오/스토리 는 행 수가 매우 적어 is_deleted 인덱스보다 순차 스캔이 빠르므로 제외
+REQUIRED_INDEXES = [
+    {
+        'model': User,
+        'columns': ['is_deleted'],
+        'used_by': 'UserListView',
+        'sample': lambda : User.objects.filter(is_deleted=False),
+    },
+    {
+        'model': Character,
+        'columns': ['scenario_id', 'is_deleted'],
+        'used_by': 'CharacterListView',
+        'sample': lambda : Character.objects.filter(scenario_id=SAMPLE_ID, is_deleted=False),
+    },
+    {
+        'model': SinglemodeSession,
+        'columns': ['user_id', 'started_at'],
+        'used_by': 'SinglemodeSessionListView',
+        'sample': lambda : SinglemodeSession.objects.filter(user_id=SAMPLE_ID).order_by('-started_at'),
+    },
+    {
+        'model': MultimodeSession,
+        'columns': ['user_id', 'started_at'],
+        'used_by': 'MultimodeSessionListView',
+        'sample': lambda : MultimodeSession.objects.filter(user_id=SAMPLE_ID).order_by('-started_at'),
+    },
+    {
+        'model': StorymodeSession,
+        'columns': ['user_id', 'updated_at'],
+        'used_by': 'UserStorySessionListView',
+        'sample': lambda : StorymodeSession.objects.filter(user_id=SAMPLE_ID).order_by('-updated_at'),
+    },
+    {
+        'model': StorymodeMoment,
+        'columns': ['story_id'],
+        'used_by': 'StoryListView',
+        'sample': lambda : StorymodeMoment.objects.filter(story_id=SAMPLE_ID),
+    },
+    {
+        'model': StorymodeChoice,
+        'columns': ['moment_id'],
+        'used_by': 'StoryListView, UserStorySessionListView',
+        'sample': lambda : StorymodeChoice.objects.filter(moment_id=SAMPLE_ID),
+    },
+    {
+        'model': GameRoomSelectScenario,
+        'columns': ['gameroom_id', 'scenario_id'],
+        'used_by': 'MultimodeSessionListView',
+        'sample': lambda : GameRoomSelectScenario.objects.filter(gameroom_id=SAMPLE_ID, scenario_id=SAMPLE_ID),
+    },
+]
+
+# JSON 포함 검색 (@>) 용 GIN 인덱스 (SessionHistorySearchView)
+# - jsonb_path_ops 는 @> 만 지원하지만 기본 jsonb_ops 보다 작고 빠름
+SAMPLE_CONTAINS = {'sample': True}
+for session_model in (SinglemodeSession, MultimodeSession) :
+    for json_field in ('choice_history', 'character_history') :
+        REQUIRED_INDEXES.append({
+            'model': session_model,
+            'columns': [json_field],
+            'method': 'gin',
+            'opclass': 'jsonb_path_ops',
+            'used_by': 'SessionHistorySearchView',
+            'sample': lambda model=session_model, field=json_field : model.objects.filter(**{f'{field}__contains': SAMPLE_CONTAINS}),
+        })
+
+# 벤치마크용 임시 테이블 / 포함 검색 조건
+BENCHMARK_TABLE = 'history_index_benchmark'
+BENCHMARK_RUNS = 5
+BENCHMARK_CONTAINS = '{"items": ["item_7"]}'
+
+# 인덱스 이름 (PostgreSQL 식별자 최대 63자)
+def get_index_name(table, columns) :
+    return f"idx_{table}_{'_'.join(columns)}"[:63]
+
+# 기존 인덱스 중 필요한 컬럼으로 시작하는 인덱스 찾기 (B-tree 앞쪽 컬럼 일치, GIN 은 인덱스 방식도 일치)
+def find_covering_index(constraints, columns, method=None) :
+    for name, info in constraints.items() :
+        if method and info.get('type') != method :
+            continue
+        if info.get('index') or info.get('primary_key') or info.get('unique') :
+            if info['columns'][:len(columns)] == columns :
+                return name
+    return None
+
+class Command(BaseCommand) :
+    help = '게임 테이블 인덱스 (B-tree, JSON GIN) 확인 및 CREATE INDEX CONCURRENTLY DDL 생성/적용'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            type=str,
+            help='확인할 DB 별칭 (기본: 라우터가 선택한 주 DB)'
+        )
+        parser.add_argument(
+            '--apply',
+            action='store_true',
+            help='누락된 인덱스를 실제로 생성'
+        )
+        parser.add_argument(
+            '--explain',
+            action='store_true',
+            help='각 View 의 대표 쿼리 실행 계획에서 인덱스 사용 여부 확인'
+        )
+        parser.add_argument(
+            '--benchmark',
+            type=int,
+            metavar='ROWS',
+            help='임시 테이블에 ROWS 개의 JSON 기록을 생성하여 GIN 인덱스 유무에 따른 포함 검색 시간 비교 (PostgreSQL)'
+        )
+
+    def handle(self, *args, **options):
+        missing_ddl = []
+
+        for required in REQUIRED_INDEXES :
+            model = required['model']
+            columns = required['columns']
+            table = model._meta.db_table
+            database = options['database'] or router.db_for_write(model)
+            connection = connections[database]
+
+            # GIN 인덱스는 PostgreSQL 에서만 확인
+            if required.get('method') == 'gin' and connection.vendor != 'postgresql' :
+                self.stdout.write(f"[{database}] {table}({', '.join(columns)}) - GIN 인덱스는 PostgreSQL 에서만 확인합니다.")
+                continue
+
+            with connection.cursor() as cursor :
+                if table not in connection.introspection.table_names(cursor) :
+                    self.stdout.write(self.style.ERROR(f'[{database}] 테이블 없음: {table}'))
+                    continue
+                constraints = connection.introspection.get_constraints(cursor, table)
+
+            label = f"[{database}] {table}({', '.join(columns)}) - {required['used_by']}"
+            index_name = find_covering_index(constraints, columns, required.get('method'))
+            if index_name :
+                self.stdout.write(self.style.SUCCESS(f'인덱스 있음: {label} -> {index_name}'))
+            else :
+                ddl = self._build_ddl(connection, table, columns, required.get('method'), required.get('opclass'))
+                self.stdout.write(self.style.WARNING(f'인덱스 없음: {label}'))
+                missing_ddl.append((database, ddl))
+
+            if options['explain'] :
+                self._explain(required, database)
+
+        if options['benchmark'] :
+            self._benchmark(options['database'] or router.db_for_write(SinglemodeSession), options['benchmark'])
+
+        if not missing_ddl :
+            self.stdout.write(self.style.SUCCESS('필요한 인덱스가 모두 존재합니다.'))
+            return
+
+        self.stdout.write(f'\n누락된 인덱스 {len(missing_ddl)}개 DDL:')
+        for database, ddl in missing_ddl :
+            self.stdout.write(f'-- {database}\n{ddl};')
+
+        if not options['apply'] :
+            self.stdout.write('\n--apply 옵션으로 실행하면 위 인덱스를 생성합니다.')
+            return
+
+        # CONCURRENTLY 는 트랜잭션 밖에서 실행해야 하므로 autocommit 상태에서 한 문장씩 실행
+        for database, ddl in missing_ddl :
+            connection = connections[database]
+            if not connection.get_autocommit() :
+                raise CommandError('autocommit 상태에서만 인덱스를 생성할 수 있습니다.')
+            try :
+                with connection.cursor() as cursor :
+                    cursor.execute(ddl)
+                self.stdout.write(self.style.SUCCESS(f'인덱스 생성 완료: {ddl}'))
+            except Exception as e :
+                self.stdout.write(self.style.ERROR(f'인덱스 생성 실패: {ddl} ({e})'))
+
+    # CREATE INDEX DDL (PostgreSQL 에서는 쓰기 잠금 없이 CONCURRENTLY 로 생성)
+    def _build_ddl(self, connection, table, columns, method=None, opclass=None) :
+        quote_name = connection.ops.quote_name
+        concurrently = ' CONCURRENTLY' if connection.vendor == 'postgresql' else ''
+        using = f' USING {method}' if method else ''
+        column_sql = ', '.join(f'{quote_name(column)} {opclass}' if opclass else quote_name(column) for column in columns)
+        return (
+            f'CREATE INDEX{concurrently} IF NOT EXISTS {quote_name(get_index_name(table, columns))} '
+            f'ON {quote_name(table)}{using} ({column_sql})'
+        )
+
+    # 대표 쿼리의 실행 계획 출력 (순차 스캔이면 경고)
+    def _explain(self, required, database) :
+        try :
+            plan = required['sample']().using(database).explain()
+        except Exception as e :
+            self.stdout.write(self.style.ERROR(f'  실행 계획 확인 실패: {e}'))
+            return
+
+        # 행 수가 적은 테이블은 인덱스가 있어도 순차 스캔이 선택될 수 있음
+        if 'Seq Scan' in plan :
+            self.stdout.write(self.style.WARNING(f'  순차 스캔 사용:\n{plan}'))
+        else :
+            self.stdout.write(f'  실행 계획:\n{plan}')
+
+    # 임시 테이블에 JSON 기록을 만들어 GIN 인덱스 전/후 포함 검색 시간 비교 (실제 세션 테이블은 변경하지 않음)
+    def _benchmark(self, database, rows) :
+        connection = connections[database]
+        if connection.vendor != 'postgresql' :
+            self.stdout.write(self.style.ERROR('--benchmark 는 PostgreSQL 에서만 실행할 수 있습니다.'))
+            return
+        if rows <= 0 :
+            self.stdout.write(self.style.ERROR('--benchmark 는 1 이상이어야 합니다.'))
+            return
+
+        table = connection.ops.quote_name(BENCHMARK_TABLE)
+        query = f'SELECT COUNT(*) FROM {table} WHERE history @> %s::jsonb'
+        with connection.cursor() as cursor :
+            cursor.execute(f'DROP TABLE IF EXISTS {table}')
+            cursor.execute(f'CREATE TEMP TABLE {table} (id bigserial PRIMARY KEY, history jsonb NOT NULL)')
+            try :
+                # 선택/아이템 기록 형태의 JSON 생성 (item_7 은 약 0.2% 행에 포함)
+                cursor.execute(f"""
+                    INSERT INTO {table} (history)
+                    SELECT jsonb_build_object(
+                        'choices', jsonb_build_array('choice_' || mod(g, 50), 'choice_' || mod(g * 3, 50)),
+                        'items', jsonb_build_array('item_' || mod(g, 1000), 'item_' || mod(g * 7, 1000))
+                    )
+                    FROM generate_series(1, %s) AS g
+                """, [rows])
+                cursor.execute(f'ANALYZE {table}')
+                without_index = self._time_query(cursor, query)
+
+                cursor.execute(f'CREATE INDEX ON {table} USING gin (history jsonb_path_ops)')
+                cursor.execute(f'ANALYZE {table}')
+                with_index = self._time_query(cursor, query)
+
+                cursor.execute(f'EXPLAIN {query}', [BENCHMARK_CONTAINS])
+                plan = '\n'.join(row[0] for row in cursor.fetchall())
+            finally :
+                cursor.execute(f'DROP TABLE IF EXISTS {table}')
+
+        self.stdout.write(f'\n포함 검색 벤치마크 ({rows}행, {BENCHMARK_CONTAINS}, {BENCHMARK_RUNS}회 중앙값):')
+        self.stdout.write(f'  GIN 인덱스 없음: {without_index:.2f}ms')
+        self.stdout.write(f'  GIN 인덱스 있음: {with_index:.2f}ms')
+        self.stdout.write(f'  실행 계획:\n{plan}')
+
+    def _time_query(self, cursor, query) :
+        durations = []
+        for _ in range(BENCHMARK_RUNS) :
+            started = time.perf_counter()
+            cursor.execute(query, [BENCHMARK_CONTAINS])
+            cursor.fetchall()
+            durations.append((time.perf_counter() - started) * 1000)
+        return median(durations)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from game.catalog import export_catalog
+
+
+class Command(BaseCommand) :
+    help = '장르/모드/난이도/시나리오/캐릭터/스토리(분기점, 선택지 포함) 카탈로그를 zip 아카이브로 내보내기 (UUID 유지)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=str, help='저장할 아카이브 경로 (예: catalog.zip)')
+        parser.add_argument(
+            '--database',
+            type=str,
+            help='내보낼 DB 별칭 (기본: 라우터가 선택한 주 DB)'
+        )
+
+    def handle(self, *args, **options):
+        def print_progress(table, count) :
+            self.stdout.write(f'{table}: {count}건')
+
+        counts = export_catalog(options['path'], options['database'], on_progress=print_progress)
+        self.stdout.write(self.style.SUCCESS(f"카탈로그 내보내기 완료: {options['path']} ({sum(counts.values())}행)"))
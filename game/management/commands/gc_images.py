@@ -0,0 +1,88 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from game.image_gc import collect_image_garbage, BLOB_BATCH_SIZE, DEFAULT_MIN_AGE_MINUTES
+
+
+class Command(BaseCommand) :
+    help = '이미지 컨테이너에서 Character / StorymodeMoment / Story / Scenario 의 image_path 가 참조하지 않는 blob 을 Blob Batch API 로 삭제'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='삭제하지 않고 정리 대상 blob 만 출력'
+        )
+        parser.add_argument(
+            '--container',
+            action='append',
+            dest='containers',
+            help='확인할 컨테이너 (여러 번 지정 가능, 기본: 시나리오/스토리 제목 컨테이너와 image_path 가 가리키는 컨테이너, 원본 파일 컨테이너 제외)'
+        )
+        parser.add_argument(
+            '--purge-deleted',
+            action='store_true',
+            help='soft delete 된 스토리/시나리오/캐릭터의 이미지도 삭제하고 image_path 를 비움 (복구해도 이미지는 돌아오지 않음, 기본: 남김)'
+        )
+        parser.add_argument(
+            '--min-age-minutes',
+            type=int,
+            default=DEFAULT_MIN_AGE_MINUTES,
+            help=f'이보다 최근에 올라간 blob 은 건너뜀 (생성 중인 이미지 보호, 기본: {DEFAULT_MIN_AGE_MINUTES})'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BLOB_BATCH_SIZE,
+            help=f'한 번의 배치 삭제 요청에 담을 blob 수 (최대/기본: {BLOB_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--connection-string',
+            type=str,
+            help='Blob Storage 연결 문자열 (기본: AZURE_BLOB_STORAGE_CONNECT_KEY_FOR_IMAGE, 로컬 Azurite 는 UseDevelopmentStorage=true)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size <= 0 or batch_size > BLOB_BATCH_SIZE :
+            self.stdout.write(self.style.ERROR(f'--batch-size 는 1 ~ {BLOB_BATCH_SIZE} 이어야 합니다.'))
+            return
+        if options['min_age_minutes'] < 0 :
+            self.stdout.write(self.style.ERROR('--min-age-minutes 는 0 이상이어야 합니다.'))
+            return
+
+        connection_string = options['connection_string'] or settings.AZURE_BLOB_STORAGE_CONNECT_KEY_FOR_IMAGE
+        if not connection_string :
+            raise CommandError('Azure Blob Storage 연결 문자열이 설정되지 않았습니다.')
+
+        dry_run = options['dry_run']
+        verbose = options['verbosity'] > 1
+
+        def print_progress(container_name, blob_names, failed) :
+            if dry_run or verbose :
+                for blob_name in blob_names :
+                    self.stdout.write(f'{container_name}/{blob_name}')
+            for blob_name in failed :
+                self.stdout.write(self.style.WARNING(f'삭제 실패: {container_name}/{blob_name}'))
+            if not dry_run :
+                self.stdout.write(f'{container_name}: {len(blob_names) - len(failed)}건 삭제')
+
+        stats = collect_image_garbage(
+            connection_string,
+            containers=options['containers'],
+            dry_run=dry_run,
+            purge_deleted=options['purge_deleted'],
+            min_age_minutes=options['min_age_minutes'],
+            batch_size=batch_size,
+            on_progress=print_progress,
+        )
+
+        summary = (
+            f"컨테이너 {stats['containers']}개, blob {stats['scanned']}건 확인 "
+            f"(참조 중인 이미지 {stats['referenced']}건, 최근 업로드로 건너뜀 {stats['skipped_recent']}건)"
+        )
+        if options['purge_deleted'] :
+            summary += f", soft delete 된 행 이미지 {'정리 예정' if dry_run else '정리'} {stats['purged_rows']}건"
+        if dry_run :
+            self.stdout.write(self.style.SUCCESS(f"[dry-run] 정리 대상 {stats['orphaned']}건 / {summary}"))
+        else :
+            self.stdout.write(self.style.SUCCESS(f"이미지 정리 완료: {stats['deleted']}건 삭제, 실패 {stats['failed']}건 / {summary}"))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from game.catalog import import_catalog
+
+
+class Command(BaseCommand) :
+    help = 'export_catalog 아카이브를 한 트랜잭션에서 FK 순서대로 적재 (PostgreSQL 은 COPY, 그 외에는 bulk_create)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=str, help='불러올 아카이브 경로')
+        parser.add_argument(
+            '--database',
+            type=str,
+            help='적재할 DB 별칭 (기본: 라우터가 선택한 주 DB)'
+        )
+        parser.add_argument(
+            '--skip-existing',
+            action='store_true',
+            help='이미 존재하는 id 는 건너뛰고 나머지만 적재 (해당 테이블은 COPY 대신 bulk_create 사용)'
+        )
+
+    def handle(self, *args, **options):
+        def print_progress(table, count) :
+            self.stdout.write(f'{table}: {count}건 적재')
+
+        try :
+            counts = import_catalog(options['path'], options['database'], options['skip_existing'], on_progress=print_progress)
+        except (ValueError, FileNotFoundError) as e :
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f"카탈로그 불러오기 완료: {sum(counts.values())}행"))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SourceDocument',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('scenario', 'Scenario'), ('story', 'Story')], max_length=20)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('blob_name', models.CharField(max_length=500)),
+                ('original_name', models.CharField(blank=True, max_length=500, null=True)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('target_id', models.UUIDField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('generated_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'admin_source_document',
+                'indexes': [models.Index(fields=['kind', 'blob_name'], name='idx_source_document_blob')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'content_hash'), name='uniq_source_document_hash')],
+            },
+        ),
+    ]
@@ -201,4 +201,45 @@ class MultimodeSession(BaseSession):
         db_table = 'multimode_session'
 
     def __str__(self):
-        return f"{self.user.name} in {self.gameroom.name}"
\ No newline at end of file
+        return f"{self.user.name} in {self.gameroom.name}"
+
+# 캐시 버전 (카탈로그 변경 감지용, 관리자 백엔드 전용 테이블)
+class CacheVersion(models.Model):
+    key = models.CharField(max_length=100, primary_key=True)   # 테이블 이름 (genre, mode, ...)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'admin_cache_version'
+
+    def __str__(self):
+        return f"{self.key} v{self.version}"
+
+# 업로드된 원본 파일 (내용 해시 기준, 같은 내용으로 생성된 시나리오/스토리 재사용)
+class SourceDocument(models.Model):
+    KIND_CHOICES = [
+        ('scenario', 'Scenario'),
+        ('story', 'Story'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    content_hash = models.CharField(max_length=64)                  # sha256 hex
+    blob_name = models.CharField(max_length=500)                    # 내용 주소 기반 blob 이름
+    original_name = models.CharField(max_length=500, null=True, blank=True)
+    size = models.PositiveBigIntegerField(default=0)
+    target_id = models.UUIDField(null=True, blank=True)             # 이 내용으로 생성된 Scenario / Story id
+    created_at = models.DateTimeField(auto_now_add=True)
+    generated_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'admin_source_document'
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'content_hash'], name='uniq_source_document_hash'),
+        ]
+        indexes = [
+            models.Index(fields=['kind', 'blob_name'], name='idx_source_document_blob'),
+        ]
+
+    def __str__(self):
+        return f"[{self.kind}] {self.original_name or self.blob_name}"
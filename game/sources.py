@@ -0,0 +1,78 @@
+import os
+import hashlib
+from django.utils import timezone
+from game.models import Scenario, SourceDocument
+from storymode.models import Story
+
+
+# 원본 파일 종류별로 생성되는 모델
+SOURCE_TARGET_MODELS = {
+    'scenario': Scenario,
+    'story': Story,
+}
+
+
+# 업로드 파일을 청크 단위로 읽으며 sha256 계산 (메모리에 파일 전체를 올리지 않음)
+def hash_uploaded_file(file) :
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in file.chunks() :
+        digest.update(chunk)
+        size += len(chunk)
+    file.seek(0)
+    return digest.hexdigest(), size
+
+def hash_text(text) :
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+# 내용 주소 기반 blob 이름 (같은 내용은 같은 이름, 확장자만 유지)
+def get_content_blob_name(content_hash, file_name) :
+    extension = os.path.splitext(file_name or '')[1].lower()[:10]
+    return f'sha256/{content_hash}{extension}'
+
+def find_source(kind, content_hash=None, blob_name=None) :
+    sources = SourceDocument.objects.filter(kind=kind)
+    if content_hash :
+        return sources.filter(content_hash=content_hash).first()
+    if blob_name :
+        return sources.filter(blob_name=blob_name).first()
+    return None
+
+# 이 원본으로 생성되어 아직 삭제되지 않은 Scenario / Story
+def get_generated_target(source) :
+    if not source or not source.target_id :
+        return None
+    return SOURCE_TARGET_MODELS[source.kind].objects.filter(id=source.target_id, is_deleted=False).first()
+
+def find_generated_target(kind, content_hash=None, blob_name=None) :
+    return get_generated_target(find_source(kind, content_hash=content_hash, blob_name=blob_name))
+
+def register_upload(kind, content_hash, blob_name, original_name, size) :
+    source, _ = SourceDocument.objects.get_or_create(
+        kind=kind,
+        content_hash=content_hash,
+        defaults={
+            'blob_name': blob_name,
+            'original_name': original_name,
+            'size': size,
+        },
+    )
+    return source
+
+# AI 분석으로 생성된 Scenario / Story 를 원본 해시에 연결 (이전 방식으로 업로드된 파일도 여기서 등록)
+def mark_generated(kind, content_hash, blob_name, target_id) :
+    source, created = SourceDocument.objects.get_or_create(
+        kind=kind,
+        content_hash=content_hash,
+        defaults={
+            'blob_name': blob_name,
+            'original_name': os.path.basename(blob_name),
+            'target_id': target_id,
+            'generated_at': timezone.now(),
+        },
+    )
+    if not created :
+        source.target_id = target_id
+        source.generated_at = timezone.now()
+        source.save(update_fields=['target_id', 'generated_at'])
+    return source
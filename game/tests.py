@@ -1,3 +1,253 @@
-from django.test import TestCase
+import uuid
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+from django.test import SimpleTestCase
+from django.utils import timezone
+from game.models import Character
+from game.views import AzureBlobStorageUtil
+from game.image_gc import normalize_image_path, split_image_path, iter_orphan_chunks, delete_blob_batch, delete_row_images, count_image_results
+from azure.core.exceptions import ResourceNotFoundError
+from config.blob_manifest import get_manifest, get_versioned_url, notify_change, forget_container
+from config.bulk_update import parse_batch_items
 
-# Create your tests here.
+
+AZURITE_ACCOUNT_URL = 'http://127.0.0.1:10000/devstoreaccount1'
+AZURE_ACCOUNT_URL = 'https://account.blob.core.windows.net'
+
+
+# Blob 목록 / 배치 삭제만 흉내내는 컨테이너 클라이언트
+class FakeContainerClient :
+    def __init__(self, account_url, container_name, blobs=(), delete_statuses=None) :
+        self.url = f'{account_url}/{container_name}'
+        self.account_name = 'account'
+        self.container_name = container_name
+        self.blobs = list(blobs)
+        self.delete_statuses = delete_statuses or {}
+        self.deleted = []
+
+    def list_blobs(self) :
+        return iter(self.blobs)
+
+    def delete_blobs(self, *blob_names, raise_on_any_failure=True) :
+        self.deleted.append(list(blob_names))
+        return [SimpleNamespace(status_code=self.delete_statuses.get(blob_name, 202)) for blob_name in blob_names]
+
+class FakeBlobServiceClient :
+    def __init__(self, account_url, containers) :
+        self.url = account_url
+        self.containers = containers
+
+    def get_container_client(self, container_name) :
+        return self.containers[container_name]
+
+# image_path 를 가진 행 (모델 클래스의 objects.bulk_update 호출만 확인)
+class FakeImageRow :
+    objects = None
+
+    def __init__(self, image_path) :
+        self.pk = uuid.uuid4()
+        self.image_path = image_path
+
+def make_blob(name, minutes_ago=120) :
+    return SimpleNamespace(name=name, last_modified=timezone.now() - timedelta(minutes=minutes_ago))
+
+# 컨테이너 목록 버전(CacheVersion) 조회/증가를 메모리 값으로 대체
+class BlobVersionMixin :
+    def setUp(self) :
+        super().setUp()
+        self.blob_versions = {}
+        for name, side_effect in (
+            ('get_version', lambda key : self.blob_versions.get(key, 0)),
+            ('bump_version', lambda key : self.blob_versions.__setitem__(key, self.blob_versions.get(key, 0) + 1)),
+        ) :
+            patcher = mock.patch(f'config.blob_manifest.{name}', side_effect=side_effect)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+class NormalizeImagePathTests(SimpleTestCase) :
+    def test_ignores_host_and_query_string(self) :
+        self.assertEqual(normalize_image_path(f'{AZURE_ACCOUNT_URL}/images/story/a.png?v=8dc1a2'), '/images/story/a.png')
+        self.assertEqual(normalize_image_path(f'{AZURE_ACCOUNT_URL}/images/story/a.png?t=1700000000'), '/images/story/a.png')
+
+    def test_keeps_azurite_account_prefix(self) :
+        self.assertEqual(normalize_image_path(f'{AZURITE_ACCOUNT_URL}/images/a.png'), '/devstoreaccount1/images/a.png')
+
+    def test_unquotes_percent_encoding(self) :
+        self.assertEqual(normalize_image_path(f'{AZURE_ACCOUNT_URL}/images/%EC%BA%90%EB%A6%AD%ED%84%B0%20a.png'), '/images/캐릭터 a.png')
+
+
+class SplitImagePathTests(SimpleTestCase) :
+    def test_splits_container_and_blob_name(self) :
+        self.assertEqual(split_image_path(AZURE_ACCOUNT_URL, f'{AZURE_ACCOUNT_URL}/images/story/a.png?v=1'), ('images', 'story/a.png'))
+
+    def test_strips_azurite_account_prefix(self) :
+        self.assertEqual(split_image_path(AZURITE_ACCOUNT_URL, f'{AZURITE_ACCOUNT_URL}/images/story/a.png?t=1'), ('images', 'story/a.png'))
+
+    def test_invalid_path(self) :
+        self.assertIsNone(split_image_path(AZURE_ACCOUNT_URL, f'{AZURE_ACCOUNT_URL}/images'))
+        self.assertIsNone(split_image_path(AZURE_ACCOUNT_URL, ''))
+
+
+class IterOrphanChunksTests(SimpleTestCase) :
+    def test_yields_unreferenced_blobs_in_chunks(self) :
+        container_client = FakeContainerClient(AZURE_ACCOUNT_URL, 'images', [make_blob(f'{index}.png') for index in range(5)])
+        referenced = {normalize_image_path(f'{AZURE_ACCOUNT_URL}/images/1.png?v=abc')}
+
+        chunks = list(iter_orphan_chunks(container_client, referenced, chunk_size=2))
+        self.assertEqual(chunks, [['0.png', '2.png'], ['3.png', '4.png']])
+
+    def test_matches_azurite_referenced_paths(self) :
+        container_client = FakeContainerClient(AZURITE_ACCOUNT_URL, 'images', [make_blob('kept.png'), make_blob('orphan.png')])
+        referenced = {normalize_image_path(f'{AZURITE_ACCOUNT_URL}/images/kept.png?t=1700000000')}
+
+        self.assertEqual(list(iter_orphan_chunks(container_client, referenced)), [['orphan.png']])
+
+    def test_skips_recent_blobs(self) :
+        container_client = FakeContainerClient(AZURE_ACCOUNT_URL, 'images', [make_blob('old.png', 120), make_blob('new.png', 5)])
+        stats = {}
+
+        chunks = list(iter_orphan_chunks(container_client, set(), min_age_minutes=60, stats=stats))
+        self.assertEqual(chunks, [['old.png']])
+        self.assertEqual(stats, {'scanned': 2, 'skipped_recent': 1})
+
+
+class DeleteBlobBatchTests(BlobVersionMixin, SimpleTestCase) :
+    def test_deletes_unique_names_in_batches(self) :
+        container_client = FakeContainerClient(AZURE_ACCOUNT_URL, 'images', delete_statuses={'b.png': 404, 'c.png': 403})
+
+        statuses = delete_blob_batch(container_client, ['a.png', 'b.png', 'a.png', 'c.png'], batch_size=2)
+        self.assertEqual(container_client.deleted, [['a.png', 'b.png'], ['c.png']])
+        self.assertEqual(statuses, {'a.png': 202, 'b.png': 404, 'c.png': 403})
+        self.assertEqual(self.blob_versions, {'blob:account/images': 1})
+
+
+class DeleteRowImagesTests(BlobVersionMixin, SimpleTestCase) :
+    def setUp(self) :
+        super().setUp()
+        FakeImageRow.objects = mock.Mock()
+
+    def test_clears_only_deleted_rows(self) :
+        images = FakeContainerClient(AZURE_ACCOUNT_URL, 'images', delete_statuses={'missing.png': 404, 'locked.png': 409})
+        blob_service_client = FakeBlobServiceClient(AZURE_ACCOUNT_URL, {'images': images})
+        deleted = FakeImageRow(f'{AZURE_ACCOUNT_URL}/images/deleted.png?v=1')
+        missing = FakeImageRow(f'{AZURE_ACCOUNT_URL}/images/missing.png')
+        locked = FakeImageRow(f'{AZURE_ACCOUNT_URL}/images/locked.png')
+        empty = FakeImageRow(None)
+        invalid = FakeImageRow(f'{AZURE_ACCOUNT_URL}/images')
+
+        results = delete_row_images(blob_service_client, [
+            ('moment', deleted), ('moment', missing), ('moment', locked), ('moment', empty), ('story', invalid),
+        ])
+
+        self.assertEqual([result['status'] for result in results], ['deleted', 'not_found', 'failed', 'no_image', 'invalid_path'])
+        self.assertEqual(count_image_results(results), {'deleted': 1, 'not_found': 1, 'failed': 1, 'no_image': 1, 'invalid_path': 1})
+        self.assertEqual(images.deleted, [['deleted.png', 'missing.png', 'locked.png']])
+        self.assertIsNone(deleted.image_path)
+        self.assertIsNone(missing.image_path)
+        self.assertIsNotNone(locked.image_path)
+        FakeImageRow.objects.bulk_update.assert_called_once_with([deleted, missing], ['image_path'])
+
+    def test_batch_error_marks_rows_failed(self) :
+        images = FakeContainerClient(AZURE_ACCOUNT_URL, 'images')
+        images.delete_blobs = mock.Mock(side_effect=Exception('network'))
+        blob_service_client = FakeBlobServiceClient(AZURE_ACCOUNT_URL, {'images': images})
+        row = FakeImageRow(f'{AZURE_ACCOUNT_URL}/images/a.png')
+
+        with mock.patch('builtins.print') :
+            results = delete_row_images(blob_service_client, [('moment', row)])
+
+        self.assertEqual(results[0]['status'], 'failed')
+        self.assertIsNotNone(row.image_path)
+        FakeImageRow.objects.bulk_update.assert_not_called()
+
+
+class VersionedUrlTests(SimpleTestCase) :
+    def test_appends_normalized_etag(self) :
+        self.assertEqual(get_versioned_url('https://a/images/a.png', '"0x8DC1A2B3C4D5E6F"'), 'https://a/images/a.png?v=8dc1a2b3c4d5e6f')
+
+    def test_without_etag(self) :
+        self.assertEqual(get_versioned_url('https://a/images/a.png', None), 'https://a/images/a.png')
+
+
+class ManifestVersionTests(BlobVersionMixin, SimpleTestCase) :
+    def setUp(self) :
+        super().setUp()
+        self.container_client = FakeContainerClient(AZURE_ACCOUNT_URL, 'images', [SimpleNamespace(name='a.png', etag='"0x1"')])
+        self.container_client.list_blobs = mock.Mock(side_effect=lambda : iter(self.container_client.blobs))
+        forget_container(self.container_client)
+        self.addCleanup(forget_container, self.container_client)
+
+    def test_reuses_manifest_until_version_changes(self) :
+        self.assertIn('a.png', get_manifest(self.container_client))
+        self.assertIn('a.png', get_manifest(self.container_client))
+        self.assertEqual(self.container_client.list_blobs.call_count, 1)
+
+        # 다른 워커가 삭제 후 버전을 올림
+        self.container_client.blobs = []
+        self.blob_versions['blob:account/images'] = 1
+        self.assertNotIn('a.png', get_manifest(self.container_client))
+        self.assertEqual(self.container_client.list_blobs.call_count, 2)
+
+    def test_notify_change_bumps_version(self) :
+        get_manifest(self.container_client)
+        notify_change(self.container_client)
+
+        self.assertEqual(self.blob_versions, {'blob:account/images': 1})
+        get_manifest(self.container_client)
+        self.assertEqual(self.container_client.list_blobs.call_count, 2)
+
+
+class ExistingBlobUrlTests(BlobVersionMixin, SimpleTestCase) :
+    def setUp(self) :
+        super().setUp()
+        self.container_client = FakeContainerClient(AZURE_ACCOUNT_URL, 'images', [SimpleNamespace(name='a.png', etag='"0xOLD"')])
+        self.blob_client = mock.Mock(url=f'{AZURE_ACCOUNT_URL}/images/a.png')
+        self.container_client.get_blob_client = mock.Mock(return_value=self.blob_client)
+        self.blob_util = AzureBlobStorageUtil.__new__(AzureBlobStorageUtil)
+        forget_container(self.container_client)
+
+    def tearDown(self) :
+        forget_container(self.container_client)
+
+    def test_versioned_url_uses_current_etag(self) :
+        self.blob_client.get_blob_properties.return_value = SimpleNamespace(etag='"0xNEW"')
+
+        with mock.patch('builtins.print') :
+            url = self.blob_util.get_existing_blob_url(self.container_client, 'a.png', versioned=True)
+        self.assertEqual(url, f'{AZURE_ACCOUNT_URL}/images/a.png?v=new')
+
+    def test_blob_deleted_by_other_worker(self) :
+        self.blob_client.get_blob_properties.side_effect = ResourceNotFoundError('deleted')
+
+        self.assertIsNone(self.blob_util.get_existing_blob_url(self.container_client, 'a.png', versioned=True))
+        self.assertEqual(self.blob_versions, {'blob:account/images': 1})
+
+
+class ParseBatchItemsTests(SimpleTestCase) :
+    def test_parses_allowed_fields(self) :
+        character_id = uuid.uuid4()
+        parsed_items, results = parse_batch_items(Character, [
+            {'id': str(character_id), 'is_display': False, 'name': 'ignored'},
+        ], ('is_display', 'is_deleted'))
+
+        self.assertEqual(parsed_items, [(str(character_id), {'is_display': False})])
+        self.assertEqual(results, {})
+
+    def test_invalid_items(self) :
+        character_id = str(uuid.uuid4())
+        parsed_items, results = parse_batch_items(Character, [
+            {'id': 'not-a-uuid', 'is_display': True},
+            {'id': character_id},
+        ], ('is_display',))
+
+        self.assertEqual(parsed_items, [])
+        self.assertEqual(results['not-a-uuid']['status'], 'invalid')
+        self.assertEqual(results[character_id]['status'], 'invalid')
+
+    def test_requires_list_with_ids(self) :
+        with self.assertRaises(ValueError) :
+            parse_batch_items(Character, [], ('is_display',))
+        with self.assertRaises(ValueError) :
+            parse_batch_items(Character, [{'is_display': True}], ('is_display',))
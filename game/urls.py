@@ -1,39 +1,52 @@
 from django.urls import path
-from game.views import (GenreCreateView, GenreListView, GenreUpdateAllView, GenreUpdateView, 
-                        ModeCreateView, ModeListView, ModeUpdateView, ModeUpdateAllView, 
-                        DifficultyCreateView, DifficultyListView, DifficultyUpdateView, DifficultyUpdateAllView, 
-                        SenarioFileUploadView, ScenarioListView, SenarioCreateView, ScenarioUpdateAllView, ScenarioUpdateView,
-                        CharacterListView, CharacterCreateView, CharacterImageCreateView, CharacterUpdateView, CharacterImageDeleteView,
+from game.views import (GenreCreateView, GenreListView, GenreUpdateAllView, GenreUpdateView, GenreBatchUpdateView,
+                        ModeCreateView, ModeListView, ModeUpdateView, ModeUpdateAllView, ModeBatchUpdateView,
+                        DifficultyCreateView, DifficultyListView, DifficultyUpdateView, DifficultyUpdateAllView, DifficultyBatchUpdateView,
+                        SenarioFileUploadView, ScenarioListView, SenarioCreateView, ScenarioUpdateAllView, ScenarioUpdateView, ScenarioBatchUpdateView,
+                        CharacterListView, CharacterCreateView, CharacterImageCreateView, CharacterUpdateView, CharacterImageDeleteView, CharacterBatchUpdateView,
+                        ScenarioImageDeleteAllView,
                         GameStatisticsView
                         )
+from game.async_views import AsyncSenarioCreateView, AsyncCharacterCreateView, AsyncCharacterImageCreateView
 
 urlpatterns = [
     path('create/genres', GenreCreateView.as_view(), name="create_genre"),
     path('list/genres', GenreListView.as_view(), name="list_genres"),
     path('update/genres/all', GenreUpdateAllView.as_view(), name="update_all_genres"),
+    path('update/genres/batch', GenreBatchUpdateView.as_view(), name="batch_update_genres"),
     path('update/genres/<str:genre_id>', GenreUpdateView.as_view(), name="update_genres"),
 
     path('create/modes', ModeCreateView.as_view(), name="create_modes"),
     path('list/modes', ModeListView.as_view(), name="list_modes"),
     path('update/modes/all', ModeUpdateAllView.as_view(), name="update_all_modes"),
+    path('update/modes/batch', ModeBatchUpdateView.as_view(), name="batch_update_modes"),
     path('update/modes/<str:mode_id>', ModeUpdateView.as_view(), name="update_modes"),
 
     path('create/difficulties', DifficultyCreateView.as_view(), name="create_difficulties"),
     path('list/difficulties', DifficultyListView.as_view(), name="list_difficulties"),
     path('update/difficulties/all', DifficultyUpdateAllView.as_view(), name="update_all_difficulties"),
+    path('update/difficulties/batch', DifficultyBatchUpdateView.as_view(), name="batch_update_difficulties"),
     path('update/difficulties/<str:difficulty_id>', DifficultyUpdateView.as_view(), name="update_difficulties"),
 
     path('list/scenarios', ScenarioListView.as_view(), name="list_scenarios"),
     path('upload/scenarios', SenarioFileUploadView.as_view(), name="upload_scenarios"),
     path('create/scenarios', SenarioCreateView.as_view(), name="create_scenarios"),
     path('update/scenarios/all', ScenarioUpdateAllView.as_view(), name="update_all_scenarios"),
+    path('update/scenarios/batch', ScenarioBatchUpdateView.as_view(), name="batch_update_scenarios"),
     path('update/scenarios/<str:scenario_id>', ScenarioUpdateView.as_view(), name="update_scenarios"),
 
     path('list/characters/<str:scenario_id>', CharacterListView.as_view(), name="list_characters"),
     path('create/characters/all/', CharacterCreateView.as_view(), name="create_characters"),
     path('create/characters/images/<str:character_id>', CharacterImageCreateView.as_view(), name="create_characters_image"),
+    path('update/characters/batch', CharacterBatchUpdateView.as_view(), name="batch_update_characters"),
     path('update/characters/<str:character_id>', CharacterUpdateView.as_view(), name="update_characters"),
     path('delete/characters/images/<str:character_id>', CharacterImageDeleteView.as_view(), name="delete_character_image"),
+    path('delete/scenarios/<str:scenario_id>/images/all', ScenarioImageDeleteAllView.as_view(), name="delete_scenario_images_all"),
 
     path('list/statistics', GameStatisticsView.as_view(), name="list_game_statistics"),
+
+    # ASGI 비동기 생성 API
+    path('async/create/scenarios', AsyncSenarioCreateView.as_view(), name="async_create_scenarios"),
+    path('async/create/characters/all/', AsyncCharacterCreateView.as_view(), name="async_create_characters"),
+    path('async/create/characters/images/<str:character_id>', AsyncCharacterImageCreateView.as_view(), name="async_create_characters_image"),
 ]
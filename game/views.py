@@ -1,4 +1,3 @@
-import time
 import json
 import requests
 import urllib.parse
@@ -8,11 +7,17 @@ from django.conf import settings
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 from django.db.models import Count
+from django.core.exceptions import ValidationError
 from azure.storage.blob import BlobServiceClient, ContentSettings
 from azure.core.exceptions import ResourceNotFoundError
+from config.chunked_analysis import summarize_long_text
+from config.blob_manifest import IMAGE_CACHE_CONTROL, is_known_container, get_manifest, get_versioned_url, notify_change, delete_blob
 from game.models import Genre, Mode, Difficulty, Scenario, Character, GameRoomSelectScenario, SinglemodeSession, MultimodeSession
 from game.serializers import GenreSerializer, ModeSerializer, DifficultySerializer, ScenarioSerializer, CharacterSerializer
-from game.mixins import AuthMixin, CreateMixin, ListViewMixin, UpdateMixin, UpdateAllMixin
+from game.mixins import AuthMixin, CreateMixin, ListViewMixin, UpdateMixin, UpdateAllMixin, BatchUpdateMixin
+from game.image_gc import delete_row_images, count_image_results
+from game.sources import hash_uploaded_file, hash_text, get_content_blob_name, find_source, get_generated_target, find_generated_target, register_upload, mark_generated
+from game.cache import get_cache_key, get_version, invalidate_model, make_etag, get_not_modified_response, set_etag_headers
 
 
 # 환경 설정
@@ -72,6 +77,9 @@ class AzureBlobStorageUtil :
     def get_or_create_container(self, container_name, public=False) :
         try :
             container_client = self.blob_service_client.get_container_client(container_name)
+            # 이 워커가 목록을 캐시한 컨테이너는 이미 생성/설정된 것이므로 왕복 생략
+            if is_known_container(container_client) :
+                return container_client
             try :
                 container_client.get_container_properties()
                 print(f"\n>> 컨테이너 '{container_name}'가 이미 존재합니다. 재사용합니다.\n")
@@ -86,26 +94,48 @@ class AzureBlobStorageUtil :
         except Exception as e :
             raise Exception(f'ERROR: Azure Blob Storage 컨테이너 처리 실패: {e}')
 
-    # Azure Blob Storage 에 데이터가 존재하는 확인하고 URL 반환
-    def check_blob_exists_and_get_url(self, blob_client) :
-        try:
-            blob_client.get_blob_properties()
-            print(f"\n>> 이미 존재하는 데이터: {blob_client.url}\n")
-            return blob_client.url
-        except ResourceNotFoundError :
-            return None
+    # 캐시된 컨테이너 목록으로 존재 여부 확인 (목록이 없거나 다른 워커가 바꿨을 때만 다시 조회), versioned 면 속성 조회로 받은 ETag 버전을 붙인 URL
+    def get_existing_blob_url(self, container_client, blob_name, versioned=False) :
+        try :
+            blobs = get_manifest(container_client)
         except Exception as e :
             raise Exception(f"ERROR: Blob 존재 여부 확인 중 오류 발생: {e}")
+        if blob_name not in blobs :
+            return None
+        blob_client = container_client.get_blob_client(blob=blob_name)
+        blob_url = blob_client.url
+        # immutable 로 캐시되는 URL 이므로 버전은 캐시된 목록이 아니라 이번에 조회한 ETag 로 (다른 워커가 덮어썼을 수 있음)
+        if versioned :
+            try :
+                etag = blob_client.get_blob_properties().etag
+            except ResourceNotFoundError :
+                notify_change(container_client)
+                return None
+            except Exception as e :
+                raise Exception(f"ERROR: Blob 속성 조회 중 오류 발생: {e}")
+            blob_url = get_versioned_url(blob_url, etag)
+        print(f"\n>> 이미 존재하는 데이터: {blob_url}\n")
+        return blob_url
     
-    # Azure Blob Storage 에 데이터 업로드
-    def upload_blob(self, container_client, blob_name, data, content_type='application/octet-stream', overwrite=True) :
+    # Azure Blob Storage 에 데이터 업로드 (versioned 면 ETag 버전을 붙인 URL 반환)
+    def upload_blob(self, container_client, blob_name, data, content_type='application/octet-stream', overwrite=True, cache_control=None, versioned=False) :
         blob_client = container_client.get_blob_client(blob=blob_name)
         try :
-            content_settings_obj = ContentSettings(content_type=content_type)
-            blob_client.upload_blob(data, overwrite=overwrite, content_settings=content_settings_obj)
+            content_settings_obj = ContentSettings(content_type=content_type, cache_control=cache_control)
+            result = blob_client.upload_blob(data, overwrite=overwrite, content_settings=content_settings_obj)
+            notify_change(container_client)
+            if versioned :
+                return get_versioned_url(blob_client.url, result.get('etag'))
             return blob_client.url
         except Exception as e :
             raise Exception(f"ERROR: Blob 업로드 실패 ({blob_name}): {e}")
+
+    # 존재 확인 없이 한 번에 삭제 (없는 blob 은 성공으로 처리)
+    def delete_blob(self, container_client, blob_name) :
+        try :
+            return delete_blob(container_client, blob_name)
+        except Exception as e :
+            raise Exception(f"ERROR: Blob 삭제 실패 ({blob_name}): {e}")
     
     # Azure Blob Strorage 에서 파일 다운로드
     def download_blob_as_text(self, container_client, blob_name) :
@@ -116,6 +146,158 @@ class AzureBlobStorageUtil :
         except Exception as e :
             raise Exception(f"ERROR: Blob 다운로드 실패 ({blob_name}): {e}")
 
+# JSON 응답을 받는 생성 요청 공통 옵션
+JSON_COMPLETION_OPTIONS = {
+    'temperature': 0.7,
+    'top_p': 0.95,
+    'max_tokens': 2000,
+    'frequency_penalty': 0,
+    'presence_penalty': 0,
+    'response_format': {"type": "json_object"}, # 결과는 무조건 JSON 형식으로 받기
+}
+
+# DALL-E 3 이미지 생성 옵션
+DALLE_IMAGE_OPTIONS = {
+    'n': 1,
+    'size': "1024x1024",
+    'style': "vivid",
+    'quality': "standard",
+}
+
+# 캐릭터 이미지 스타일
+IMAGE_STYLE_DESCRIPTION = "Simple and clean 8-bit pixel art,dark background,focus on character,only upper body,like mug shot,only one person/object,wearing hanbok, minimalist, retro video game asset, clear outlines, Korean fairy tale theme. No Japanese or Chinese elements."
+
+# 시나리오 요약 요청 메시지
+def build_scenario_messages(scenario_text) :
+    system = {"role": "system", "content": "너는 스토리 분석가다. 캐릭터 창작에 도움이 되는 핵심만 간결히 요약해라."}
+    user = {
+        "role": "user",
+        "content": f"""다음 JSON 스토리를 캐릭터 창작용으로 요약.
+                형식(JSON): {
+                    {
+                        "title" : "스토리 제목",
+                        "title_eng" : "스토리 영어 제목",
+                        "setting": "시대/장소/분위기",
+                        "themes": ["주제1","주제2"],
+                        "tone": "전체 톤",
+                        "notable_characters": ["핵심 인물/집단 2~6개"],
+                        "conflicts": ["갈등/과제 2~4개"],
+                        "description": "한줄 요약",
+                        "description_eng": "한줄 요약을 영어로 번역"
+                    }
+                }
+                스토리: {scenario_text}"""
+    }
+    return [system, user]
+
+# 시나리오 DB 저장 (새로 생성되면 캐시 무효화)
+def save_scenario(scenario_name, senario_json) :
+    scenario, created = Scenario.objects.get_or_create(
+        title=scenario_name,
+        title_eng=senario_json.get('title_eng',''),
+        description=senario_json.get('description',''),
+        description_eng=senario_json.get('description_eng',''),
+    )
+    if created :
+        invalidate_model(Scenario)
+    return scenario, created
+
+# 캐릭터 생성 요청 메시지
+def build_character_messages(scenario) :
+    system = {
+        "role": "system",
+        "content": "너는 창의적인 스토리 작가이자 캐릭터 창조자다. 주어진 시나리오를 바탕으로 3~5명의 핵심 플레이어블 캐릭터들을 생성한다. 반드시 지정된 JSON 형식에 맞춰 응답해야 한다.",
+    }
+    
+    user = {
+        "role": "user",
+        "content": f"""다음 시나리오 정보를 바탕으로 3~5명의 플레이어블 캐릭터 목록을 생성해줘. 응답 형식은 반드시 'characters'라는 키를 가진 JSON 객체여야 하며, 그 값은 캐릭터 객체들의 배열(리스트)이어야 한다.
+                        형식(JSON): {{
+                            "name": "캐릭터 이름",
+                            "name_eng": "캐릭터 영어 이름",
+                            "role": "클래스/아키타입(탱커/정찰자/현자/외교가/트릭스터 등)",
+                            "role_eng": "클래스/아키타입(탱커/정찰자/현자/외교가/트릭스터 등)를 영어로 번역",
+                            "playstyle": "행동/대화 성향, 선택 경향, 말투 가이드",
+                            "playstyle_eng": "행동/대화 성향, 선택 경향, 말투 가이드를 영어로 번역",
+                            "stats": {{"힘":1-10,"민첩":1-10,"지식":1-10,"의지":1-10,"매력":1-10,"운":1-10}},
+                            "skills": [
+                                {{
+                                    "name":"대표 스킬1",
+                                    "description":"스킬1 설명",
+                                }},
+                                {{
+                                    "name":"대표 스킬2",
+                                    "description":"스킬2 설명",
+                                }}
+                            ],
+                            "starting_items": [
+                                {{
+                                    "name":"시작 아이템1",
+                                    "description":"아이템1 설명",
+                                }},
+                                {{
+                                    "name":"시작 아이템2",
+                                    "description":"아이템2 설명",
+                                }}
+                            ]
+                        }}
+                        시나리오: {scenario.description}
+                    """
+    }
+    return [system, user]
+
+# 캐릭터 DB 저장 (마지막 캐릭터의 생성 여부 반환)
+def save_characters(scenario, characters_data) :
+    created_characters = []
+    created = False
+    for characters in characters_data:
+        character, created = Character.objects.get_or_create(
+            scenario=scenario,
+            name=characters.get('name', ''),
+            name_eng=characters.get('name_eng', ''),
+            role=characters.get('role', ''),
+            role_eng=characters.get('role_eng', ''),
+            description=characters.get('playstyle', ''),
+            description_eng=characters.get('playstyle_eng', ''),
+            defaults={
+                'items': list(characters.get('starting_items', [])),
+                'ability': {
+                    'stats': characters.get('stats', {}),
+                    'skills': characters.get('skills', []),
+                }
+            }
+        )
+        created_characters.append(character)
+    invalidate_model(Character)
+    return created_characters, created
+
+# 이미지 프롬프트용 캐릭터 요약 요청
+def build_character_summary_prompt(character_name, character_role, character_description) :
+    character_list_str = "\n".join([
+        f"- {character_name}: {character_role}, {character_description}"
+    ])
+    print(f">> 이미지 생성을 위한 캐릭터 정보:\n{character_list_str}")
+
+    return f"""
+        Please summarize the following list of characters into a single, concise descriptive sentence for an image generation prompt. Focus on their key roles and appearances.
+        Example output: "A brave warrior named Aragorn, a wise wizard Gandalf, and a small hobbit Frodo."
+
+        Character List:
+        {character_list_str}
+        """
+
+# DALL-E 프롬프트 작성 요청
+def build_dalle_request_prompt(character_info) :
+    return f"""
+        You are an expert prompt writer for an 8-bit pixel art image generator.background must be simple and dark. Your task is to convert a scene description into a single, visually detailed paragraph for the DALL-E model.
+        
+        **Consistent Rules (Apply to all images):**
+        - **Relevant Characters:** {character_info}
+        - **Art Style:** {IMAGE_STYLE_DESCRIPTION}
+
+        Combine all of this information into a single descriptive paragraph. Focus on visual details like character actions, expressions, and background elements. Do not use markdown or lists.
+        """
+
 # 장르 DB 저장
 class GenreCreateView(AuthMixin, CreateMixin) :
     def post(self, request) :
@@ -136,6 +318,11 @@ class GenreUpdateAllView(AuthMixin, UpdateAllMixin) :
     def put(self, request) :
         return super().put(request, Genre)
 
+# 장르 DB 일괄 업데이트 (id 별 변경)
+class GenreBatchUpdateView(AuthMixin, BatchUpdateMixin) :
+    def patch(self, request) :
+        return super().patch(request, Genre)
+
 # 모드 DB 저장
 class ModeCreateView(AuthMixin, CreateMixin) :
     def post(self, request) :
@@ -155,6 +342,11 @@ class ModeUpdateView(AuthMixin, UpdateMixin) :
 class ModeUpdateAllView(AuthMixin, UpdateAllMixin) :
     def put(self, request) :
         return super().put(request, Mode)
+
+# 모드 DB 일괄 업데이트 (id 별 변경)
+class ModeBatchUpdateView(AuthMixin, BatchUpdateMixin) :
+    def patch(self, request) :
+        return super().patch(request, Mode)
     
 # 난이도 DB 저장
 class DifficultyCreateView(AuthMixin, CreateMixin) :
@@ -175,6 +367,11 @@ class DifficultyUpdateView(AuthMixin, UpdateMixin) :
 class DifficultyUpdateAllView(AuthMixin, UpdateAllMixin) :
     def put(self, request) :
         return super().put(request, Difficulty)
+
+# 난이도 DB 일괄 업데이트 (id 별 변경)
+class DifficultyBatchUpdateView(AuthMixin, BatchUpdateMixin) :
+    def patch(self, request) :
+        return super().patch(request, Difficulty)
     
 # 전달되는 시나리오 파일을 Azure Blob Storage 에 업로드
 class SenarioFileUploadView(AuthMixin) :
@@ -186,22 +383,39 @@ class SenarioFileUploadView(AuthMixin) :
                 'message' : '파일이 없습니다.'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        # Azure Blob Storage 파일 업로드
+        # Azure Blob Storage 파일 업로드 (내용 해시를 blob 이름으로 사용)
         try :
+            content_hash, size = hash_uploaded_file(file)
             blob_util = AzureBlobStorageUtil(AppSettings.AZURE_BLOB_STORAGE_CONNECT_KEY_FOR_FILE)
             container_client = blob_util.get_or_create_container('scenarios')
+
+            # 같은 내용이 이미 업로드되어 있으면 업로드 생략
+            source = find_source('scenario', content_hash=content_hash)
+            if source :
+                file_url = blob_util.get_existing_blob_url(container_client, source.blob_name)
+                if file_url :
+                    target = get_generated_target(source)
+                    return JsonResponse({
+                        'message' : '이미 업로드된 파일입니다.',
+                        'file_url' : file_url,
+                        'blob_name' : source.blob_name,
+                        'scenario_id' : str(target.id) if target else None,
+                    }, status=status.HTTP_200_OK)
+
+            blob_name = source.blob_name if source else get_content_blob_name(content_hash, file.name)
             file_url = blob_util.upload_blob(
                 container_client=container_client,
-                blob_name=file.name,
-                data=file.read(),
+                blob_name=blob_name,
+                data=file,
                 content_type=file.content_type,
                 overwrite=True
             )
+            register_upload('scenario', content_hash, blob_name, file.name, size)
 
             return JsonResponse({
                 'message' : '파일 업로드 성공',
                 'file_url' : file_url,
-                'blob_name' : file.name
+                'blob_name' : blob_name
             }, status=status.HTTP_201_CREATED)
         except Exception as e :
             print(f'파일 업로드 Exception: {e}')     
@@ -220,6 +434,11 @@ class SenarioCreateView(AuthMixin) :
                 'message' : '시나리오 이름 혹은 업로드 파일 url 이 필요합니다.'
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        # 같은 파일로 이미 생성된 시나리오가 있으면 다운로드와 AI 분석 생략
+        existing = find_generated_target('scenario', blob_name=blob_name)
+        if existing :
+            return self._existing_response(existing)
+
         # 1. Azure Blob Storage 에서 파일 내용 가져오기
         scenario_text = ''
         try:
@@ -236,6 +455,12 @@ class SenarioCreateView(AuthMixin) :
             return JsonResponse({
                 'message' : '파일 다운로드 실패'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        # 다른 이름으로 올라온 같은 내용의 파일도 재사용
+        content_hash = hash_text(scenario_text)
+        existing = find_generated_target('scenario', content_hash=content_hash)
+        if existing :
+            return self._existing_response(existing)
         
         # 2. Azure OpenAI 클라이언트 초기화
         client = get_azure_openai_client(
@@ -249,38 +474,16 @@ class SenarioCreateView(AuthMixin) :
                 'message': 'AI 서비스 연결 실패: OpenAI 클라이언트 초기화 오류'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        # 3. AI 시스템 메시지 및 Azure OpenAI 요청
-        system = {"role": "system", "content": "너는 스토리 분석가다. 캐릭터 창작에 도움이 되는 핵심만 간결히 요약해라."}
-        user = {
-            "role": "user",
-            "content": f"""다음 JSON 스토리를 캐릭터 창작용으로 요약.
-                    형식(JSON): {
-                        {
-                            "title" : "스토리 제목",
-                            "title_eng" : "스토리 영어 제목",
-                            "setting": "시대/장소/분위기",
-                            "themes": ["주제1","주제2"],
-                            "tone": "전체 톤",
-                            "notable_characters": ["핵심 인물/집단 2~6개"],
-                            "conflicts": ["갈등/과제 2~4개"],
-                            "description": "한줄 요약",
-                            "description_eng": "한줄 요약을 영어로 번역"
-                        }
-                    }
-                    스토리: {scenario_text}"""
-        }
-
-        # Azure OpenAI API 요청
+        # 3. AI 시스템 메시지 및 Azure OpenAI 요청 (긴 원문은 조각별 요약을 합쳐서 사용)
         try:
+            source_text = summarize_long_text(client, AppSettings.AZURE_OPENAI_DEPLOYMENT, scenario_text)
+            messages = build_scenario_messages(source_text)
+
+            # Azure OpenAI API 요청
             response = client.chat.completions.create(
                 model=AppSettings.AZURE_OPENAI_DEPLOYMENT,
-                messages=[system, user],
-                temperature=0.7,
-                top_p=0.95,
-                max_tokens=2000,
-                frequency_penalty=0,
-                presence_penalty=0,
-                response_format={"type": "json_object"} # 결과는 무조건 JSON 형식으로 받기
+                messages=messages,
+                **JSON_COMPLETION_OPTIONS
             )
         
             ai_response_content = response.choices[0].message.content
@@ -297,13 +500,8 @@ class SenarioCreateView(AuthMixin) :
         # 4. AI 응답 데이터 DB 저장
         try :
             # Scenario DB 저장
-            scenario, created = Scenario.objects.get_or_create(
-                title=scenario_name,
-                title_eng=senario_json.get('title_eng',''),
-                description=senario_json.get('description',''),
-                description_eng=senario_json.get('description_eng',''),
-            )
-
+            scenario, created = save_scenario(scenario_name, senario_json)
+            mark_generated('scenario', content_hash, blob_name, scenario.id)
             serializer = ScenarioSerializer(scenario)
 
             if created :
@@ -325,6 +523,13 @@ class SenarioCreateView(AuthMixin) :
                 'message' : 'AI 응답 데이터 DB 저장 실패',
                 'ai_response' : senario_json
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def _existing_response(self, scenario) :
+        print(f"같은 원본으로 생성된 시나리오 재사용: {scenario.id}")
+        return JsonResponse({
+            'message' : '같은 파일로 생성된 시나리오가 있습니다.',
+            'data' : ScenarioSerializer(scenario).data,
+        }, status=status.HTTP_200_OK)
         
 # 시나리오 DB 조회
 class ScenarioListView(AuthMixin, ListViewMixin) :
@@ -341,6 +546,11 @@ class ScenarioUpdateAllView(AuthMixin, UpdateAllMixin) :
     def put(self, request) :
         return super().put(request, Scenario)
 
+# 시나리오 DB 일괄 업데이트 (id 별 변경)
+class ScenarioBatchUpdateView(AuthMixin, BatchUpdateMixin) :
+    def patch(self, request) :
+        return super().patch(request, Scenario)
+
 # 캐릭터 생성
 class CharacterCreateView(AuthMixin) :
     def post(self, request) :
@@ -373,58 +583,14 @@ class CharacterCreateView(AuthMixin) :
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
         # 3. AI 시스템 메시지 및 Azure OpenAI 요청
-        system = {
-            "role": "system",
-            "content": "너는 창의적인 스토리 작가이자 캐릭터 창조자다. 주어진 시나리오를 바탕으로 3~5명의 핵심 플레이어블 캐릭터들을 생성한다. 반드시 지정된 JSON 형식에 맞춰 응답해야 한다.",
-        }
-        
-        user = {
-            "role": "user",
-            "content": f"""다음 시나리오 정보를 바탕으로 3~5명의 플레이어블 캐릭터 목록을 생성해줘. 응답 형식은 반드시 'characters'라는 키를 가진 JSON 객체여야 하며, 그 값은 캐릭터 객체들의 배열(리스트)이어야 한다.
-                            형식(JSON): {{
-                                "name": "캐릭터 이름",
-                                "name_eng": "캐릭터 영어 이름",
-                                "role": "클래스/아키타입(탱커/정찰자/현자/외교가/트릭스터 등)",
-                                "role_eng": "클래스/아키타입(탱커/정찰자/현자/외교가/트릭스터 등)를 영어로 번역",
-                                "playstyle": "행동/대화 성향, 선택 경향, 말투 가이드",
-                                "playstyle_eng": "행동/대화 성향, 선택 경향, 말투 가이드를 영어로 번역",
-                                "stats": {{"힘":1-10,"민첩":1-10,"지식":1-10,"의지":1-10,"매력":1-10,"운":1-10}},
-                                "skills": [
-                                    {{
-                                        "name":"대표 스킬1",
-                                        "description":"스킬1 설명",
-                                    }},
-                                    {{
-                                        "name":"대표 스킬2",
-                                        "description":"스킬2 설명",
-                                    }}
-                                ],
-                                "starting_items": [
-                                    {{
-                                        "name":"시작 아이템1",
-                                        "description":"아이템1 설명",
-                                    }},
-                                    {{
-                                        "name":"시작 아이템2",
-                                        "description":"아이템2 설명",
-                                    }}
-                                ]
-                            }}
-                            시나리오: {scenario.description}
-                        """
-        }
+        messages = build_character_messages(scenario)
 
         # Azure OpenAI API 요청
         try:
             response = client.chat.completions.create(
                 model=AppSettings.AZURE_OPENAI_DEPLOYMENT,
-                messages=[system, user],
-                temperature=0.7,
-                top_p=0.95,
-                max_tokens=2000,
-                frequency_penalty=0,
-                presence_penalty=0,
-                response_format={"type": "json_object"} # 결과는 무조건 JSON 형식으로 받기
+                messages=messages,
+                **JSON_COMPLETION_OPTIONS
             )
         
             ai_response_content = response.choices[0].message.content
@@ -447,26 +613,7 @@ class CharacterCreateView(AuthMixin) :
         # AI 응답 데이터 DB 저장
         try :
             # 캐릭터 DB 저장
-            created_characters = []
-            for characters in characters_data:
-                character, created = Character.objects.get_or_create(
-                    scenario=scenario,
-                    name=characters.get('name', ''),
-                    name_eng=characters.get('name_eng', ''),
-                    role=characters.get('role', ''),
-                    role_eng=characters.get('role_eng', ''),
-                    description=characters.get('playstyle', ''),
-                    description_eng=characters.get('playstyle_eng', ''),
-                    defaults={
-                        'items': list(characters.get('starting_items', [])),
-                        'ability': {
-                            'stats': characters.get('stats', {}),
-                            'skills': characters.get('skills', []),
-                        }
-                    }
-                )
-                created_characters.append(character)
-
+            created_characters, created = save_characters(scenario, characters_data)
             serializer = CharacterSerializer(created_characters, many=True)
 
             if created :
@@ -492,8 +639,16 @@ class CharacterCreateView(AuthMixin) :
 # 캐릭터 DB 조회
 class CharacterListView(AuthMixin) :
     def get(self, request, scenario_id) :
+        # 없는 시나리오는 ETag 가 일치해도 404 (캐릭터 테이블 버전에는 시나리오 삭제가 반영되지 않음)
         scenario = get_object_or_404(Scenario, id=scenario_id)
 
+        # 캐릭터 테이블 버전이 같으면 본문 없이 304 응답
+        cache_key = get_cache_key(Character)
+        etag = make_etag(cache_key, get_version(cache_key), scenario_id)
+        not_modified = get_not_modified_response(request, etag)
+        if not_modified is not None :
+            return not_modified
+
         try :
             character = Character.objects.filter(
                 scenario=scenario,
@@ -506,19 +661,25 @@ class CharacterListView(AuthMixin) :
             }, status=status.HTTP_404_NOT_FOUND)
         
         serializer = CharacterSerializer(character, many=True)
-        return JsonResponse({
+        response = JsonResponse({
             'message' : '캐릭터 조회 성공',
             'characters' : serializer.data
         }, status=status.HTTP_200_OK)
+        return set_etag_headers(response, etag)
 
 # 캐릭터 DB 업데이트
 class CharacterUpdateView(AuthMixin, UpdateMixin) :
     def put(self, request, character_id) :
         return super().put(request, 'character_id', Character, CharacterSerializer, character_id)
 
+# 캐릭터 DB 일괄 업데이트 (id 별 변경)
+class CharacterBatchUpdateView(AuthMixin, BatchUpdateMixin) :
+    def patch(self, request) :
+        return super().patch(request, Character)
+
 # 이미지 공통 로직 View
 class BaseImageView(AuthMixin) :
-    STYLE_DESCRIPTION = "Simple and clean 8-bit pixel art,dark background,focus on character,only upper body,like mug shot,only one person/object,wearing hanbok, minimalist, retro video game asset, clear outlines, Korean fairy tale theme. No Japanese or Chinese elements."
+    STYLE_DESCRIPTION = IMAGE_STYLE_DESCRIPTION
 
     # 에러 응답
     def _handle_error_response(self, message, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR):
@@ -537,19 +698,8 @@ class BaseImageView(AuthMixin) :
         if not gpt_client :
             raise Exception('AI 서비스 연결 실패: OpenAI 클라이언트 초기화 오류')
 
-        character_list_str = "\n".join([
-            f"- {character_name}: {character_role}, {character_description}"
-        ])
-        print(f">> 이미지 생성을 위한 캐릭터 정보:\n{character_list_str}")
-
-        summary_prompt = f"""
-        Please summarize the following list of characters into a single, concise descriptive sentence for an image generation prompt. Focus on their key roles and appearances.
-        Example output: "A brave warrior named Aragorn, a wise wizard Gandalf, and a small hobbit Frodo."
+        summary_prompt = build_character_summary_prompt(character_name, character_role, character_description)
 
-        Character List:
-        {character_list_str}
-        """
-        
         try :
             response = gpt_client.chat.completions.create(
                 model=AppSettings.AZURE_OPENAI_DEPLOYMENT,
@@ -575,15 +725,7 @@ class BaseImageView(AuthMixin) :
         if not gpt_client :
             raise Exception('AI 서비스 연결 실패: OpenAI 클라이언트 초기화 오류')
 
-        gpt_prompt = f"""
-        You are an expert prompt writer for an 8-bit pixel art image generator.background must be simple and dark. Your task is to convert a scene description into a single, visually detailed paragraph for the DALL-E model.
-        
-        **Consistent Rules (Apply to all images):**
-        - **Relevant Characters:** {character_info}
-        - **Art Style:** {self.STYLE_DESCRIPTION}
-
-        Combine all of this information into a single descriptive paragraph. Focus on visual details like character actions, expressions, and background elements. Do not use markdown or lists.
-        """
+        gpt_prompt = build_dalle_request_prompt(character_info)
 
         try :
             gpt_response = gpt_client.chat.completions.create(
@@ -613,10 +755,7 @@ class BaseImageView(AuthMixin) :
             dalle_response = dalle_client.images.generate(
                 model=AppSettings.AZURE_OPENAI_DALLE_DEPLOYMENT,
                 prompt=dalle_prompt,
-                n=1,
-                size="1024x1024",
-                style="vivid",
-                quality="standard"
+                **DALLE_IMAGE_OPTIONS
             )
             temp_image_url = dalle_response.data[0].url if dalle_response.data else None
             if not temp_image_url :
@@ -632,9 +771,11 @@ class BaseImageView(AuthMixin) :
             image_response = requests.get(temp_image_url, stream=True)
             image_response.raise_for_status() # 200 OK가 아닌 경우 예외 발생
 
-            content_settings_obj = ContentSettings(content_type='image/png')
-            blob_client.upload_blob(image_response.content, overwrite=True, content_settings=content_settings_obj)
-            final_image_url = blob_client.url
+            # URL 에 내용 버전(ETag)이 들어가므로 장기 캐시
+            content_settings_obj = ContentSettings(content_type='image/png', cache_control=IMAGE_CACHE_CONTROL)
+            result = blob_client.upload_blob(image_response.content, overwrite=True, content_settings=content_settings_obj)
+            notify_change(blob_client)
+            final_image_url = get_versioned_url(blob_client.url, result.get('etag'))
             print(f">> 업로드 성공! 최종 URL: {final_image_url}\n")
             return final_image_url
         except requests.exceptions.RequestException as e :
@@ -648,6 +789,7 @@ class BaseImageView(AuthMixin) :
             character = Character.objects.get(id=character_id)
             character.image_path = image_path
             character.save()
+            invalidate_model(Character)
         except Exception as e :
             raise Exception(f"DB 업데이트 실패 (Character ID: {character_id}): {e}")
 
@@ -672,12 +814,10 @@ class CharacterImageCreateView(BaseImageView) :
             container_client = blob_util.get_or_create_container(container_name, public=True)
             blob_client = container_client.get_blob_client(blob=blob_name)
             
-            existing_image_url = blob_util.check_blob_exists_and_get_url(blob_client)
+            # 기존 이미지는 ETag 버전 URL 을 그대로 사용 (내용이 같으면 URL 도 같아 캐시 유지)
+            existing_image_url = blob_util.get_existing_blob_url(container_client, blob_name, versioned=True)
             if existing_image_url:
-                # 타임스탬프를 붙여서 캐시 무효화
-                timestamp = int(time.time())
-                existing_image_url_with_timestamp = f'{existing_image_url}?t={timestamp}'
-                self._update_character_image_path(character_id, existing_image_url_with_timestamp)
+                self._update_character_image_path(character_id, existing_image_url)
                 return JsonResponse({
                     'message': '이미지 생성 완료 (기존 이미지 사용)',
                     'character_id': character_id,
@@ -689,10 +829,7 @@ class CharacterImageCreateView(BaseImageView) :
             temp_image_url = self._generate_dalle_image(dalle_prompt, character_id)
             final_image_url = self._upload_image_to_blob(blob_client, temp_image_url, character_id)
 
-            # 타임스탬프를 붙여서 캐시 무효화
-            timestamp = int(time.time())
-            final_image_url_with_timestamp  = f'{final_image_url}?t={timestamp}'
-            self._update_character_image_path(character_id, final_image_url_with_timestamp)
+            self._update_character_image_path(character_id, final_image_url)
 
             return JsonResponse({
                 'message': '이미지 개별 생성 및 업로드 완료',
@@ -732,18 +869,14 @@ class CharacterImageDeleteView(BaseImageView) :
             blob_name = path_parts[1]
 
             blob_util = AzureBlobStorageUtil(AppSettings.AZURE_BLOB_STORAGE_CONNECT_KEY_FOR_IMAGE)
-            container_client = blob_util.get_or_create_container(container_name, public=True)
-            blob_client = container_client.get_blob_client(blob=blob_name)
+            container_client = blob_util.blob_service_client.get_container_client(container_name)
             
-            # Azure Blob Storage에서 이미지 삭제 시도
+            # Azure Blob Storage에서 이미지 삭제 시도 (존재 확인 없이 한 번에 삭제, 없으면 건너뜀)
             try:
-                if blob_client.exists():
-                    blob_client.delete_blob()
+                if blob_util.delete_blob(container_client, blob_name):
                     print(f"Azure Blob Storage에서 이미지 삭제 완료: {blob_name}")
                 else:
                     print(f"Azure Blob Storage에 이미지가 존재하지 않아 삭제를 건너뛰었습니다: {blob_name}")
-            except ResourceNotFoundError:
-                print(f"Azure Blob Storage에서 Blob '{blob_name}'을(를) 찾을 수 없어 삭제를 건너뛰었습니다.")
             except Exception as blob_delete_e:
                 print(f"Azure Blob Storage 이미지 삭제 실패 (Blob: {blob_name}): {blob_delete_e}")
                 return self._handle_error_response(
@@ -754,6 +887,7 @@ class CharacterImageDeleteView(BaseImageView) :
             # Blob 삭제가 성공했거나, Blob이 없었을 경우에만 DB 업데이트 진행
             character.image_path = None
             character.save()
+            invalidate_model(Character)
             print(f"DB에서 Character ID {character_id}의 image_path 삭제 완료")
 
             return JsonResponse({
@@ -770,6 +904,36 @@ class CharacterImageDeleteView(BaseImageView) :
             print(f"이미지 삭제 중 오류 발생: {e}")
             return self._handle_error_response(str(e))
         
+# 시나리오 전체 캐릭터 이미지 삭제 (Blob Batch 삭제 한 번 + bulk_update 한 번)
+class ScenarioImageDeleteAllView(BaseImageView) :
+    def delete(self, request, scenario_id) :
+        try :
+            scenario = Scenario.objects.get(id=scenario_id)
+        except (Scenario.DoesNotExist, ValidationError) :
+            return self._handle_error_response(
+                f"Scenario ID {scenario_id}를 찾을 수 없습니다.",
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+
+        rows = [('character', character) for character in Character.objects.filter(scenario=scenario).only('id', 'image_path')]
+
+        try :
+            blob_util = AzureBlobStorageUtil(AppSettings.AZURE_BLOB_STORAGE_CONNECT_KEY_FOR_IMAGE)
+            results = delete_row_images(blob_util.blob_service_client, rows)
+        except Exception as e :
+            print(f"이미지 일괄 삭제 중 오류 발생: {e}")
+            return self._handle_error_response(str(e))
+        invalidate_model(Character)
+
+        # 일부 항목만 실패하면 207 (실패한 항목의 image_path 는 그대로 유지)
+        counts = count_image_results(results)
+        return JsonResponse({
+            'message': '시나리오 이미지 일괄 삭제 완료' if not counts.get('failed') else '일부 이미지 삭제 실패',
+            'scenario_id': str(scenario.id),
+            'counts': counts,
+            'results': results,
+        }, status=status.HTTP_207_MULTI_STATUS if counts.get('failed') else status.HTTP_200_OK)
+
 # 싱글/멀티모드 게임 통계
 class GameStatisticsView(AuthMixin):
     def get(self, request):
@@ -0,0 +1,129 @@
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from storymode.models import StorymodeSession, StorymodeSessionEvent, SyncWatermark
+
+
+# 한 번에 읽을 세션 수
+EVENT_SYNC_BATCH_SIZE = getattr(settings, 'SESSION_EVENT_SYNC_BATCH_SIZE', 500)
+# 커밋 순서와 updated_at 순서가 다를 수 있으므로 마지막 위치보다 조금 앞에서 다시 읽음 (seq 기준으로 중복 없이 추가)
+EVENT_SYNC_OVERLAP_SECONDS = getattr(settings, 'SESSION_EVENT_SYNC_OVERLAP_SECONDS', 60)
+
+EVENT_SYNC_KEY = 'storymode_session_event'
+
+# history 항목에서 시각으로 사용할 키 (저장하는 서비스마다 이름이 다를 수 있음)
+TIMESTAMP_KEYS = ('ts', 'timestamp', 'created_at', 'selected_at')
+
+
+def parse_uuid(value) :
+    if not value :
+        return None
+    try :
+        return uuid.UUID(str(value))
+    except ValueError :
+        return None
+
+def parse_timestamp(item) :
+    for key in TIMESTAMP_KEYS :
+        value = item.get(key)
+        if not value :
+            continue
+        try :
+            parsed = parse_datetime(str(value))
+        except ValueError :
+            parsed = None
+        if parsed :
+            return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+    return None
+
+# history 항목 하나를 이벤트로 변환 (형식이 다른 항목은 moment_id 등이 비어 있는 이벤트로 저장하여 seq 를 유지)
+def build_event(session, seq, item) :
+    if not isinstance(item, dict) :
+        item = {}
+    action_type = item.get('action_type')
+    return StorymodeSessionEvent(
+        session_id=session.id,
+        story_id=session.story_id,
+        seq=seq,
+        moment_id=parse_uuid(item.get('moment_id')),
+        choice_id=parse_uuid(item.get('choice_id')),
+        action_type=str(action_type)[:200] if action_type else None,
+        ts=parse_timestamp(item),
+    )
+
+def get_watermark(key) :
+    watermark, _ = SyncWatermark.objects.get_or_create(key=key)
+    return watermark
+
+# 세션 history 를 이벤트 로그에 추가 (updated_at, id 순서로 배치 단위 처리, 이미 추가된 seq 이후만 추가)
+# history 가 초기화되어 이미 추가된 seq 보다 짧아진 세션은 기존 이벤트를 지우고 처음부터 다시 추가
+def sync_session_events(batch_size=EVENT_SYNC_BATCH_SIZE, full=False, on_progress=None) :
+    watermark = get_watermark(EVENT_SYNC_KEY)
+    position = {} if full else watermark.position
+
+    last_updated_at = parse_datetime(position['updated_at']) if position.get('updated_at') else None
+    if last_updated_at :
+        last_updated_at -= timedelta(seconds=EVENT_SYNC_OVERLAP_SECONDS)
+    last_session_id = None
+
+    batch_count = 0
+    session_count = 0
+    event_count = 0
+    reset_count = 0
+    while True :
+        sessions = StorymodeSession.objects.only('id', 'story_id', 'history', 'updated_at').order_by('updated_at', 'id')
+        if last_updated_at and last_session_id :
+            sessions = sessions.filter(Q(updated_at__gt=last_updated_at) | Q(updated_at=last_updated_at, id__gt=last_session_id))
+        elif last_updated_at :
+            sessions = sessions.filter(updated_at__gte=last_updated_at)
+        sessions = list(sessions[:batch_size])
+        if not sessions :
+            break
+
+        # 배치 세션들의 마지막 seq 를 한 번에 조회
+        last_seqs = dict(
+            StorymodeSessionEvent.objects.filter(session_id__in=[session.id for session in sessions])
+            .values('session_id').annotate(last_seq=Max('seq')).values_list('session_id', 'last_seq')
+        )
+
+        events = []
+        reset_session_ids = []
+        for session in sessions :
+            history = session.history if isinstance(session.history, list) else []
+            last_seq = last_seqs.get(session.id)
+            if last_seq is not None and len(history) <= last_seq :
+                print(f'⚠️ 세션 history 초기화 감지: {session.id} (기록된 seq {last_seq}, history {len(history)}건), 이벤트를 다시 추가합니다.')
+                reset_session_ids.append(session.id)
+                last_seq = None
+            start = last_seq + 1 if last_seq is not None else 0
+            events.extend(build_event(session, seq, item) for seq, item in enumerate(history[start:], start))
+
+        last_updated_at = sessions[-1].updated_at
+        last_session_id = sessions[-1].id
+        with transaction.atomic(using=router.db_for_write(StorymodeSessionEvent)) :
+            if reset_session_ids :
+                StorymodeSessionEvent.objects.filter(session_id__in=reset_session_ids).delete()
+            StorymodeSessionEvent.objects.bulk_create(events, batch_size=1000, ignore_conflicts=True)
+            watermark.position = {'updated_at': last_updated_at.isoformat()}
+            watermark.save(update_fields=['position', 'updated_at'])
+
+        batch_count += 1
+        session_count += len(sessions)
+        event_count += len(events)
+        reset_count += len(reset_session_ids)
+        if on_progress :
+            on_progress(batch_count, session_count, event_count)
+
+        if len(sessions) < batch_size :
+            break
+
+    return {
+        'batch_count': batch_count,
+        'session_count': session_count,
+        'event_count': event_count,
+        'reset_count': reset_count,
+    }
@@ -0,0 +1,230 @@
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from storymode.models import StorymodeMoment, StorymodeChoice, StorymodeSessionEvent, StoryMomentCounter, StoryChoiceCounter, SyncWatermark
+from storymode.events import get_watermark
+
+
+# 한 번에 집계할 이벤트 수
+FUNNEL_BATCH_SIZE = getattr(settings, 'STORY_FUNNEL_BATCH_SIZE', 5000)
+# id 는 커밋 순서가 아니라 INSERT 순서로 발급되므로, 집계 시점에 비어 있던 id 는 늦게 커밋될 수 있어 이 시간 동안 다시 확인
+# (롤백 등으로 끝내 생기지 않는 id 는 이후 확인 대상에서 제외)
+FUNNEL_GAP_TIMEOUT_SECONDS = getattr(settings, 'STORY_FUNNEL_GAP_TIMEOUT_SECONDS', 600)
+
+FUNNEL_SYNC_KEY = 'story_branch_funnel'
+
+
+# 카운터 증가 (INSERT ... ON CONFLICT DO UPDATE, PostgreSQL / sqlite 공통 문법)
+def increment_counters(model, key_fields, count_field, deltas) :
+    if not deltas :
+        return
+
+    connection = connections[router.db_for_write(model)]
+    quote_name = connection.ops.quote_name
+    opts = model._meta
+    table = quote_name(opts.db_table)
+    key_columns = [quote_name(opts.get_field(field_name).column) for field_name in key_fields]
+    count_column = quote_name(opts.get_field(count_field).column)
+
+    sql = (
+        f'INSERT INTO {table} ({", ".join(key_columns)}, {count_column}) '
+        f'VALUES ({", ".join(["%s"] * (len(key_columns) + 1))}) '
+        f'ON CONFLICT ({", ".join(key_columns)}) '
+        f'DO UPDATE SET {count_column} = {table}.{count_column} + EXCLUDED.{count_column}'
+    )
+    key_field_objects = [opts.get_field(field_name) for field_name in key_fields]
+    params = [
+        [field.get_db_prep_value(value, connection) for field, value in zip(key_field_objects, key)] + [count]
+        for key, count in deltas.items()
+    ]
+    with connection.cursor() as cursor :
+        cursor.executemany(sql, params)
+
+# 새 이벤트 바로 앞의 이벤트 (이전 배치에서 처리된 이벤트) 조회
+# 세션 id 로 한 번에 조회 후 seq 는 Python 에서 비교 (세션마다 seq 가 달라 OR 조건이 배치 크기만큼 커지는 것 방지)
+def load_previous_events(first_events, using=None) :
+    previous_seqs = {session_id: event['seq'] - 1 for session_id, event in first_events.items() if event['seq'] > 0}
+    if not previous_seqs :
+        return {}
+
+    events = (
+        StorymodeSessionEvent.objects.using(using)
+        .filter(session_id__in=list(previous_seqs), seq__in=set(previous_seqs.values()))
+        .values('session_id', 'seq', 'moment_id', 'choice_id')
+    )
+    return {event['session_id']: event for event in events if event['seq'] == previous_seqs[event['session_id']]}
+
+# 늦게 커밋된 이벤트 바로 다음의 이벤트 중 이미 집계된 이벤트 조회 (늦은 이벤트에서 나가는 이동을 집계하기 위함)
+def load_next_events(late_events, batch_ids, using=None) :
+    next_keys = {(event['session_id'], event['seq'] + 1) for event in late_events}
+    if not next_keys :
+        return []
+
+    events = (
+        StorymodeSessionEvent.objects.using(using)
+        .filter(session_id__in={session_id for session_id, _ in next_keys}, seq__in={seq for _, seq in next_keys})
+        .values('id', 'session_id', 'seq', 'moment_id')
+    )
+    return [event for event in events if (event['session_id'], event['seq']) in next_keys and event['id'] not in batch_ids]
+
+# (분기점, 다음 분기점) -> 선택지 (history 항목에 choice_id 가 없을 때 이동 경로로 선택지 추정)
+def load_choice_lookup(moment_ids) :
+    choices = StorymodeChoice.objects.filter(moment_id__in=moment_ids, next_moment__isnull=False).values_list('id', 'moment_id', 'next_moment_id')
+    return {(moment_id, next_moment_id): choice_id for choice_id, moment_id, next_moment_id in choices}
+
+# 이벤트 배치에서 분기점 도달 / 선택지 이동 횟수 계산
+def count_transitions(events, previous_events, next_events=()) :
+    visit_deltas = Counter()
+    transitions = []
+    last_events = dict(previous_events)
+    events_by_seq = {(event['session_id'], event['seq']): event for event in events}
+
+    for event in events :
+        if event['moment_id'] :
+            visit_deltas[(event['story_id'], event['moment_id'])] += 1
+
+        previous = last_events.get(event['session_id'])
+        if previous and previous['seq'] == event['seq'] - 1 and previous['moment_id'] and event['moment_id'] :
+            transitions.append((event['story_id'], previous['moment_id'], previous['choice_id'], event['moment_id']))
+        last_events[event['session_id']] = event
+
+    for next_event in next_events :
+        previous = events_by_seq.get((next_event['session_id'], next_event['seq'] - 1))
+        if previous and previous['moment_id'] and next_event['moment_id'] :
+            transitions.append((previous['story_id'], previous['moment_id'], previous['choice_id'], next_event['moment_id']))
+
+    choice_lookup = load_choice_lookup({transition[1] for transition in transitions if not transition[2]})
+    choice_deltas = Counter()
+    for story_id, moment_id, choice_id, next_moment_id in transitions :
+        choice_id = choice_id or choice_lookup.get((moment_id, next_moment_id))
+        if choice_id :
+            choice_deltas[(story_id, moment_id, choice_id)] += 1
+
+    return visit_deltas, choice_deltas
+
+# 이전 집계에서 비어 있던 id 중 아직 확인 기간이 지나지 않은 것 {id: 처음 발견한 시각}
+def get_pending_gaps(position, now) :
+    cutoff = now - timedelta(seconds=FUNNEL_GAP_TIMEOUT_SECONDS)
+    gaps = {}
+    for event_id, found_at in position.get('gaps', {}).items() :
+        found_at = parse_datetime(found_at)
+        if found_at and found_at > cutoff :
+            gaps[int(event_id)] = found_at
+    return gaps
+
+def dump_gaps(gaps) :
+    return {str(event_id): found_at.isoformat() for event_id, found_at in gaps.items()}
+
+# 마지막으로 집계한 id 와 새 배치의 마지막 id 사이에서 비어 있는 id
+def find_gaps(last_event_id, events) :
+    if not events :
+        return set()
+    return set(range(last_event_id + 1, events[-1]['id'])) - {event['id'] for event in events}
+
+# 마지막으로 집계한 이벤트 id 이후의 이벤트와 늦게 커밋된 이벤트(이전에 비어 있던 id)만 카운터에 반영
+def update_branch_counters(batch_size=FUNNEL_BATCH_SIZE, on_progress=None) :
+    get_watermark(FUNNEL_SYNC_KEY)
+    db = router.db_for_write(SyncWatermark)
+    fields = ('id', 'session_id', 'story_id', 'seq', 'moment_id', 'choice_id')
+
+    batch_count = 0
+    event_count = 0
+    while True :
+        # 워터마크 행을 잠근 상태에서 읽기/집계/갱신하여 동시에 실행된 집계가 같은 이벤트를 중복 집계하지 않도록 함
+        with transaction.atomic(using=db) :
+            watermark = SyncWatermark.objects.using(db).select_for_update().get(key=FUNNEL_SYNC_KEY)
+            last_event_id = watermark.position.get('event_id', 0)
+            now = timezone.now()
+            gaps = get_pending_gaps(watermark.position, now)
+
+            events = list(
+                StorymodeSessionEvent.objects.using(db).filter(id__gt=last_event_id).order_by('id')
+                .values(*fields)[:batch_size]
+            )
+            late_events = list(
+                StorymodeSessionEvent.objects.using(db).filter(id__in=list(gaps)).order_by('id').values(*fields)
+            ) if gaps else []
+            if not events and not late_events :
+                if len(gaps) != len(watermark.position.get('gaps', {})) :
+                    watermark.position = {'event_id': last_event_id, 'gaps': dump_gaps(gaps)}
+                    watermark.save(update_fields=['position', 'updated_at'])
+                break
+
+            for event in late_events :
+                gaps.pop(event['id'], None)
+            for event_id in find_gaps(last_event_id, events) :
+                gaps[event_id] = now
+
+            batch_events = sorted(late_events + events, key=lambda event : event['id'])
+            first_events = {}
+            for event in batch_events :
+                first_events.setdefault(event['session_id'], event)
+            previous_events = load_previous_events(first_events, db)
+            next_events = load_next_events(late_events, {event['id'] for event in batch_events}, db)
+            visit_deltas, choice_deltas = count_transitions(batch_events, previous_events, next_events)
+
+            # 카운터와 워터마크를 같은 트랜잭션에서 갱신하여 중복 집계 방지
+            increment_counters(StoryMomentCounter, ('story_id', 'moment_id'), 'visit_count', visit_deltas)
+            increment_counters(StoryChoiceCounter, ('story_id', 'moment_id', 'choice_id'), 'choice_count', choice_deltas)
+            watermark.position = {
+                'event_id': events[-1]['id'] if events else last_event_id,
+                'gaps': dump_gaps(gaps),
+            }
+            watermark.save(update_fields=['position', 'updated_at'])
+
+        batch_count += 1
+        event_count += len(batch_events)
+        if on_progress :
+            on_progress(batch_count, event_count)
+
+        if len(events) < batch_size :
+            break
+
+    return {
+        'batch_count': batch_count,
+        'event_count': event_count,
+    }
+
+# 스토리 분기 퍼널 (분기점별 도달 수, 선택지별 선택 수/비율, 이탈 수/비율)
+def get_story_funnel(story_id) :
+    moments = StorymodeMoment.objects.filter(story_id=story_id).values('id', 'title')
+    choices = StorymodeChoice.objects.filter(moment__story_id=story_id).values('id', 'moment_id', 'next_moment_id', 'action_type')
+    visit_counts = dict(StoryMomentCounter.objects.filter(story_id=story_id).values_list('moment_id', 'visit_count'))
+    choice_counts = dict(StoryChoiceCounter.objects.filter(story_id=story_id).values_list('choice_id', 'choice_count'))
+
+    choices_by_moment = {}
+    for choice in choices :
+        choices_by_moment.setdefault(choice['moment_id'], []).append(choice)
+
+    funnel = []
+    for moment in moments :
+        visit_count = visit_counts.get(moment['id'], 0)
+        moment_choices = choices_by_moment.get(moment['id'], [])
+        choices_data = []
+        for choice in moment_choices :
+            count = choice_counts.get(choice['id'], 0)
+            choices_data.append({
+                'id': choice['id'],
+                'action_type': choice['action_type'],
+                'next_moment_id': choice['next_moment_id'],
+                'count': count,
+                'rate': round(count * 100 / visit_count, 2) if visit_count else 0,
+            })
+
+        # 엔딩이 아닌 분기점에서 다음으로 이동하지 않은 세션 (진행 중인 세션 포함)
+        is_ending = not moment_choices
+        drop_off_count = 0 if is_ending else max(visit_count - sum(choice['count'] for choice in choices_data), 0)
+        funnel.append({
+            'id': moment['id'],
+            'title': moment['title'],
+            'is_ending': is_ending,
+            'visit_count': visit_count,
+            'drop_off_count': drop_off_count,
+            'drop_off_rate': round(drop_off_count * 100 / visit_count, 2) if visit_count else 0,
+            'choices': choices_data,
+        })
+
+    return sorted(funnel, key=lambda moment : moment['visit_count'], reverse=True)
@@ -0,0 +1,108 @@
+from collections import deque
+from storymode.models import Story, StorymodeMoment, StorymodeChoice, StoryGraphIndex
+
+
+# 분기점/선택지를 각각 한 번씩 조회하여 인접 리스트 생성 (선택지가 있는 분기점도 함께 반환)
+def load_story_edges(story_id) :
+    moment_ids = [str(moment_id) for moment_id in StorymodeMoment.objects.filter(story_id=story_id).values_list('id', flat=True)]
+    edges = {moment_id: [] for moment_id in moment_ids}
+    dangling_choice_ids = []
+    has_choices = set()
+
+    choices = StorymodeChoice.objects.filter(moment__story_id=story_id).values_list('id', 'moment_id', 'next_moment_id')
+    for choice_id, moment_id, next_moment_id in choices :
+        moment_id = str(moment_id)
+        if moment_id not in edges :
+            continue
+        has_choices.add(moment_id)
+        if next_moment_id is None or str(next_moment_id) not in edges :
+            dangling_choice_ids.append(str(choice_id))
+            continue
+        edges[moment_id].append(str(next_moment_id))
+
+    return moment_ids, edges, dangling_choice_ids, has_choices
+
+# 시작 분기점에서 BFS 로 도달 가능한 분기점
+def find_reachable(start_moment_id, edges) :
+    if start_moment_id not in edges :
+        return set()
+
+    reachable = {start_moment_id}
+    queue = deque([start_moment_id])
+    while queue :
+        moment_id = queue.popleft()
+        for next_moment_id in edges[moment_id] :
+            if next_moment_id not in reachable :
+                reachable.add(next_moment_id)
+                queue.append(next_moment_id)
+    return reachable
+
+# 분기점별 엔딩까지 남은 최대 분기점 수 (자신 포함, 순환 간선은 제외)
+def compute_remaining(start_moment_id, edges) :
+    remaining = {}
+    has_cycle = False
+    if start_moment_id not in edges :
+        return remaining, has_cycle
+
+    # 재귀 대신 스택으로 후위 순회 (깊은 스토리에서도 재귀 한도에 걸리지 않도록)
+    on_path = set()
+    stack = [(start_moment_id, iter(edges[start_moment_id]))]
+    on_path.add(start_moment_id)
+    while stack :
+        moment_id, children = stack[-1]
+        next_moment_id = next(children, None)
+        if next_moment_id is None :
+            stack.pop()
+            on_path.discard(moment_id)
+            remaining[moment_id] = 1 + max(
+                (remaining[child] for child in edges[moment_id] if child in remaining and child not in on_path),
+                default=0,
+            )
+            continue
+
+        if next_moment_id in on_path :
+            has_cycle = True
+        elif next_moment_id not in remaining :
+            on_path.add(next_moment_id)
+            stack.append((next_moment_id, iter(edges[next_moment_id])))
+
+    return remaining, has_cycle
+
+# 스토리 그래프 인덱스 생성/갱신
+def build_story_graph(story) :
+    if not isinstance(story, Story) :
+        story = Story.objects.only('id', 'start_moment_id').get(id=story)
+
+    moment_ids, edges, dangling_choice_ids, has_choices = load_story_edges(story.id)
+    start_moment_id = str(story.start_moment_id) if story.start_moment_id else None
+
+    reachable = find_reachable(start_moment_id, edges)
+    remaining, has_cycle = compute_remaining(start_moment_id, edges)
+
+    graph, _ = StoryGraphIndex.objects.update_or_create(
+        story_id=story.id,
+        defaults={
+            'start_moment_id': story.start_moment_id,
+            'moment_count': len(moment_ids),
+            'longest_path': remaining.get(start_moment_id, 0),
+            'has_cycle': has_cycle,
+            'remaining': remaining,
+            # StorymodeMoment.is_ending() 과 같이 선택지가 하나도 없는 분기점만 엔딩
+            'ending_ids': [moment_id for moment_id in moment_ids if moment_id not in has_choices],
+            'unreachable_ids': [moment_id for moment_id in moment_ids if moment_id not in reachable],
+            'dangling_choice_ids': dangling_choice_ids,
+        },
+    )
+    return graph
+
+# 스토리별 그래프 인덱스 일괄 조회 (없는 스토리는 생성)
+def get_story_graphs(story_ids) :
+    story_ids = set(story_ids)
+    graphs = StoryGraphIndex.objects.in_bulk(story_ids)
+
+    for story_id in story_ids - set(graphs) :
+        try :
+            graphs[story_id] = build_story_graph(story_id)
+        except Story.DoesNotExist :
+            continue
+    return graphs
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from storymode.models import Story
+from storymode.graph import build_story_graph
+
+
+class Command(BaseCommand) :
+    help = '스토리 그래프 인덱스 (도달 가능 분기점, 엔딩, 남은 경로 길이) 생성/갱신'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--story',
+            type=str,
+            action='append',
+            help='갱신할 스토리 ID (여러 번 지정 가능, 기본: 삭제되지 않은 전체 스토리)'
+        )
+
+    def handle(self, *args, **options):
+        stories = Story.objects.filter(is_deleted=False).only('id', 'start_moment_id')
+        if options['story'] :
+            stories = stories.filter(id__in=options['story'])
+
+        built_count = 0
+        for story in stories.iterator() :
+            graph = build_story_graph(story)
+            built_count += 1
+
+            if graph.unreachable_ids or graph.dangling_choice_ids or graph.has_cycle :
+                self.stdout.write(self.style.WARNING(
+                    f'{story.id}: 도달 불가 분기점 {len(graph.unreachable_ids)}개, '
+                    f'연결 없는 선택지 {len(graph.dangling_choice_ids)}개, 순환 {"있음" if graph.has_cycle else "없음"}'
+                ))
+
+        self.stdout.write(self.style.SUCCESS(f'스토리 그래프 인덱스 {built_count}개 생성 완료'))
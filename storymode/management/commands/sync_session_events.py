@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from storymode.events import sync_session_events, EVENT_SYNC_BATCH_SIZE
+
+
+class Command(BaseCommand) :
+    help = '스토리모드 세션 history 를 이벤트 로그 테이블에 배치 단위로 추가 (마지막 위치 이후 변경된 세션만)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=EVENT_SYNC_BATCH_SIZE,
+            help=f'한 번에 읽을 세션 수 (기본: {EVENT_SYNC_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='마지막 위치를 무시하고 전체 세션을 다시 확인 (이미 추가된 이벤트는 건너뜀)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size <= 0 :
+            self.stdout.write(self.style.ERROR('--batch-size 는 1 이상이어야 합니다.'))
+            return
+
+        def print_progress(batch_count, session_count, event_count) :
+            self.stdout.write(f'{batch_count}번째 배치, 누적 세션 {session_count}건 / 이벤트 {event_count}건')
+
+        result = sync_session_events(batch_size, full=options['full'], on_progress=print_progress)
+        self.stdout.write(self.style.SUCCESS(
+            f"세션 이벤트 동기화 완료: 세션 {result['session_count']}건, 이벤트 {result['event_count']}건, "
+            f"history 초기화로 다시 추가한 세션 {result['reset_count']}건 ({result['batch_count']}개 배치)"
+        ))
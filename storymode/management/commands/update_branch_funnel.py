@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from storymode.events import sync_session_events
+from storymode.funnel import update_branch_counters, FUNNEL_BATCH_SIZE
+
+
+class Command(BaseCommand) :
+    help = '세션 이벤트 로그를 동기화한 뒤 마지막 집계 이후 이벤트로 분기점/선택지 카운터 갱신'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=FUNNEL_BATCH_SIZE,
+            help=f'한 트랜잭션에서 집계할 이벤트 수 (기본: {FUNNEL_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--skip-events',
+            action='store_true',
+            help='세션 이벤트 로그 동기화 없이 이미 쌓인 이벤트만 집계'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size <= 0 :
+            self.stdout.write(self.style.ERROR('--batch-size 는 1 이상이어야 합니다.'))
+            return
+
+        if not options['skip_events'] :
+            result = sync_session_events()
+            self.stdout.write(f"세션 이벤트 동기화: 세션 {result['session_count']}건, 이벤트 {result['event_count']}건")
+
+        def print_progress(batch_count, event_count) :
+            self.stdout.write(f'{batch_count}번째 배치 집계, 누적 이벤트 {event_count}건')
+
+        result = update_branch_counters(batch_size, on_progress=print_progress)
+        self.stdout.write(self.style.SUCCESS(
+            f"분기 퍼널 집계 완료: 이벤트 {result['event_count']}건 ({result['batch_count']}개 배치)"
+        ))
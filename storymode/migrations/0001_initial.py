@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoryGraphIndex',
+            fields=[
+                ('story_id', models.UUIDField(primary_key=True, serialize=False)),
+                ('start_moment_id', models.UUIDField(blank=True, null=True)),
+                ('moment_count', models.PositiveIntegerField(default=0)),
+                ('longest_path', models.PositiveIntegerField(default=0)),
+                ('has_cycle', models.BooleanField(default=False)),
+                ('remaining', models.JSONField(default=dict)),
+                ('ending_ids', models.JSONField(default=list)),
+                ('unreachable_ids', models.JSONField(default=list)),
+                ('dangling_choice_ids', models.JSONField(default=list)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'admin_story_graph_index',
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('storymode', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StorymodeSessionEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('session_id', models.UUIDField()),
+                ('story_id', models.UUIDField()),
+                ('seq', models.PositiveIntegerField()),
+                ('moment_id', models.UUIDField(blank=True, null=True)),
+                ('choice_id', models.UUIDField(blank=True, null=True)),
+                ('action_type', models.CharField(blank=True, max_length=200, null=True)),
+                ('ts', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'admin_storymode_session_event',
+                'indexes': [models.Index(fields=['story_id', 'moment_id'], name='idx_session_event_moment'), models.Index(fields=['choice_id'], name='idx_session_event_choice'), models.Index(fields=['ts'], name='idx_session_event_ts')],
+                'constraints': [models.UniqueConstraint(fields=('session_id', 'seq'), name='uniq_session_event_seq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SyncWatermark',
+            fields=[
+                ('key', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('position', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'admin_sync_watermark',
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('storymode', '0002_storymodesessionevent_syncwatermark'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoryMomentCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('story_id', models.UUIDField()),
+                ('moment_id', models.UUIDField()),
+                ('visit_count', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'admin_story_moment_counter',
+                'constraints': [models.UniqueConstraint(fields=('story_id', 'moment_id'), name='uniq_story_moment_counter')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StoryChoiceCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('story_id', models.UUIDField()),
+                ('moment_id', models.UUIDField()),
+                ('choice_id', models.UUIDField()),
+                ('choice_count', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'admin_story_choice_counter',
+                'constraints': [models.UniqueConstraint(fields=('story_id', 'moment_id', 'choice_id'), name='uniq_story_choice_counter')],
+            },
+        ),
+    ]
@@ -1,5 +1,6 @@
 import uuid
 from django.db import models
+from django.utils.functional import cached_property
 from user.models import User
 
 
@@ -94,14 +95,134 @@ class StorymodeSession(models.Model):
     def __str__(self):
         return f"[{self.story.title}] {self.user.name if self.user else 'Unknown User'} - {self.get_status_display()}"
 
-    # 진행률 계산
-    def get_progress_percentage(self):
-        total_moments = self.story.moments.count()
-        # 히스토리에 저장된 moment_id를 사용하여 고유한 방문 분기점 계산
+    # 히스토리에 저장된 moment_id 와 현재 분기점으로 고유한 방문 분기점 계산
+    def get_visited_moment_ids(self):
         visited_moment_ids = {item['moment_id'] for item in self.history if 'moment_id' in item}
         # 현재 분기점도 방문한 것으로 간주하고 추가
-        if self.current_moment and str(self.current_moment.id) not in visited_moment_ids:
-            visited_moment_ids.add(str(self.current_moment.id))
-        
+        if self.current_moment_id:
+            visited_moment_ids.add(str(self.current_moment_id))
+        return visited_moment_ids
+
+    # 진행률 계산 (그래프 인덱스가 있으면 현재 경로 기준, 없으면 전체 분기점 수 기준)
+    def get_progress_percentage(self, graph=None):
+        visited_moment_ids = self.get_visited_moment_ids()
+        if graph is not None:
+            return graph.get_progress(visited_moment_ids, self.current_moment_id, self.status == 'finish')
+
+        total_moments = self.story.moments.count()
         visited_moments = len(visited_moment_ids)
-        return round((visited_moments / total_moments) * 100, 2) if total_moments > 0 else 0
\ No newline at end of file
+        return round((visited_moments / total_moments) * 100, 2) if total_moments > 0 else 0
+
+# 스토리 그래프 인덱스 (스토리 저장 시 생성, 진행률/엔딩 판정을 쿼리 없이 계산)
+class StoryGraphIndex(models.Model):
+    story_id = models.UUIDField(primary_key=True)                   # 게임 테이블은 다른 서비스가 관리하므로 FK 제약 없이 저장
+    start_moment_id = models.UUIDField(null=True, blank=True)
+    moment_count = models.PositiveIntegerField(default=0)
+    longest_path = models.PositiveIntegerField(default=0)           # 시작 분기점에서 엔딩까지 가장 긴 경로의 분기점 수
+    has_cycle = models.BooleanField(default=False)                  # 순환이 있으면 longest_path 는 순환 간선을 제외한 값
+    remaining = models.JSONField(default=dict)                      # 도달 가능한 분기점별 엔딩까지 남은 최대 분기점 수 (자신 포함)
+    ending_ids = models.JSONField(default=list)                     # 선택지가 없는 분기점
+    unreachable_ids = models.JSONField(default=list)                # 시작 분기점에서 도달할 수 없는 분기점
+    dangling_choice_ids = models.JSONField(default=list)            # next_moment 가 없는 선택지
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'admin_story_graph_index'
+
+    def __str__(self):
+        return f"{self.story_id} ({self.moment_count} moments)"
+
+    @cached_property
+    def ending_set(self):
+        return set(self.ending_ids)
+
+    @property
+    def reachable_count(self):
+        return len(self.remaining)
+
+    def is_ending(self, moment_id):
+        return str(moment_id) in self.ending_set
+
+    def is_reachable(self, moment_id):
+        return str(moment_id) in self.remaining
+
+    # 진행률 = 방문한 분기점 / (방문한 분기점 + 현재 분기점 이후 가장 긴 남은 경로)
+    def get_progress(self, visited_moment_ids, current_moment_id=None, finished=False):
+        current_moment_id = str(current_moment_id) if current_moment_id else None
+        if finished or (current_moment_id and self.is_ending(current_moment_id)):
+            return 100.0
+
+        visited = len([moment_id for moment_id in visited_moment_ids if moment_id in self.remaining])
+        if current_moment_id in self.remaining:
+            total = visited + self.remaining[current_moment_id] - 1
+        else:
+            total = max(self.longest_path, visited)
+        return round((visited / total) * 100, 2) if total > 0 else 0
+
+# 스토리모드 세션 이벤트 로그 (StorymodeSession.history 항목을 한 행씩 정규화, 추가만 함)
+class StorymodeSessionEvent(models.Model):
+    id = models.BigAutoField(primary_key=True)                      # 증가하는 id 를 집계 워터마크로 사용
+    session_id = models.UUIDField()
+    story_id = models.UUIDField()
+    seq = models.PositiveIntegerField()                             # history 배열 내 순서
+    moment_id = models.UUIDField(null=True, blank=True)
+    choice_id = models.UUIDField(null=True, blank=True)
+    action_type = models.CharField(max_length=200, null=True, blank=True)
+    ts = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'admin_storymode_session_event'
+        constraints = [
+            models.UniqueConstraint(fields=['session_id', 'seq'], name='uniq_session_event_seq'),
+        ]
+        indexes = [
+            models.Index(fields=['story_id', 'moment_id'], name='idx_session_event_moment'),
+            models.Index(fields=['choice_id'], name='idx_session_event_choice'),
+            models.Index(fields=['ts'], name='idx_session_event_ts'),
+        ]
+
+    def __str__(self):
+        return f"{self.session_id} #{self.seq}"
+
+# 증분 동기화 위치 (이벤트 로그 / 집계 작업별 마지막 처리 위치)
+class SyncWatermark(models.Model):
+    key = models.CharField(max_length=100, primary_key=True)
+    position = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'admin_sync_watermark'
+
+    def __str__(self):
+        return f"{self.key} {self.position}"
+
+# 분기점별 도달 횟수 (세션 이벤트 로그에서 증분 집계)
+class StoryMomentCounter(models.Model):
+    story_id = models.UUIDField()
+    moment_id = models.UUIDField()
+    visit_count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'admin_story_moment_counter'
+        constraints = [
+            models.UniqueConstraint(fields=['story_id', 'moment_id'], name='uniq_story_moment_counter'),
+        ]
+
+    def __str__(self):
+        return f"{self.moment_id} ({self.visit_count})"
+
+# 선택지별 선택 횟수 (분기점에서 다음 분기점으로 이동한 횟수)
+class StoryChoiceCounter(models.Model):
+    story_id = models.UUIDField()
+    moment_id = models.UUIDField()
+    choice_id = models.UUIDField()
+    choice_count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'admin_story_choice_counter'
+        constraints = [
+            models.UniqueConstraint(fields=['story_id', 'moment_id', 'choice_id'], name='uniq_story_choice_counter'),
+        ]
+
+    def __str__(self):
+        return f"{self.choice_id} ({self.choice_count})"
@@ -0,0 +1,252 @@
+from datetime import timedelta
+from django.db import connections, router
+from django.utils import timezone
+from storymode.models import StorymodeMoment, StorymodeSession, StoryGraphIndex
+
+
+# 멈춘 세션 기본 기준 (마지막 진행 후 경과 일수) 및 최대 조회 수
+STUCK_IDLE_DAYS = 7
+STUCK_SESSION_LIMIT = 100
+
+# 세션별 방문 분기점 수 / 스토리 분기점 수 / 진행률을 한 번의 SQL 로 계산 (PostgreSQL JSONB)
+# - 진행률은 StorymodeSession.get_progress_percentage(graph) 와 같은 식 (StoryGraphIndex.get_progress)
+#   완료 세션 또는 현재 분기점이 엔딩이면 100, 아니면 도달 가능한 방문 분기점 / (방문 + 현재 분기점 이후 남은 최대 분기점 - 1)
+# - 그래프 인덱스가 없는 스토리만 방문 분기점 / 전체 분기점 수로 계산
+# - history 가 배열이 아니면 (기본값 {}) 방문 기록 없음으로 처리
+SESSION_PROGRESS_SQL = '''
+    WITH moment_counts AS (
+        SELECT {moment_story} AS story_id, COUNT(*) AS total_moments
+        FROM {moment_table}
+        GROUP BY {moment_story}
+    ),
+    session_progress AS (
+        SELECT
+            s.{session_id} AS session_id,
+            s.{session_story} AS story_id,
+            s.{session_user} AS user_id,
+            s.{session_status} AS status,
+            s.{session_updated_at} AS updated_at,
+            visited.visited_count,
+            visited.reachable_visited_count,
+            COALESCE(mc.total_moments, 0) AS total_moments,
+            g.{graph_story} IS NOT NULL AS has_graph,
+            g.{graph_longest_path} AS longest_path,
+            (g.{graph_remaining}::jsonb ->> s.{session_current_moment}::text)::int AS current_remaining,
+            COALESCE(jsonb_exists(g.{graph_ending_ids}::jsonb, s.{session_current_moment}::text), FALSE) AS current_is_ending
+        FROM {session_table} AS s
+        LEFT JOIN moment_counts AS mc ON mc.story_id = s.{session_story}
+        LEFT JOIN {graph_table} AS g ON g.{graph_story} = s.{session_story}
+        CROSS JOIN LATERAL (
+            SELECT
+                COUNT(DISTINCT v.moment_id) AS visited_count,
+                COUNT(DISTINCT v.moment_id) FILTER (WHERE jsonb_exists(g.{graph_remaining}::jsonb, v.moment_id)) AS reachable_visited_count
+            FROM (
+                SELECT item ->> 'moment_id' AS moment_id
+                FROM jsonb_array_elements(
+                    CASE WHEN jsonb_typeof(s.{session_history}::jsonb) = 'array' THEN s.{session_history}::jsonb ELSE '[]'::jsonb END
+                ) AS item
+                UNION ALL
+                SELECT s.{session_current_moment}::text
+            ) AS v
+            WHERE v.moment_id IS NOT NULL
+        ) AS visited
+        WHERE {where}
+    ),
+    session_totals AS (
+        SELECT
+            *,
+            CASE
+                WHEN current_remaining IS NOT NULL THEN reachable_visited_count + current_remaining - 1
+                ELSE GREATEST(longest_path, reachable_visited_count)
+            END AS graph_total
+        FROM session_progress
+    )
+'''
+
+SESSION_PROGRESS_COLUMNS = '''
+    session_id, story_id, user_id, status, updated_at, visited_count, total_moments,
+    CASE
+        WHEN has_graph AND (status = 'finish' OR current_is_ending) THEN 100.0::float
+        WHEN has_graph THEN CASE WHEN graph_total > 0 THEN ROUND(reachable_visited_count * 100.0 / graph_total, 2)::float ELSE 0 END
+        WHEN total_moments > 0 THEN ROUND(visited_count * 100.0 / total_moments, 2)::float
+        ELSE 0
+    END AS progress
+'''
+
+# 진행률 조회 DB (관리자 리포트이므로 복제 DB 사용 가능)
+def get_progress_db() :
+    return router.db_for_read(StorymodeSession)
+
+# 세션 필터 조건 SQL (story_ids / status / updated_before)
+def build_session_where(connection, story_ids=None, status=None, updated_before=None) :
+    quote_name = connection.ops.quote_name
+    opts = StorymodeSession._meta
+    conditions = ['TRUE']
+    params = []
+
+    if story_ids :
+        story_field = opts.get_field('story')
+        conditions.append(f's.{quote_name(story_field.column)} IN ({", ".join(["%s"] * len(story_ids))})')
+        params.extend(story_field.get_db_prep_value(story_id, connection) for story_id in story_ids)
+    if status :
+        conditions.append(f's.{quote_name(opts.get_field("status").column)} = %s')
+        params.append(status)
+    if updated_before :
+        conditions.append(f's.{quote_name(opts.get_field("updated_at").column)} < %s')
+        params.append(updated_before)
+
+    return ' AND '.join(conditions), params
+
+# 테이블/컬럼 이름을 모델 정의에서 가져와 CTE SQL 완성
+def build_progress_cte(connection, where) :
+    quote_name = connection.ops.quote_name
+    session_opts = StorymodeSession._meta
+    moment_opts = StorymodeMoment._meta
+    graph_opts = StoryGraphIndex._meta
+
+    def session_column(field_name) :
+        return quote_name(session_opts.get_field(field_name).column)
+
+    return SESSION_PROGRESS_SQL.format(
+        moment_table=quote_name(moment_opts.db_table),
+        moment_story=quote_name(moment_opts.get_field('story').column),
+        session_table=quote_name(session_opts.db_table),
+        session_id=session_column('id'),
+        session_story=session_column('story'),
+        session_user=session_column('user'),
+        session_status=session_column('status'),
+        session_updated_at=session_column('updated_at'),
+        session_history=session_column('history'),
+        session_current_moment=session_column('current_moment'),
+        graph_table=quote_name(graph_opts.db_table),
+        graph_story=quote_name(graph_opts.get_field('story_id').column),
+        graph_longest_path=quote_name(graph_opts.get_field('longest_path').column),
+        graph_remaining=quote_name(graph_opts.get_field('remaining').column),
+        graph_ending_ids=quote_name(graph_opts.get_field('ending_ids').column),
+        where=where,
+    )
+
+def fetch_dicts(cursor) :
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+# PostgreSQL 이 아닌 DB (로컬 sqlite 등) 에서는 세션을 순회하며 같은 값을 계산
+def compute_progress_in_python(db, story_ids=None, status=None, updated_before=None) :
+    sessions = StorymodeSession.objects.using(db).only(
+        'id', 'story_id', 'user_id', 'status', 'updated_at', 'history', 'current_moment_id'
+    )
+    if story_ids :
+        sessions = sessions.filter(story_id__in=story_ids)
+    if status :
+        sessions = sessions.filter(status=status)
+    if updated_before :
+        sessions = sessions.filter(updated_at__lt=updated_before)
+
+    total_moments = {}
+    graphs = {}
+    rows = []
+    for session in sessions.iterator() :
+        if session.story_id not in total_moments :
+            total_moments[session.story_id] = StorymodeMoment.objects.using(db).filter(story_id=session.story_id).count()
+            # 리포트는 읽기 전용이므로 없는 인덱스를 만들지 않고 분기점 수 기준으로 계산
+            graphs[session.story_id] = StoryGraphIndex.objects.using(db).filter(story_id=session.story_id).first()
+
+        history = session.history if isinstance(session.history, list) else []
+        visited_moment_ids = {
+            str(item['moment_id']) for item in history if isinstance(item, dict) and item.get('moment_id')
+        } | ({str(session.current_moment_id)} if session.current_moment_id else set())
+        visited_count = len(visited_moment_ids)
+        total = total_moments[session.story_id]
+        graph = graphs[session.story_id]
+        if graph is not None :
+            progress = graph.get_progress(visited_moment_ids, session.current_moment_id, session.status == 'finish')
+        else :
+            progress = round(visited_count * 100 / total, 2) if total > 0 else 0
+        rows.append({
+            'session_id': session.id,
+            'story_id': session.story_id,
+            'user_id': session.user_id,
+            'status': session.status,
+            'updated_at': session.updated_at,
+            'visited_count': visited_count,
+            'total_moments': total,
+            'progress': progress,
+        })
+    return rows
+
+# 세션별 진행률 일괄 계산 (history 를 Python 으로 읽지 않음)
+def fetch_session_progress(story_ids=None, status=None, updated_before=None, order_by_progress=False, limit=None) :
+    db = get_progress_db()
+    connection = connections[db]
+
+    if connection.vendor != 'postgresql' :
+        rows = compute_progress_in_python(db, story_ids, status, updated_before)
+        if order_by_progress :
+            rows.sort(key=lambda row : (row['progress'], row['updated_at']))
+        return rows[:limit] if limit else rows
+
+    where, params = build_session_where(connection, story_ids, status, updated_before)
+    sql = build_progress_cte(connection, where) + f'SELECT {SESSION_PROGRESS_COLUMNS} FROM session_totals'
+    if order_by_progress :
+        sql += ' ORDER BY progress, updated_at'
+    if limit :
+        sql += ' LIMIT %s'
+        params.append(limit)
+
+    with connection.cursor() as cursor :
+        cursor.execute(sql, params)
+        return fetch_dicts(cursor)
+
+# 스토리별 평균 진행률 / 세션 수 / 완료 수 (집계까지 DB 에서 처리)
+def fetch_story_progress_summary(story_ids=None) :
+    db = get_progress_db()
+    connection = connections[db]
+
+    if connection.vendor != 'postgresql' :
+        summary = {}
+        for row in compute_progress_in_python(db, story_ids) :
+            story = summary.setdefault(row['story_id'], {
+                'story_id': row['story_id'],
+                'total_moments': row['total_moments'],
+                'session_count': 0,
+                'finished_count': 0,
+                'progress_sum': 0,
+            })
+            story['session_count'] += 1
+            story['finished_count'] += 1 if row['status'] == 'finish' else 0
+            story['progress_sum'] += row['progress']
+
+        rows = []
+        for story in summary.values() :
+            progress_sum = story.pop('progress_sum')
+            story['avg_progress'] = round(progress_sum / story['session_count'], 2)
+            rows.append(story)
+        return sorted(rows, key=lambda row : row['session_count'], reverse=True)
+
+    where, params = build_session_where(connection, story_ids)
+    sql = build_progress_cte(connection, where) + f'''
+        SELECT
+            story_id,
+            MAX(total_moments) AS total_moments,
+            COUNT(*) AS session_count,
+            COUNT(*) FILTER (WHERE status = 'finish') AS finished_count,
+            ROUND(AVG(progress)::numeric, 2)::float AS avg_progress
+        FROM (SELECT {SESSION_PROGRESS_COLUMNS} FROM session_totals) AS progress_rows
+        GROUP BY story_id
+        ORDER BY session_count DESC
+    '''
+
+    with connection.cursor() as cursor :
+        cursor.execute(sql, params)
+        return fetch_dicts(cursor)
+
+# 진행 중인데 일정 기간 진행이 없는 세션 (진행률 낮은 순)
+def fetch_stuck_sessions(idle_days=STUCK_IDLE_DAYS, limit=STUCK_SESSION_LIMIT, story_ids=None) :
+    updated_before = timezone.now() - timedelta(days=idle_days)
+    return fetch_session_progress(
+        story_ids=story_ids,
+        status='play',
+        updated_before=updated_before,
+        order_by_progress=True,
+        limit=limit,
+    )
@@ -1,3 +1,67 @@
-from django.test import TestCase
+import uuid
+from django.test import SimpleTestCase
+from storymode.models import StoryGraphIndex
+from config.chunked_analysis import split_text, merge_summaries
 
-# Create your tests here.
+
+# 시작 -> 중간 -> 엔딩, 시작 -> 엔딩 (가장 긴 경로 3)
+START_ID = str(uuid.uuid4())
+MIDDLE_ID = str(uuid.uuid4())
+ENDING_ID = str(uuid.uuid4())
+
+
+def make_graph() :
+    return StoryGraphIndex(
+        story_id=uuid.uuid4(),
+        start_moment_id=START_ID,
+        moment_count=3,
+        longest_path=3,
+        remaining={START_ID: 3, MIDDLE_ID: 2, ENDING_ID: 1},
+        ending_ids=[ENDING_ID],
+    )
+
+
+class StoryGraphProgressTests(SimpleTestCase) :
+    def test_progress_uses_longest_remaining_path(self) :
+        graph = make_graph()
+
+        self.assertEqual(graph.get_progress([START_ID], START_ID), 33.33)
+        self.assertEqual(graph.get_progress([START_ID, MIDDLE_ID], MIDDLE_ID), 66.67)
+
+    def test_ending_or_finished_is_complete(self) :
+        graph = make_graph()
+
+        self.assertEqual(graph.get_progress([START_ID, ENDING_ID], ENDING_ID), 100.0)
+        self.assertEqual(graph.get_progress([START_ID], START_ID, finished=True), 100.0)
+
+    def test_unknown_current_moment_uses_longest_path(self) :
+        graph = make_graph()
+
+        self.assertEqual(graph.get_progress([START_ID, str(uuid.uuid4())], str(uuid.uuid4())), 33.33)
+        self.assertEqual(graph.get_progress([]), 0)
+
+    def test_empty_graph(self) :
+        graph = StoryGraphIndex(story_id=uuid.uuid4())
+        self.assertEqual(graph.get_progress([START_ID], START_ID), 0)
+
+
+class SplitTextTests(SimpleTestCase) :
+    def test_short_text_is_single_chunk(self) :
+        self.assertEqual(split_text('첫 단락\n\n둘째 단락', 100), ['첫 단락\n\n둘째 단락'])
+        self.assertEqual(split_text('  \n\n ', 100), [])
+
+    def test_keeps_paragraph_boundaries(self) :
+        paragraphs = [f'{index}' * 30 for index in range(5)]
+        chunks = split_text('\n\n'.join(paragraphs), 70)
+
+        self.assertEqual(chunks, ['\n\n'.join(paragraphs[0:2]), '\n\n'.join(paragraphs[2:4]), paragraphs[4]])
+
+    def test_splits_long_paragraph(self) :
+        sentences = ['가' * 40 + '.', '나' * 40 + '.', '다' * 150]
+        chunks = split_text(' '.join(sentences), 50)
+
+        self.assertTrue(all(len(chunk) <= 50 for chunk in chunks))
+        self.assertEqual(''.join(chunk.replace('\n\n', '') for chunk in chunks), ''.join(sentences))
+
+    def test_merge_summaries_numbers_parts(self) :
+        self.assertEqual(merge_summaries(['가', '나']), '[1/2]\n가\n\n[2/2]\n나')
@@ -1,14 +1,23 @@
 from django.urls import path
-from storymode.views import StoryFileUploadView, StoryCreateView, StoryListView, StoryUpdateAllView, StoryUpdateView, StoryImageUploadView, MomentImageCreateView, MomentImageDeleteView, StorymodeStatisticsView
+from storymode.views import StoryFileUploadView, StoryCreateView, StoryListView, StoryUpdateAllView, StoryUpdateView, StoryBatchUpdateView, StoryImageUploadView, MomentImageCreateView, MomentImageDeleteView, StoryImageDeleteAllView, StorymodeStatisticsView, StorymodeProgressReportView, StoryFunnelView
+from storymode.async_views import AsyncStoryCreateView, AsyncMomentImageCreateView
 
 urlpatterns = [
     path('upload/stories', StoryFileUploadView.as_view(), name="upload_story"),
     path('create/stories', StoryCreateView.as_view(), name="create_story"),
     path('list/stories', StoryListView.as_view(), name="list_story"),
     path('update/stories/all', StoryUpdateAllView.as_view(), name="update_all_story"),
+    path('update/stories/batch', StoryBatchUpdateView.as_view(), name="batch_update_story"),
     path('update/stories/<str:story_id>', StoryUpdateView.as_view(), name="update_story"),
     path('update/stories/images/thumbnail', StoryImageUploadView.as_view(), name="update_story_thumbnail"),
     path('create/stories/images/<str:moment_id>', MomentImageCreateView.as_view(), name="create_story_image"),
     path('delete/stories/images/<str:moment_id>', MomentImageDeleteView.as_view(), name="delete_story_image"),
+    path('delete/stories/<str:story_id>/images/all', StoryImageDeleteAllView.as_view(), name="delete_story_images_all"),
     path('list/statistics', StorymodeStatisticsView.as_view(), name="list_story_statistics"),
+    path('list/statistics/progress', StorymodeProgressReportView.as_view(), name="list_story_progress_report"),
+    path('list/statistics/funnel/<str:story_id>', StoryFunnelView.as_view(), name="list_story_funnel"),
+
+    # ASGI 비동기 생성 API
+    path('async/create/stories', AsyncStoryCreateView.as_view(), name="async_create_story"),
+    path('async/create/stories/images/<str:moment_id>', AsyncMomentImageCreateView.as_view(), name="async_create_story_image"),
 ]
\ No newline at end of file
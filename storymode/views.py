@@ -1,5 +1,5 @@
 import os
-import time
+import uuid
 import json
 import requests
 import urllib.parse
@@ -7,12 +7,21 @@ from openai import AzureOpenAI
 from rest_framework import status
 from django.conf import settings
 from django.http import JsonResponse
+from django.core.exceptions import ValidationError
 from django.db.models import Count
 from azure.storage.blob import BlobServiceClient, ContentSettings
 from azure.core.exceptions import ResourceNotFoundError
+from config.chunked_analysis import summarize_long_text
+from config.blob_manifest import IMAGE_CACHE_CONTROL, is_known_container, get_manifest, get_versioned_url, notify_change, delete_blob
 from storymode.models import Story, StorymodeMoment, StorymodeChoice
 from storymode.serializers import StorySerializer
-from storymode.mixins import AuthMixin, UpdateMixin, UpdateAllMixin
+from storymode.graph import build_story_graph
+from storymode.funnel import get_story_funnel
+from storymode.progress import fetch_story_progress_summary, fetch_stuck_sessions, STUCK_IDLE_DAYS, STUCK_SESSION_LIMIT
+from storymode.mixins import AuthMixin, UpdateMixin, UpdateAllMixin, BatchUpdateMixin
+from game.image_gc import delete_row_images, count_image_results
+from game.sources import hash_uploaded_file, hash_text, get_content_blob_name, find_source, get_generated_target, find_generated_target, register_upload, mark_generated
+from game.cache import get_cache_key, get_version, get_or_build, invalidate_model, make_etag, get_not_modified_response, set_etag_headers
 
 
 # 환경 설정
@@ -72,6 +81,9 @@ class AzureBlobStorageUtil :
     def get_or_create_container(self, container_name, public=False) :
         try :
             container_client = self.blob_service_client.get_container_client(container_name)
+            # 이 워커가 목록을 캐시한 컨테이너는 이미 생성/설정된 것이므로 왕복 생략
+            if is_known_container(container_client) :
+                return container_client
             try :
                 container_client.get_container_properties()
                 print(f"\n>> 컨테이너 '{container_name}'가 이미 존재합니다. 재사용합니다.\n")
@@ -86,26 +98,48 @@ class AzureBlobStorageUtil :
         except Exception as e :
             raise Exception(f'ERROR: Azure Blob Storage 컨테이너 처리 실패: {e}')
 
-    # Azure Blob Storage 에 데이터가 존재하는 확인하고 URL 반환
-    def check_blob_exists_and_get_url(self, blob_client) :
-        try:
-            blob_client.get_blob_properties()
-            print(f"\n>> 이미 존재하는 데이터: {blob_client.url}\n")
-            return blob_client.url
-        except ResourceNotFoundError :
-            return None
+    # 캐시된 컨테이너 목록으로 존재 여부 확인 (목록이 없거나 다른 워커가 바꿨을 때만 다시 조회), versioned 면 속성 조회로 받은 ETag 버전을 붙인 URL
+    def get_existing_blob_url(self, container_client, blob_name, versioned=False) :
+        try :
+            blobs = get_manifest(container_client)
         except Exception as e :
             raise Exception(f"ERROR: Blob 존재 여부 확인 중 오류 발생: {e}")
+        if blob_name not in blobs :
+            return None
+        blob_client = container_client.get_blob_client(blob=blob_name)
+        blob_url = blob_client.url
+        # immutable 로 캐시되는 URL 이므로 버전은 캐시된 목록이 아니라 이번에 조회한 ETag 로 (다른 워커가 덮어썼을 수 있음)
+        if versioned :
+            try :
+                etag = blob_client.get_blob_properties().etag
+            except ResourceNotFoundError :
+                notify_change(container_client)
+                return None
+            except Exception as e :
+                raise Exception(f"ERROR: Blob 속성 조회 중 오류 발생: {e}")
+            blob_url = get_versioned_url(blob_url, etag)
+        print(f"\n>> 이미 존재하는 데이터: {blob_url}\n")
+        return blob_url
     
-    # Azure Blob Storage 에 데이터 업로드
-    def upload_blob(self, container_client, blob_name, data, content_type='application/octet-stream', overwrite=True) :
+    # Azure Blob Storage 에 데이터 업로드 (versioned 면 ETag 버전을 붙인 URL 반환)
+    def upload_blob(self, container_client, blob_name, data, content_type='application/octet-stream', overwrite=True, cache_control=None, versioned=False) :
         blob_client = container_client.get_blob_client(blob=blob_name)
         try :
-            content_settings_obj = ContentSettings(content_type=content_type)
-            blob_client.upload_blob(data, overwrite=overwrite, content_settings=content_settings_obj)
+            content_settings_obj = ContentSettings(content_type=content_type, cache_control=cache_control)
+            result = blob_client.upload_blob(data, overwrite=overwrite, content_settings=content_settings_obj)
+            notify_change(container_client)
+            if versioned :
+                return get_versioned_url(blob_client.url, result.get('etag'))
             return blob_client.url
         except Exception as e :
             raise Exception(f"ERROR: Blob 업로드 실패 ({blob_name}): {e}")
+
+    # 존재 확인 없이 한 번에 삭제 (없는 blob 은 성공으로 처리)
+    def delete_blob(self, container_client, blob_name) :
+        try :
+            return delete_blob(container_client, blob_name)
+        except Exception as e :
+            raise Exception(f"ERROR: Blob 삭제 실패 ({blob_name}): {e}")
     
     # Azure Blob Strorage 에서 파일 다운로드
     def download_blob_as_text(self, container_client, blob_name) :
@@ -116,6 +150,158 @@ class AzureBlobStorageUtil :
         except Exception as e :
             raise Exception(f"ERROR: Blob 다운로드 실패 ({blob_name}): {e}")
         
+# 스토리 분석 요청 옵션
+STORY_COMPLETION_OPTIONS = {
+    'temperature': 0.5,                         # 너무 제멋대로 만들지 않도록 온도를 약간 낮춥니다.
+    'response_format': {"type": "json_object"}, # "결과는 무조건 JSON 형식으로 줘!" 라는 강력한 옵션입니다.
+}
+
+# DALL-E 3 이미지 생성 옵션
+DALLE_IMAGE_OPTIONS = {
+    'n': 1,
+    'size': "1024x1024",
+    'style': "vivid",
+    'quality': "standard",
+}
+
+# 분기점 이미지 스타일
+IMAGE_STYLE_DESCRIPTION = "Simple and clean 8-bit pixel art, minimalist, retro video game asset, clear outlines, Korean fairy tale theme. No Japanese or Chinese elements."
+
+# AI 프롬프트 (이야기 -> 분기형 게임 시나리오 JSON)
+STORY_PROMPT_TEMPLATE = """
+        당신은 주어진 평면적인 이야기를 분석해서, 플레이어의 선택에 따라 이야기가 달라지는 '가지가 나뉘는 인터랙티브 게임(branching narrative)'의 데이터로 '재창조'하는 전문 게임 시나리오 작가입니다.
+
+        [당신의 임무]
+        아래 [입력 스토리]를 기반으로, 플레이어에게 흥미로운 선택의 순간을 제공하는 게임 시나리오용 JSON을 만드세요.
+
+        [작업 규칙]
+        1.  **title 생성:**
+            *   `title` 키에는 이야기의 제목을 바탕으로 한 **'한글 title'**을 만들어주세요. (예: "의좋은 형제")
+            *   `title_eng` 키에는 한글 title을 영어로 번역하고, 띄어쓰기를 하이픈(-)으로 연결한 **'영문 title'**를 만들어주세요. (예: "good-brothers")
+
+        2.  **장면 나누기:** 이야기의 전통적인 구조(기승전결)를 참고하여 4~5개의 핵심 장면(Moment)으로 나누고, 각 장면에 고유한 영어 ID(예: MOMENT_START)를 붙여주세요.
+
+        3.  **분기 생성:** 플레이어의 선택이 의미 있도록, 원작에 없더라도 선택의 결과로 이어질 '새로운 장면'이나 '짧은 엔딩'(좋은/나쁜/재미있는 엔딩 등)을 1~2개 이상 창의적으로 만들어내야 합니다. 단, 모든 새로운 분기는 원작의 핵심 교훈을 강화하거나, 등장인물의 성격을 더 깊이 탐구하는 방향으로 만들어져야 합니다.
+
+        4.  **장면 묘사 원칙 (클리프행어):** 선택지가 있는 장면(엔딩이 아닌 장면)의 'description'은, 반드시 플레이어가 선택을 내리기 직전의 긴장감 넘치는 상황까지만 묘사해야 합니다. 선택의 결과를 미리 암시하거나 결론을 내리면 절대 안 됩니다.
+            *   (예시): "주인공은 동굴 깊은 곳에서 거대한 무언가가 천천히 눈을 뜨는 것을 보았다." 처럼, "그래서 어떻게 됐을까?" 하고 궁금해하는 순간에 묘사를 멈춰야 합니다.
+
+        5.  **논리적 일관성 검증 (인과관계):** 선택지는 '원인(Cause)', 이어지는 장면의 내용은 '결과(Effect)'입니다. 이 둘은 반드시 명확하고 설득력 있는 인과관계로 이어져야 합니다. '친구를 구하러 간다'는 선택지가 '혼자 보물을 발견하는' 장면으로 이어지는 것처럼, 논리적으로 말이 안 되는 연결은 절대 만들면 안 됩니다.
+
+        6.  **완벽한 기술적 연결:** 각 'choices' 배열 안의 모든 선택지는, 반드시 'next_moment_id' 키를 통해 이 JSON 파일 내에 실제로 '정의된' 다른 장면 ID로 연결되어야 합니다. 이것은 매우 중요한 기술적 규칙입니다.
+
+        7.  **엔딩 처리:** 이야기의 끝을 맺는 장면(엔딩)에는 'choices' 키 자체를 포함하지 마세요. 엔딩의 'description'은 최종적인 결과와 이야기가 주는 교훈을 요약해야 합니다.
+
+        8.  **JSON 형식 준수:** 최종 결과는 반드시 아래 [출력 JSON 형식]과 똑같은 구조의 JSON 데이터로만 출력해야 합니다. 설명이나 다른 말을 절대 덧붙이지 마세요.
+
+        [입력 스토리]
+        ---
+        {story_text}
+        ---
+
+        [출력 JSON 형식]
+        {{
+            "title": "이야기 제목",
+            "title_eng" : "이야기 영어 제목",
+            "description": "이야기의 전체적인 배경이나 주제 (2-3문장으로 요약)",
+            "description_eng": "이야기의 전체적인 배경이나 주제 (2-3문장으로 요약)를 영어로 번역",
+            "start_moment_id": "MOMENT_START",
+            "moments": {{
+                "MOMENT_START": {{
+                    "description": "첫 번째 장면에 대한 핵심 목표 설명. (예: 주인공이 모험을 떠나게 되는 계기)",
+                    "choices": [
+                        {{ "action_type": "NEUTRAL", "next_moment_id": "MOMENT_CONFLICT" }}
+                    ]
+                }},
+                "MOMENT_CONFLICT": {{
+                    "description": "두 번째 장면에 대한 핵심 목표 설명. (예: 주인공이 첫 번째 시련이나 갈등에 부딪힘)",
+                    "choices": [
+                        {{ "action_type": "GOOD", "next_moment_id": "MOMENT_CLIMAX" }},
+                        {{ "action_type": "BAD", "next_moment_id": "ENDING_BAD_A" }}
+                    ]
+                }},
+                "MOMENT_CLIMAX": {{
+                    "description": "이야기의 절정. 주인공이 중요한 결정을 내림.",
+                    "choices": [
+                        {{ "action_type": "GOOD", "next_moment_id": "ENDING_GOOD" }},
+                        {{ "action_type": "NEUTRAL", "next_moment_id": "ENDING_BAD_A" }}
+                    ]
+                }},
+                "ENDING_GOOD": {{
+                    "description": "[해피 엔딩] 원작의 교훈을 따랐을 때의 긍정적인 결말."
+                }},
+                "ENDING_BAD_A": {{
+                    "description": "[배드 엔딩] 다른 선택을 했을 때 이어지는 비극적인 결말."
+                }}
+            }}
+        }}
+        """
+
+# 스토리/분기점/선택지 DB 저장 후 그래프 인덱스 생성 및 캐시 무효화
+def save_story(story_name, story_json) :
+    # Story 에 데이터 저장
+    story_instance = Story.objects.create(
+        title=story_json.get('title', story_name),
+        title_eng=story_json.get('title_eng', ''),
+        description=story_json.get('description', ''),
+        description_eng=story_json.get('description_eng', '')
+    )
+
+    # StorymodeMoment 에 데이터 저장
+    moment_id_to_instance = {}
+    for moment_id, moment_data in story_json['moments'].items() :
+        moment_instance = StorymodeMoment.objects.create(
+            story=story_instance,
+            title=moment_data.get('title', moment_id),
+            description=moment_data.get('description', '')
+        )
+        moment_id_to_instance[moment_id] = moment_instance
+
+    # Story 의 start_moment 업데이트
+    start_moment_id_from_ai = story_json.get('start_moment_id')
+    if start_moment_id_from_ai and start_moment_id_from_ai in moment_id_to_instance :
+        story_instance.start_moment = moment_id_to_instance[start_moment_id_from_ai]
+        story_instance.save()
+    else :
+        print(f"경고: AI 응답에 start_moment_id가 없거나 유효하지 않습니다: {start_moment_id_from_ai}")
+
+    # StorymodeChoice 에 데이터 저장
+    for moment_id, moment_data in story_json['moments'].items() :
+        current_moment_instance = moment_id_to_instance[moment_id]
+        if 'choices' in moment_data :
+            for choice_data in moment_data['choices'] :
+                next_moment_id_from_ai  = choice_data.get('next_moment_id')
+
+                next_moment_instance = None
+                if next_moment_id_from_ai and next_moment_id_from_ai in moment_id_to_instance :
+                    next_moment_instance = moment_id_to_instance[next_moment_id_from_ai]
+                
+                StorymodeChoice.objects.create(
+                    moment=current_moment_instance,
+                    next_moment=next_moment_instance,
+                    action_type=choice_data.get('action_type')
+                )
+
+    # 진행률/엔딩 판정에 사용할 그래프 인덱스 생성
+    build_story_graph(story_instance)
+    invalidate_model(Story)
+    return story_instance
+
+# DALL-E 프롬프트 작성 요청
+def build_dalle_request_prompt(moment_description) :
+    return f"""
+        You are an expert prompt writer for an 8-bit pixel art image generator. Your task is to convert a scene description into a single, visually detailed paragraph for the DALL-E model.
+        **Consistent Rules (Apply to all images):**
+        - **Art Style:** {IMAGE_STYLE_DESCRIPTION}
+        - Avoid extreme or frightening language (e.g., sinister, menacing, tragic, chaos).
+        - Keep the description adventurous, mysterious, or tense, but not violent or horrific.
+        - Expressions can show worry, caution, or tension, but do not emphasize gore, blood, or graphic horror.
+        - The final tone should feel like a retro video game cutscene, safe for all audiences.
+        **Current Scene Description to Convert:**
+        - "{moment_description}"
+        Combine all of this information into a single descriptive paragraph. Focus on visual details like character actions, expressions, and background elements. Do not use markdown or lists.
+        """
+
 # 전달되는 스토리 파일을 Azure Blob Storage 에 업로드
 class StoryFileUploadView(AuthMixin) :
     def post(self, request) :
@@ -126,22 +312,39 @@ class StoryFileUploadView(AuthMixin) :
                 'message' : '파일이 없습니다.'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        # Azure Blob Storage 파일 업로드
+        # Azure Blob Storage 파일 업로드 (내용 해시를 blob 이름으로 사용)
         try :
+            content_hash, size = hash_uploaded_file(file)
             blob_util = AzureBlobStorageUtil(AppSettings.AZURE_BLOB_STORAGE_CONNECT_KEY_FOR_FILE)
             container_client = blob_util.get_or_create_container('stories')
+
+            # 같은 내용이 이미 업로드되어 있으면 업로드 생략
+            source = find_source('story', content_hash=content_hash)
+            if source :
+                file_url = blob_util.get_existing_blob_url(container_client, source.blob_name)
+                if file_url :
+                    target = get_generated_target(source)
+                    return JsonResponse({
+                        'message' : '이미 업로드된 파일입니다.',
+                        'file_url' : file_url,
+                        'blob_name' : source.blob_name,
+                        'story_id' : str(target.id) if target else None,
+                    }, status=status.HTTP_200_OK)
+
+            blob_name = source.blob_name if source else get_content_blob_name(content_hash, file.name)
             file_url = blob_util.upload_blob(
                 container_client=container_client,
-                blob_name=file.name,
-                data=file.read(),
+                blob_name=blob_name,
+                data=file,
                 content_type=file.content_type,
                 overwrite=True
             )
+            register_upload('story', content_hash, blob_name, file.name, size)
 
             return JsonResponse({
                 'message' : '파일 업로드 성공',
                 'file_url' : file_url,
-                'blob_name' : file.name
+                'blob_name' : blob_name
             }, status=status.HTTP_201_CREATED)
         except Exception as e :
             print(f'파일 업로드 Exception: {e}')     
@@ -160,6 +363,11 @@ class StoryCreateView(AuthMixin) :
                 'message' : '스토리 이름 혹은 업로드 파일 url 이 필요합니다.'
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        # 같은 파일로 이미 생성된 스토리가 있으면 다운로드와 AI 분석 생략
+        existing = find_generated_target('story', blob_name=blob_name)
+        if existing :
+            return self._existing_response(existing)
+
         # 1. Azure Blob Storage 에서 파일 내용 가져오기
         story_text = ''
         try:
@@ -176,6 +384,12 @@ class StoryCreateView(AuthMixin) :
             return JsonResponse({
                 'message' : '파일 다운로드 실패'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        # 다른 이름으로 올라온 같은 내용의 파일도 재사용
+        content_hash = hash_text(story_text)
+        existing = find_generated_target('story', content_hash=content_hash)
+        if existing :
+            return self._existing_response(existing)
                 
         # 2. Azure OpenAI 클라이언트 초기화
         client = get_azure_openai_client(
@@ -189,85 +403,16 @@ class StoryCreateView(AuthMixin) :
                 'message': 'AI 서비스 연결 실패: OpenAI 클라이언트 초기화 오류'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        # 3. AI 프롬프트 구성 및 Azure OpenAI 요청
-        PROMPT_TEMPLATE = """
-        당신은 주어진 평면적인 이야기를 분석해서, 플레이어의 선택에 따라 이야기가 달라지는 '가지가 나뉘는 인터랙티브 게임(branching narrative)'의 데이터로 '재창조'하는 전문 게임 시나리오 작가입니다.
-
-        [당신의 임무]
-        아래 [입력 스토리]를 기반으로, 플레이어에게 흥미로운 선택의 순간을 제공하는 게임 시나리오용 JSON을 만드세요.
-
-        [작업 규칙]
-        1.  **title 생성:**
-            *   `title` 키에는 이야기의 제목을 바탕으로 한 **'한글 title'**을 만들어주세요. (예: "의좋은 형제")
-            *   `title_eng` 키에는 한글 title을 영어로 번역하고, 띄어쓰기를 하이픈(-)으로 연결한 **'영문 title'**를 만들어주세요. (예: "good-brothers")
-
-        2.  **장면 나누기:** 이야기의 전통적인 구조(기승전결)를 참고하여 4~5개의 핵심 장면(Moment)으로 나누고, 각 장면에 고유한 영어 ID(예: MOMENT_START)를 붙여주세요.
-
-        3.  **분기 생성:** 플레이어의 선택이 의미 있도록, 원작에 없더라도 선택의 결과로 이어질 '새로운 장면'이나 '짧은 엔딩'(좋은/나쁜/재미있는 엔딩 등)을 1~2개 이상 창의적으로 만들어내야 합니다. 단, 모든 새로운 분기는 원작의 핵심 교훈을 강화하거나, 등장인물의 성격을 더 깊이 탐구하는 방향으로 만들어져야 합니다.
-
-        4.  **장면 묘사 원칙 (클리프행어):** 선택지가 있는 장면(엔딩이 아닌 장면)의 'description'은, 반드시 플레이어가 선택을 내리기 직전의 긴장감 넘치는 상황까지만 묘사해야 합니다. 선택의 결과를 미리 암시하거나 결론을 내리면 절대 안 됩니다.
-            *   (예시): "주인공은 동굴 깊은 곳에서 거대한 무언가가 천천히 눈을 뜨는 것을 보았다." 처럼, "그래서 어떻게 됐을까?" 하고 궁금해하는 순간에 묘사를 멈춰야 합니다.
-
-        5.  **논리적 일관성 검증 (인과관계):** 선택지는 '원인(Cause)', 이어지는 장면의 내용은 '결과(Effect)'입니다. 이 둘은 반드시 명확하고 설득력 있는 인과관계로 이어져야 합니다. '친구를 구하러 간다'는 선택지가 '혼자 보물을 발견하는' 장면으로 이어지는 것처럼, 논리적으로 말이 안 되는 연결은 절대 만들면 안 됩니다.
-
-        6.  **완벽한 기술적 연결:** 각 'choices' 배열 안의 모든 선택지는, 반드시 'next_moment_id' 키를 통해 이 JSON 파일 내에 실제로 '정의된' 다른 장면 ID로 연결되어야 합니다. 이것은 매우 중요한 기술적 규칙입니다.
-
-        7.  **엔딩 처리:** 이야기의 끝을 맺는 장면(엔딩)에는 'choices' 키 자체를 포함하지 마세요. 엔딩의 'description'은 최종적인 결과와 이야기가 주는 교훈을 요약해야 합니다.
-
-        8.  **JSON 형식 준수:** 최종 결과는 반드시 아래 [출력 JSON 형식]과 똑같은 구조의 JSON 데이터로만 출력해야 합니다. 설명이나 다른 말을 절대 덧붙이지 마세요.
-
-        [입력 스토리]
-        ---
-        {story_text}
-        ---
-
-        [출력 JSON 형식]
-        {{
-            "title": "이야기 제목",
-            "title_eng" : "이야기 영어 제목",
-            "description": "이야기의 전체적인 배경이나 주제 (2-3문장으로 요약)",
-            "description_eng": "이야기의 전체적인 배경이나 주제 (2-3문장으로 요약)를 영어로 번역",
-            "start_moment_id": "MOMENT_START",
-            "moments": {{
-                "MOMENT_START": {{
-                    "description": "첫 번째 장면에 대한 핵심 목표 설명. (예: 주인공이 모험을 떠나게 되는 계기)",
-                    "choices": [
-                        {{ "action_type": "NEUTRAL", "next_moment_id": "MOMENT_CONFLICT" }}
-                    ]
-                }},
-                "MOMENT_CONFLICT": {{
-                    "description": "두 번째 장면에 대한 핵심 목표 설명. (예: 주인공이 첫 번째 시련이나 갈등에 부딪힘)",
-                    "choices": [
-                        {{ "action_type": "GOOD", "next_moment_id": "MOMENT_CLIMAX" }},
-                        {{ "action_type": "BAD", "next_moment_id": "ENDING_BAD_A" }}
-                    ]
-                }},
-                "MOMENT_CLIMAX": {{
-                    "description": "이야기의 절정. 주인공이 중요한 결정을 내림.",
-                    "choices": [
-                        {{ "action_type": "GOOD", "next_moment_id": "ENDING_GOOD" }},
-                        {{ "action_type": "NEUTRAL", "next_moment_id": "ENDING_BAD_A" }}
-                    ]
-                }},
-                "ENDING_GOOD": {{
-                    "description": "[해피 엔딩] 원작의 교훈을 따랐을 때의 긍정적인 결말."
-                }},
-                "ENDING_BAD_A": {{
-                    "description": "[배드 엔딩] 다른 선택을 했을 때 이어지는 비극적인 결말."
-                }}
-            }}
-        }}
-        """
-
-        final_prompt = PROMPT_TEMPLATE.format(story_text=story_text)
+        # 3. AI 프롬프트 구성 및 Azure OpenAI 요청 (긴 원문은 조각별 요약을 합쳐서 사용)
         print("AI에게 이야기 분석을 요청하고 있습니다... (시간이 조금 걸릴 수 있어요)")
 
         try :
+            source_text = summarize_long_text(client, AppSettings.AZURE_OPENAI_DEPLOYMENT, story_text)
+            final_prompt = STORY_PROMPT_TEMPLATE.format(story_text=source_text)
             response = client.chat.completions.create(
                 model=AppSettings.AZURE_OPENAI_DEPLOYMENT,
                 messages=[{"role": "user", "content": final_prompt}],
-                temperature=0.5,                        # 너무 제멋대로 만들지 않도록 온도를 약간 낮춥니다.
-                response_format={"type": "json_object"} # "결과는 무조건 JSON 형식으로 줘!" 라는 강력한 옵션입니다.
+                **STORY_COMPLETION_OPTIONS
             )
         
             ai_response_content = response.choices[0].message.content
@@ -283,49 +428,9 @@ class StoryCreateView(AuthMixin) :
 
         # 4. AI 응답 데이터 DB 저장
         try :
-            # Story 에 데이터 저장
-            story_instance = Story.objects.create(
-                title=story_json.get('title', story_name),
-                title_eng=story_json.get('title_eng', ''),
-                description=story_json.get('description', ''),
-                description_eng=story_json.get('description_eng', '')
-            )
-
-            # StorymodeMoment 에 데이터 저장
-            moment_id_to_instance = {}
-            for moment_id, moment_data in story_json['moments'].items() :
-                moment_instance = StorymodeMoment.objects.create(
-                    story=story_instance,
-                    title=moment_data.get('title', moment_id),
-                    description=moment_data.get('description', '')
-                )
-                moment_id_to_instance[moment_id] = moment_instance
-
-            # Story 의 start_moment 업데이트
-            start_moment_id_from_ai = story_json.get('start_moment_id')
-            if start_moment_id_from_ai and start_moment_id_from_ai in moment_id_to_instance :
-                story_instance.start_moment = moment_id_to_instance[start_moment_id_from_ai]
-                story_instance.save()
-            else :
-                print(f"경고: AI 응답에 start_moment_id가 없거나 유효하지 않습니다: {start_moment_id_from_ai}")
-
-            # StorymodeChoice 에 데이터 저장
-            for moment_id, moment_data in story_json['moments'].items() :
-                current_moment_instance = moment_id_to_instance[moment_id]
-                if 'choices' in moment_data :
-                    for choice_data in moment_data['choices'] :
-                        next_moment_id_from_ai  = choice_data.get('next_moment_id')
-
-                        next_moment_instance = None
-                        if next_moment_id_from_ai and next_moment_id_from_ai in moment_id_to_instance :
-                            next_moment_instance = moment_id_to_instance[next_moment_id_from_ai]
-                        
-                        StorymodeChoice.objects.create(
-                            moment=current_moment_instance,
-                            next_moment=next_moment_instance,
-                            action_type=choice_data.get('action_type')
-                        )
-
+            # Story / StorymodeMoment / StorymodeChoice 에 데이터 저장
+            story_instance = save_story(story_name, story_json)
+            mark_generated('story', content_hash, blob_name, story_instance.id)
             print("AI 응답 데이터 DB 저장 성공!")
             return JsonResponse({
                 'message' : '인터랙티브 스토리 생성 및 저장 성공',
@@ -339,71 +444,94 @@ class StoryCreateView(AuthMixin) :
                 'ai_response' : story_json
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    def _existing_response(self, story) :
+        print(f"같은 원본으로 생성된 스토리 재사용: {story.id}")
+        return JsonResponse({
+            'message' : '같은 파일로 생성된 스토리가 있습니다.',
+            'story_id' : str(story.id),
+            'data' : StorySerializer(story).data,
+        }, status=status.HTTP_200_OK)
+
 # 스토리 DB 조회
 class StoryListView(AuthMixin) :
     def get(self, request) :
         try :
-            # stories = Story.objects.filter(is_display=True).prefetch_related('moments__choices')
-            stories = Story.objects.all().prefetch_related('moments__choices')
-
-            story_list_data = []
-            for story in stories :
-                moments_dict = {}
-                for moment in story.moments.all() :
-                    choices_data = []
-                    for choice in moment.choices.all() :
-                        choices_data.append({
-                            'action_type' : choice.action_type,
-                            'next_moment_id' : str(choice.next_moment.id) if choice.next_moment else None
-                        })
-                    
-                    # 분기점 정보
-                    moments_dict[str(moment.id)] = {
-                        'title' : moment.title,
-                        'description' : moment.description,
-                        'choices_data' : choices_data,
-                        'image_path' : moment.image_path
-                    }
-                
-                # moments_data를 순서가 있는 OrderedDict로 만들기
-                ordered_moments_data = {}
-                start_moment_id_str = str(story.start_moment.id) if story.start_moment else None
-                if start_moment_id_str and start_moment_id_str in moments_dict:
-                    # 시작 모멘트가 있다면 가장 먼저 추가
-                    ordered_moments_data[start_moment_id_str] = moments_dict[start_moment_id_str]
-                    # 시작 모멘트는 이미 추가했으므로 딕셔너리에서 제거
-                    del moments_dict[start_moment_id_str]
-                
-                ordered_moments_data.update(moments_dict)
-
-
-                # 스토리 정보
-                story_list_data.append({
-                    'id' : str(story.id),
-                    'title' : story.title,
-                    'title_eng' : story.title_eng,
-                    'description' : story.description,
-                    'description_eng' : story.description_eng,
-                    'content' : json.dumps({
-                        'start_moment_id' : start_moment_id_str,
-                        'start_moment_title' : story.start_moment.title if story.start_moment else None,
-                        'moments' : ordered_moments_data
-                    }),
-                    'image_path' : story.image_path,
-                    'is_display' : story.is_display,
-                    'is_deleted' : story.is_deleted,
-                })
-            
-            return JsonResponse({
+            # 스토리(분기점/선택지 포함) 버전이 같으면 본문 없이 304 응답
+            cache_key = get_cache_key(Story)
+            version = get_version(cache_key)
+            etag = make_etag(cache_key, version)
+            not_modified = get_not_modified_response(request, etag)
+            if not_modified is not None :
+                return not_modified
+
+            story_list_data = get_or_build(cache_key, self._build_story_list, version)
+
+            response = JsonResponse({
                 'message' : '스토리 목록 조회 성공',
                 'stories' : story_list_data
             }, status=status.HTTP_200_OK)
+            return set_etag_headers(response, etag)
         except Exception as e :
             print(f"🛑 오류: 스토리 목록을 조회하는 데 실패했습니다. 오류: {e}")
             return JsonResponse({
                 'message' : '스토리 목록 조회 실패'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    # 스토리 목록 데이터 생성
+    def _build_story_list(self) :
+        # stories = Story.objects.filter(is_display=True).prefetch_related('moments__choices')
+        stories = Story.objects.all().prefetch_related('moments__choices')
+
+        story_list_data = []
+        for story in stories :
+            moments_dict = {}
+            for moment in story.moments.all() :
+                choices_data = []
+                for choice in moment.choices.all() :
+                    choices_data.append({
+                        'action_type' : choice.action_type,
+                        'next_moment_id' : str(choice.next_moment.id) if choice.next_moment else None
+                    })
+                
+                # 분기점 정보
+                moments_dict[str(moment.id)] = {
+                    'title' : moment.title,
+                    'description' : moment.description,
+                    'choices_data' : choices_data,
+                    'image_path' : moment.image_path
+                }
+            
+            # moments_data를 순서가 있는 OrderedDict로 만들기
+            ordered_moments_data = {}
+            start_moment_id_str = str(story.start_moment.id) if story.start_moment else None
+            if start_moment_id_str and start_moment_id_str in moments_dict:
+                # 시작 모멘트가 있다면 가장 먼저 추가
+                ordered_moments_data[start_moment_id_str] = moments_dict[start_moment_id_str]
+                # 시작 모멘트는 이미 추가했으므로 딕셔너리에서 제거
+                del moments_dict[start_moment_id_str]
+            
+            ordered_moments_data.update(moments_dict)
+
+
+            # 스토리 정보
+            story_list_data.append({
+                'id' : str(story.id),
+                'title' : story.title,
+                'title_eng' : story.title_eng,
+                'description' : story.description,
+                'description_eng' : story.description_eng,
+                'content' : json.dumps({
+                    'start_moment_id' : start_moment_id_str,
+                    'start_moment_title' : story.start_moment.title if story.start_moment else None,
+                    'moments' : ordered_moments_data
+                }),
+                'image_path' : story.image_path,
+                'is_display' : story.is_display,
+                'is_deleted' : story.is_deleted,
+            })
+
+        return story_list_data
+
 # 스토리 DB 업데이트
 class StoryUpdateView(AuthMixin, UpdateMixin) :
     def put(self, request, story_id) :
@@ -414,9 +542,14 @@ class StoryUpdateAllView(AuthMixin, UpdateAllMixin) :
     def put(self, request) :
         return super().put(request, Story)
 
+# 스토리 DB 일괄 업데이트 (id 별 변경)
+class StoryBatchUpdateView(AuthMixin, BatchUpdateMixin) :
+    def patch(self, request) :
+        return super().patch(request, Story)
+
 # 이미지 공통 로직 View
 class BaseImageView(AuthMixin) :
-    STYLE_DESCRIPTION = "Simple and clean 8-bit pixel art, minimalist, retro video game asset, clear outlines, Korean fairy tale theme. No Japanese or Chinese elements."
+    STYLE_DESCRIPTION = IMAGE_STYLE_DESCRIPTION
 
     # 에러 응답
     def _handle_error_response(self, message, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR):
@@ -435,18 +568,7 @@ class BaseImageView(AuthMixin) :
         if not gpt_client :
             raise Exception('AI 서비스 연결 실패: OpenAI 클라이언트 초기화 오류')
 
-        gpt_prompt = f"""
-        You are an expert prompt writer for an 8-bit pixel art image generator. Your task is to convert a scene description into a single, visually detailed paragraph for the DALL-E model.
-        **Consistent Rules (Apply to all images):**
-        - **Art Style:** {self.STYLE_DESCRIPTION}
-        - Avoid extreme or frightening language (e.g., sinister, menacing, tragic, chaos).
-        - Keep the description adventurous, mysterious, or tense, but not violent or horrific.
-        - Expressions can show worry, caution, or tension, but do not emphasize gore, blood, or graphic horror.
-        - The final tone should feel like a retro video game cutscene, safe for all audiences.
-        **Current Scene Description to Convert:**
-        - "{moment_description}"
-        Combine all of this information into a single descriptive paragraph. Focus on visual details like character actions, expressions, and background elements. Do not use markdown or lists.
-        """
+        gpt_prompt = build_dalle_request_prompt(moment_description)
 
         try :
             gpt_response = gpt_client.chat.completions.create(
@@ -476,10 +598,7 @@ class BaseImageView(AuthMixin) :
             dalle_response = dalle_client.images.generate(
                 model=AppSettings.AZURE_OPENAI_DALLE_DEPLOYMENT,
                 prompt=dalle_prompt,
-                n=1,
-                size="1024x1024",
-                style="vivid",
-                quality="standard"
+                **DALLE_IMAGE_OPTIONS
             )
             temp_image_url = dalle_response.data[0].url if dalle_response.data else None
             if not temp_image_url :
@@ -495,9 +614,11 @@ class BaseImageView(AuthMixin) :
             image_response = requests.get(temp_image_url, stream=True)
             image_response.raise_for_status() # 200 OK가 아닌 경우 예외 발생
 
-            content_settings_obj = ContentSettings(content_type='image/png')
-            blob_client.upload_blob(image_response.content, overwrite=True, content_settings=content_settings_obj)
-            final_image_url = blob_client.url
+            # URL 에 내용 버전(ETag)이 들어가므로 장기 캐시
+            content_settings_obj = ContentSettings(content_type='image/png', cache_control=IMAGE_CACHE_CONTROL)
+            result = blob_client.upload_blob(image_response.content, overwrite=True, content_settings=content_settings_obj)
+            notify_change(blob_client)
+            final_image_url = get_versioned_url(blob_client.url, result.get('etag'))
             print(f">> 업로드 성공! 최종 URL: {final_image_url}\n")
             return final_image_url
         except requests.exceptions.RequestException as e :
@@ -511,6 +632,7 @@ class BaseImageView(AuthMixin) :
             moment = StorymodeMoment.objects.get(id=moment_id)
             moment.image_path = image_path
             moment.save()
+            invalidate_model(Story)
         except Exception as e :
             raise Exception(f"DB 업데이트 실패 (Moment ID: {moment_id}): {e}")
 
@@ -541,7 +663,9 @@ class StoryImageUploadView(BaseImageView) :
                 blob_name=blob_name,
                 data=file.read(),
                 content_type=file.content_type,
-                overwrite=True
+                overwrite=True,
+                cache_control=IMAGE_CACHE_CONTROL,
+                versioned=True
             )
         except Exception as e :
             return self._handle_error_response(str(e))
@@ -551,6 +675,7 @@ class StoryImageUploadView(BaseImageView) :
             story = Story.objects.get(id=story_id)
             story.image_path = file_url
             story.save()
+            invalidate_model(Story)
 
             return JsonResponse({
                 'message': '이미지 업로드 완료',
@@ -580,31 +705,26 @@ class MomentImageCreateView(BaseImageView) :
             container_client = blob_util.get_or_create_container(container_name, public=True)
             blob_client = container_client.get_blob_client(blob=blob_name)
             
-            existing_image_url = blob_util.check_blob_exists_and_get_url(blob_client)
+            # 기존 이미지는 ETag 버전 URL 을 그대로 사용 (내용이 같으면 URL 도 같아 캐시 유지)
+            existing_image_url = blob_util.get_existing_blob_url(container_client, blob_name, versioned=True)
             if existing_image_url:
-                # 타임스탬프를 붙여서 캐시 무효화
-                timestamp = int(time.time())
-                existing_image_url_with_timestamp = f'{existing_image_url}?t={timestamp}'
-                self._update_moment_image_path(moment_id, existing_image_url_with_timestamp)
+                self._update_moment_image_path(moment_id, existing_image_url)
                 return JsonResponse({
                     'message': '이미지 생성 완료 (기존 이미지 사용)',
                     'moment_id': moment_id,
-                    'image_url': existing_image_url_with_timestamp,
+                    'image_url': existing_image_url,
                 }, status=status.HTTP_200_OK)
             
             dalle_prompt = self._generate_gpt_prompt(moment_description, moment_id)
             temp_image_url = self._generate_dalle_image(dalle_prompt, moment_id)
             final_image_url = self._upload_image_to_blob(blob_client, temp_image_url, moment_id)
 
-            # 타임스탬프를 붙여서 캐시 무효화
-            timestamp = int(time.time())
-            final_image_url_with_timestamp  = f'{final_image_url}?t={timestamp}'
-            self._update_moment_image_path(moment_id, final_image_url_with_timestamp)
+            self._update_moment_image_path(moment_id, final_image_url)
 
             return JsonResponse({
                 'message': '이미지 개별 생성 및 업로드 완료',
                 'moment_id': moment_id,
-                'image_url': final_image_url_with_timestamp,
+                'image_url': final_image_url,
             }, status=status.HTTP_200_OK)
         except Exception as e:
             return self._handle_error_response(str(e))
@@ -639,18 +759,14 @@ class MomentImageDeleteView(BaseImageView) :
             blob_name = path_parts[1]
 
             blob_util = AzureBlobStorageUtil(AppSettings.AZURE_BLOB_STORAGE_CONNECT_KEY_FOR_IMAGE)
-            container_client = blob_util.get_or_create_container(container_name, public=True)
-            blob_client = container_client.get_blob_client(blob=blob_name)
+            container_client = blob_util.blob_service_client.get_container_client(container_name)
             
-            # Azure Blob Storage에서 이미지 삭제 시도
+            # Azure Blob Storage에서 이미지 삭제 시도 (존재 확인 없이 한 번에 삭제, 없으면 건너뜀)
             try:
-                if blob_client.exists():
-                    blob_client.delete_blob()
+                if blob_util.delete_blob(container_client, blob_name):
                     print(f"Azure Blob Storage에서 이미지 삭제 완료: {blob_name}")
                 else:
                     print(f"Azure Blob Storage에 이미지가 존재하지 않아 삭제를 건너뛰었습니다: {blob_name}")
-            except ResourceNotFoundError:
-                print(f"Azure Blob Storage에서 Blob '{blob_name}'을(를) 찾을 수 없어 삭제를 건너뛰었습니다.")
             except Exception as blob_delete_e:
                 print(f"Azure Blob Storage 이미지 삭제 실패 (Blob: {blob_name}): {blob_delete_e}")
                 return self._handle_error_response(
@@ -661,6 +777,7 @@ class MomentImageDeleteView(BaseImageView) :
             # Blob 삭제가 성공했거나, Blob이 없었을 경우에만 DB 업데이트 진행
             moment.image_path = None
             moment.save()
+            invalidate_model(Story)
             print(f"DB에서 Moment ID {moment_id}의 image_path 삭제 완료")
 
             return JsonResponse({
@@ -677,6 +794,38 @@ class MomentImageDeleteView(BaseImageView) :
             print(f"이미지 삭제 중 오류 발생: {e}")
             return self._handle_error_response(str(e))
 
+# 스토리 전체 이미지 삭제 (분기점 이미지 + 썸네일, Blob Batch 삭제 한 번 + bulk_update 한 번)
+class StoryImageDeleteAllView(BaseImageView) :
+    def delete(self, request, story_id) :
+        try :
+            story = Story.objects.get(id=story_id)
+        except (Story.DoesNotExist, ValidationError) :
+            return self._handle_error_response(
+                f"Story ID {story_id}를 찾을 수 없습니다.",
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+
+        rows = [('thumbnail', story)] + [
+            ('moment', moment) for moment in StorymodeMoment.objects.filter(story=story).only('id', 'image_path')
+        ]
+
+        try :
+            blob_util = AzureBlobStorageUtil(AppSettings.AZURE_BLOB_STORAGE_CONNECT_KEY_FOR_IMAGE)
+            results = delete_row_images(blob_util.blob_service_client, rows)
+        except Exception as e :
+            print(f"이미지 일괄 삭제 중 오류 발생: {e}")
+            return self._handle_error_response(str(e))
+        invalidate_model(Story)
+
+        # 일부 항목만 실패하면 207 (실패한 항목의 image_path 는 그대로 유지)
+        counts = count_image_results(results)
+        return JsonResponse({
+            'message': '스토리 이미지 일괄 삭제 완료' if not counts.get('failed') else '일부 이미지 삭제 실패',
+            'story_id': str(story.id),
+            'counts': counts,
+            'results': results,
+        }, status=status.HTTP_207_MULTI_STATUS if counts.get('failed') else status.HTTP_200_OK)
+
 # 스토리모드 통계
 class StorymodeStatisticsView(AuthMixin):
     def get(self, request):
@@ -700,4 +849,64 @@ class StorymodeStatisticsView(AuthMixin):
         except Exception as e:
             return JsonResponse({
                 'message' : f'DB 조회 실패: {e}',
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# 스토리별 평균 진행률 / 멈춘 세션 리포트 (세션 history 를 DB 에서 집계)
+class StorymodeProgressReportView(AuthMixin):
+    def get(self, request):
+        try:
+            idle_days = int(request.GET.get('idle_days', STUCK_IDLE_DAYS))
+            limit = int(request.GET.get('limit', STUCK_SESSION_LIMIT))
+            if idle_days < 0 or limit <= 0 :
+                raise ValueError('idle_days 는 0 이상, limit 은 1 이상이어야 합니다.')
+            story_ids = [uuid.UUID(story_id) for story_id in request.GET.getlist('story_id')] or None
+        except ValueError as e:
+            return JsonResponse({
+                'message': f'조회 조건이 올바르지 않습니다: {e}',
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            story_progress = fetch_story_progress_summary(story_ids)
+            stuck_sessions = fetch_stuck_sessions(idle_days, limit, story_ids)
+
+            # 스토리 제목은 행 수가 적은 Story 테이블에서 한 번에 조회
+            titles = dict(Story.objects.filter(
+                id__in={row['story_id'] for row in story_progress + stuck_sessions}
+            ).values_list('id', 'title'))
+            for row in story_progress + stuck_sessions :
+                row['story_title'] = titles.get(row['story_id'])
+
+            return JsonResponse({
+                'message': '진행률 리포트 조회 완료',
+                'story_progress': story_progress,
+                'stuck_sessions': stuck_sessions,
+            }, status=status.HTTP_200_OK)
+        except Exception as e:
+            return JsonResponse({
+                'message' : f'DB 조회 실패: {e}',
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# 스토리 분기 퍼널 (선택지별 선택 수와 분기점별 이탈률, python manage.py update_branch_funnel 로 집계한 값)
+class StoryFunnelView(AuthMixin):
+    def get(self, request, story_id):
+        try:
+            story = Story.objects.only('id', 'title', 'start_moment_id').get(id=story_id)
+        except (Story.DoesNotExist, ValidationError):
+            return JsonResponse({
+                'message': '스토리를 찾을 수 없습니다.',
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            return JsonResponse({
+                'message': '스토리 분기 퍼널 조회 완료',
+                'story': {
+                    'id': story.id,
+                    'title': story.title,
+                    'start_moment_id': story.start_moment_id,
+                },
+                'funnel': get_story_funnel(story.id),
+            }, status=status.HTTP_200_OK)
+        except Exception as e:
+            return JsonResponse({
+                'message' : f'DB 조회 실패: {e}',
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,34 @@
+import hashlib
+from django.core.cache import caches
+from django.utils.http import urlencode
+
+
+# settings.CACHES 의 세션 조회 응답 캐시 별칭
+SESSION_CACHE_ALIAS = 'sessions'
+
+# (엔드포인트, user_id, 쿼리 파라미터) 캐시 키
+def make_session_cache_key(endpoint, user_id, params=None) :
+    param_str = urlencode(sorted((params or {}).items()), doseq=True)
+    param_hash = hashlib.md5(param_str.encode('utf-8')).hexdigest()
+    return f'user-session:{endpoint}:{user_id}:{param_hash}'
+
+# 워터마크가 같으면 캐시된 응답 데이터를, 다르면 builder 결과를 캐시 후 반환
+def get_or_build_session_data(endpoint, user_id, params, watermark, builder) :
+    cache = caches[SESSION_CACHE_ALIAS]
+    cache_key = make_session_cache_key(endpoint, user_id, params)
+
+    try :
+        entry = cache.get(cache_key)
+    except Exception as e :
+        print(f'🛑 오류: 세션 캐시 조회 실패: {e}')
+        entry = None
+
+    if entry and entry.get('watermark') == watermark :
+        return entry['data']
+
+    data = builder()
+    try :
+        cache.set(cache_key, {'watermark': watermark, 'data': data})
+    except Exception as e :
+        print(f'🛑 오류: 세션 캐시 저장 실패: {e}')
+    return data
@@ -0,0 +1,117 @@
+import csv
+import json
+import uuid
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from game.models import SinglemodeSession, MultimodeSession
+from storymode.models import StorymodeSession
+
+
+# 서버 측 커서로 한 번에 가져올 행 수
+EXPORT_CHUNK_SIZE = getattr(settings, 'SESSION_EXPORT_CHUNK_SIZE', 2000)
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+# 모드별 모델 / 내보낼 컬럼 / 기간 필터 필드 / 추가 필터 (쿼리 파라미터 -> 필드)
+EXPORT_TARGETS = {
+    'singlemode': {
+        'model': SinglemodeSession,
+        'fields': ('id', 'user_id', 'scenario_id', 'genre_id', 'difficulty_id', 'mode_id', 'character_id',
+                   'status', 'started_at', 'ended_at', 'choice_history', 'character_history'),
+        'date_field': 'started_at',
+        'filters': {'scenario_id': 'scenario_id', 'user_id': 'user_id', 'status': 'status'},
+    },
+    'multimode': {
+        'model': MultimodeSession,
+        'fields': ('id', 'user_id', 'gameroom_id', 'scenario_id', 'character_id',
+                   'status', 'started_at', 'ended_at', 'choice_history', 'character_history'),
+        'date_field': 'started_at',
+        'filters': {'scenario_id': 'scenario_id', 'user_id': 'user_id', 'status': 'status'},
+    },
+    'storymode': {
+        'model': StorymodeSession,
+        'fields': ('id', 'user_id', 'story_id', 'current_moment_id',
+                   'status', 'start_at', 'end_at', 'updated_at', 'history'),
+        'date_field': 'start_at',
+        'filters': {'story_id': 'story_id', 'user_id': 'user_id', 'status': 'status'},
+    },
+}
+
+# CSV 셀에 넣을 때 JSON 으로 변환할 컬럼
+JSON_FIELDS = {'choice_history', 'character_history', 'history'}
+
+
+# from / to 파라미터 (날짜 또는 일시, 날짜만 주면 to 는 그날 끝까지 포함)
+def parse_range_value(value, name, end=False) :
+    if not value :
+        return None, None
+
+    parsed = parse_datetime(value)
+    if parsed :
+        return (parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)), 'lte' if end else 'gte'
+
+    try :
+        parsed = parse_date(value)
+    except ValueError :
+        parsed = None
+    if parsed is None :
+        raise ValueError(f'{name} 은(는) YYYY-MM-DD 또는 ISO 8601 일시여야 합니다.')
+    return parsed, 'lte' if end else 'gte'
+
+# 내보낼 세션 queryset (필요한 컬럼만 values 로 조회)
+def build_export_queryset(target, params) :
+    date_field = target['date_field']
+    filters = {}
+
+    for name, end in (('from', False), ('to', True)) :
+        value, lookup = parse_range_value(params.get(name), name, end)
+        if value is None :
+            continue
+        # 날짜만 주어지면 날짜 단위로 비교
+        field = date_field if hasattr(value, 'hour') else f'{date_field}__date'
+        filters[f'{field}__{lookup}'] = value
+
+    for param_name, field_name in target['filters'].items() :
+        values = params.getlist(param_name) if hasattr(params, 'getlist') else [params.get(param_name)]
+        values = [value for value in values if value]
+        # 스트리밍 시작 후에는 오류 응답을 보낼 수 없으므로 id 형식을 미리 확인
+        if field_name.endswith('_id') :
+            values = [uuid.UUID(value) for value in values]
+        if values :
+            filters[f'{field_name}__in'] = values
+
+    return target['model'].objects.filter(**filters).order_by().values_list(*target['fields'])
+
+# 스트리밍 응답에 쓰기 위한 csv.writer 버퍼 (받은 값을 그대로 반환)
+class Echo :
+    def write(self, value) :
+        return value
+
+def iter_csv(queryset, fields, chunk_size=EXPORT_CHUNK_SIZE) :
+    writer = csv.writer(Echo())
+    json_indexes = {index for index, field in enumerate(fields) if field in JSON_FIELDS}
+
+    yield '\ufeff'      # 엑셀에서 한글이 깨지지 않도록 BOM
+    yield writer.writerow(fields)
+    for row in queryset.iterator(chunk_size=chunk_size) :
+        yield writer.writerow([
+            json.dumps(value, ensure_ascii=False, cls=DjangoJSONEncoder) if index in json_indexes
+            else value.isoformat() if hasattr(value, 'isoformat')
+            else value
+            for index, value in enumerate(row)
+        ])
+
+def iter_ndjson(queryset, fields, chunk_size=EXPORT_CHUNK_SIZE) :
+    for row in queryset.iterator(chunk_size=chunk_size) :
+        yield json.dumps(dict(zip(fields, row)), ensure_ascii=False, cls=DjangoJSONEncoder) + '\n'
+
+# 형식에 맞는 행 단위 제너레이터 (서버 측 커서로 chunk_size 씩 읽어 메모리 사용량 일정)
+def iter_export_rows(target, queryset, export_format, chunk_size=EXPORT_CHUNK_SIZE) :
+    if export_format == 'csv' :
+        return iter_csv(queryset, target['fields'], chunk_size)
+    return iter_ndjson(queryset, target['fields'], chunk_size)
@@ -1,16 +1,17 @@
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
+from accounts.authentication import CachedJWTAuthentication
+from django.http import JsonResponse, Http404
+from django.core.exceptions import ValidationError
+from config.bulk_update import build_target_queryset, get_batch_size, update_in_batches, get_model_fields, update_returning, parse_batch_items, batch_update_by_id
 
 
 class AuthMixin(APIView):
     # 인증된 사용자만 접근 가능
     permission_classes = [IsAuthenticated]
     # JWT 인증 방식 사용
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
 
 class CreateMixin :
     def post(self, request, model, serializer_class, name_field) :
@@ -61,42 +62,67 @@ class ListViewMixin :
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
 class UpdateMixin :
-    def put(self, request, pk_name, model, serializer_class, instance_id):
-        instance = get_object_or_404(model, pk=instance_id)
-        updated_any_field = False
-        
-        # name 필드 처리
-        name = request.data.get('name')
-        if name is not None:
-            instance.name = name
-            updated_any_field = True
+    # 수정 가능한 필드 (모델에 없는 필드는 무시)
+    update_fields = ('name', 'is_active', 'is_deleted')
 
-        # is_active 필드 처리
-        is_active = request.data.get('is_active')
-        if is_active is not None:
-            instance.is_active = is_active
-            updated_any_field = True
-        
-        # is_deleted 필드 처리
-        is_deleted = request.data.get('is_deleted')
-        if is_deleted is not None:
-            instance.is_deleted = is_deleted
-            updated_any_field = True
+    def put(self, request, pk_name, model, serializer_class, instance_id):
+        # 요청에 포함된 필드만 변경
+        changes = {}
+        for field_name in get_model_fields(model, self.update_fields) :
+            value = request.data.get(field_name)
+            if value is not None :
+                changes[field_name] = value
         
-        if not updated_any_field :
+        if not changes :
             return JsonResponse({
                 'message': '업데이트할 필드가 필요합니다.'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # 업데이트
-        instance.save()
+        # 업데이트 (조회 + 전체 행 save 대신, 변경된 컬럼만 UPDATE ... RETURNING 한 번)
+        try :
+            instance = update_returning(model, instance_id, changes)
+        except ValidationError as e :
+            return JsonResponse({
+                'message': f'업데이트 값이 올바르지 않습니다: {e}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if instance is None :
+            raise Http404(f'{model.__name__} 을(를) 찾을 수 없습니다.')
+
         serializer = serializer_class(instance)
         return JsonResponse({
             'message': '업데이트 성공', 
             'data': serializer.data
         }, status=status.HTTP_200_OK)
 
+class BatchUpdateMixin :
+    # 수정 가능한 필드 (모델에 없는 필드는 무시)
+    update_fields = ('name', 'is_active', 'is_deleted')
+
+    # items: [{"id": ..., "is_active": false}, {"id": ..., "is_deleted": true}, ...]
+    def patch(self, request, model) :
+        try :
+            parsed_items, results = parse_batch_items(model, request.data.get('items'), self.update_fields)
+        except ValueError as e :
+            return JsonResponse({
+                'message': f'업데이트 항목 확인 실패: {e}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # 변경 필드 조합별로 묶어 몇 번의 UPDATE 로 적용
+        if parsed_items :
+            results.update(batch_update_by_id(model, parsed_items))
+
+        updated_count = sum(1 for result in results.values() if result['status'] == 'updated')
+        return JsonResponse({
+            'message': '일괄 업데이트 완료',
+            'updated_count': updated_count,
+            'results': list(results.values()),
+        }, status=status.HTTP_200_OK)
+
 class UpdateAllMixin :
+    # 대상 필터로 사용할 수 있는 필드
+    filter_fields = ('is_active', 'is_deleted')
+
     def put(self, request, model) :
         update_fields = {}
 
@@ -115,8 +141,27 @@ class UpdateAllMixin :
                 'message': '업데이트할 필드가 필요합니다.'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # 업데이트
-        model.objects.all().update(**update_fields)
+        # 업데이트 대상 (ids / filters 가 없으면 전체)
+        try :
+            queryset = build_target_queryset(
+                model,
+                ids=request.data.get('ids'),
+                filters=request.data.get('filters'),
+                filter_fields=self.filter_fields,
+            )
+            batch_size = get_batch_size(request.data.get('batch_size'))
+        except (ValueError, ValidationError) as e :
+            return JsonResponse({
+                'message': f'업데이트 대상 확인 실패: {e}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # 기본 키 순서로 나누어 짧은 트랜잭션으로 업데이트
+        def print_progress(batch_count, updated_count) :
+            print(f'{model.__name__} 일괄 업데이트 진행: {batch_count}번째 배치, 누적 {updated_count}건')
+
+        result = update_in_batches(queryset, update_fields, batch_size, on_progress=print_progress)
         return JsonResponse({
-            'message': '업데이트 성공'
+            'message': '업데이트 성공',
+            'updated_count': result['updated_count'],
+            'batch_count': result['batch_count'],
         }, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -0,0 +1,76 @@
+import json
+import uuid
+import base64
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from game.models import SinglemodeSession, MultimodeSession
+
+
+# 검색 대상 세션 모델과 JSON 필드
+SEARCH_MODELS = {
+    'singlemode': SinglemodeSession,
+    'multimode': MultimodeSession,
+}
+SEARCH_FIELDS = ('choice_history', 'character_history')
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+# contains 파라미터 (JSON 객체/배열) 해석
+def parse_contains(value) :
+    if not value :
+        raise ValueError('contains 가 필요합니다.')
+    try :
+        contains = json.loads(value)
+    except json.JSONDecodeError as e :
+        raise ValueError(f'contains 는 JSON 이어야 합니다: {e}')
+    if not isinstance(contains, (dict, list)) :
+        raise ValueError('contains 는 JSON 객체 또는 배열이어야 합니다.')
+    return contains
+
+def get_page_size(value) :
+    if value in (None, '') :
+        return DEFAULT_PAGE_SIZE
+    try :
+        page_size = int(value)
+    except (TypeError, ValueError) :
+        raise ValueError('limit 은 정수여야 합니다.')
+    if page_size <= 0 :
+        raise ValueError('limit 은 1 이상이어야 합니다.')
+    return min(page_size, MAX_PAGE_SIZE)
+
+# 다음 페이지 커서 ((started_at, id) 를 URL 에 넣을 수 있는 문자열로)
+def encode_cursor(session) :
+    raw = f'{session.started_at.isoformat()}|{session.id}'
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor) :
+    try :
+        started_at, session_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|', 1)
+        started_at = parse_datetime(started_at)
+        session_id = uuid.UUID(session_id)
+    except (ValueError, UnicodeError) :
+        started_at = None
+    if started_at is None :
+        raise ValueError('cursor 가 올바르지 않습니다.')
+    return started_at, session_id
+
+# JSON 포함 검색 (PostgreSQL 에서는 jsonb @> 로 실행되어 GIN(jsonb_path_ops) 인덱스 사용)
+# started_at, id 역순 키셋 페이지네이션 (OFFSET 없이 다음 페이지 조회)
+def search_sessions(model, field, contains, cursor=None, page_size=DEFAULT_PAGE_SIZE, queryset=None) :
+    if field not in SEARCH_FIELDS :
+        raise ValueError(f"field 는 {', '.join(SEARCH_FIELDS)} 중 하나여야 합니다.")
+
+    sessions = (queryset if queryset is not None else model.objects.all()).filter(
+        **{f'{field}__contains': contains}
+    ).order_by('-started_at', '-id')
+
+    if cursor :
+        started_at, session_id = decode_cursor(cursor)
+        sessions = sessions.filter(Q(started_at__lt=started_at) | Q(started_at=started_at, id__lt=session_id))
+
+    # 한 건 더 조회하여 다음 페이지 존재 여부 확인
+    page = list(sessions[:page_size + 1])
+    next_cursor = encode_cursor(page[page_size - 1]) if len(page) > page_size else None
+    return page[:page_size], next_cursor
@@ -1,11 +1,14 @@
 from django.urls import path
-from user.views import UserListView, UserUpdateView, UserUpdateAllView, UserStorySessionListView, SinglemodeSessionListView, MultimodeSessionListView
+from user.views import UserListView, UserUpdateView, UserUpdateAllView, UserBatchUpdateView, UserStorySessionListView, SinglemodeSessionListView, MultimodeSessionListView, SessionHistorySearchView, SessionExportView
 
 urlpatterns = [
     path('list', UserListView.as_view(), name='list_users'),
     path('update/all', UserUpdateAllView.as_view(), name="update_all_users"),
+    path('update/batch', UserBatchUpdateView.as_view(), name="batch_update_users"),
     path('update/<str:user_id>', UserUpdateView.as_view(), name="update_users"),
     path('list/storymode/<str:user_id>', UserStorySessionListView.as_view(), name="list_users_storymode_infos"),
     path('list/singlemode/<str:user_id>', SinglemodeSessionListView.as_view(), name="list_users_singlemode_infos"),
     path('list/multimode/<str:user_id>', MultimodeSessionListView.as_view(), name="list_users_multimode_infos"),
+    path('search/sessions/<str:mode>', SessionHistorySearchView.as_view(), name="search_users_sessions"),
+    path('export/sessions/<str:mode>', SessionExportView.as_view(), name="export_users_sessions"),
 ]
\ No newline at end of file
@@ -1,12 +1,18 @@
 from rest_framework import status
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Count, Max
 from user.models import User
 from user.serializers import UserSerializer
-from user.mixins import AuthMixin, ListViewMixin, UpdateMixin, UpdateAllMixin
-from storymode.models import StorymodeSession
+from user.mixins import AuthMixin, ListViewMixin, UpdateMixin, UpdateAllMixin, BatchUpdateMixin
+from user.cache import get_or_build_session_data
+from user.export import EXPORT_TARGETS, EXPORT_FORMATS, build_export_queryset, iter_export_rows
+from user.session_search import SEARCH_MODELS, parse_contains, get_page_size, search_sessions
+from storymode.models import Story, StorymodeSession
+from storymode.graph import get_story_graphs
 from game.models import GameRoomSelectScenario, SinglemodeSession, MultimodeSession
+from game.cache import get_cache_key, get_version
 
 
 # 사용자 DB 조회
@@ -21,59 +27,34 @@ class UserUpdateView(AuthMixin, UpdateMixin) :
 
 # 사용자 DB 전체 업데이트
 class UserUpdateAllView(AuthMixin, UpdateAllMixin) :
+    # 소셜 타입, 가입일 범위, 상태로 대상 지정 가능 (예: {"social_type": "kakao", "joined_at__gte": "2025-01-01"})
+    filter_fields = ('social_type', 'joined_at', 'is_active', 'is_deleted')
+
     def put(self, request) :
         return super().put(request, User)
 
+# 사용자 DB 일괄 업데이트 (id 별 변경)
+class UserBatchUpdateView(AuthMixin, BatchUpdateMixin) :
+    def patch(self, request) :
+        return super().patch(request, User)
+
 # 사용자 스토리 세션 정보 조회
 class UserStorySessionListView(AuthMixin) :
     def get(self, request, user_id) :
         try :
-            user = get_object_or_404(User, id=user_id)
-            
-            sessions = StorymodeSession.objects.filter(user=user).select_related(
-                'story', 'current_moment'
-            ).prefetch_related(
-                'current_moment__choices__next_moment'
-            ).order_by('-updated_at')
-
-            sessions_data = []
-            for session in sessions:
-                moment = session.current_moment
-                choices_data = []
-
-                if moment:
-                    for choice in moment.choices.all():
-                        choices_data.append({
-                            'id': choice.id,
-                            'action_type': choice.action_type,
-                            'next_moment': {
-                                'id': choice.next_moment.id if choice.next_moment else None,
-                                'title': choice.next_moment.title if choice.next_moment else '스토리 종료',
-                            }
-                        })
-
-                session_detail_data = {
-                    'session_id': session.id,
-                    'story': {
-                        'id': session.story.id,
-                        'title': session.story.title,
-                        'image_path': session.story.image_path if session.story.image_path else None,
-                    },
-                    'current_moment': {
-                        'id': moment.id if moment else None,
-                        'title': moment.title if moment else '스토리 시작 전',
-                        'description': moment.description if moment else '현재 진행중인 분기점이 없습니다.',
-                        'is_ending': moment.is_ending() if moment else False,
-                        'choices': choices_data,
-                    },
-                    'progress': session.get_progress_percentage(),
-                    'status': session.status,
-                    'history': session.history,
-                    'start_at': session.start_at.isoformat() if session.start_at else None,
-                    'end_at': session.end_at.isoformat() if session.end_at else None,
-                    'updated_at': session.updated_at.isoformat() if session.updated_at else None,
-                }
-                sessions_data.append(session_detail_data)
+            # 세션 변경 여부 확인 (updated_at/end_at 워터마크)
+            watermark = StorymodeSession.objects.filter(user_id=user_id).aggregate(
+                session_count=Count('id'),
+                last_updated_at=Max('updated_at'),
+                last_end_at=Max('end_at'),
+            )
+            # 응답에 스토리/분기점/선택지/진행률이 포함되므로 스토리 캐시 버전도 함께 비교
+            watermark['story_version'] = get_version(get_cache_key(Story))
+
+            sessions_data = get_or_build_session_data(
+                'storymode', user_id, request.GET, watermark,
+                lambda : self._build_sessions_data(user_id)
+            )
             
             return JsonResponse({
                 'message' : '스토리 세션 정보 조회 성공',
@@ -84,6 +65,61 @@ class UserStorySessionListView(AuthMixin) :
                 'message': f'스토리 세션 정보를 불러오는 중 오류가 발생했습니다: {e}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    # 스토리 세션 응답 데이터 생성
+    def _build_sessions_data(self, user_id) :
+        user = get_object_or_404(User, id=user_id)
+        
+        sessions = StorymodeSession.objects.filter(user=user).select_related(
+            'story', 'current_moment'
+        ).prefetch_related(
+            'current_moment__choices__next_moment'
+        ).order_by('-updated_at')
+
+        # 스토리별 그래프 인덱스를 한 번에 조회 (세션마다 분기점 수/선택지 조회를 하지 않도록)
+        graphs = get_story_graphs(session.story_id for session in sessions)
+
+        sessions_data = []
+        for session in sessions:
+            moment = session.current_moment
+            graph = graphs.get(session.story_id)
+            choices_data = []
+
+            if moment:
+                for choice in moment.choices.all():
+                    choices_data.append({
+                        'id': choice.id,
+                        'action_type': choice.action_type,
+                        'next_moment': {
+                            'id': choice.next_moment.id if choice.next_moment else None,
+                            'title': choice.next_moment.title if choice.next_moment else '스토리 종료',
+                        }
+                    })
+
+            session_detail_data = {
+                'session_id': session.id,
+                'story': {
+                    'id': session.story.id,
+                    'title': session.story.title,
+                    'image_path': session.story.image_path if session.story.image_path else None,
+                },
+                'current_moment': {
+                    'id': moment.id if moment else None,
+                    'title': moment.title if moment else '스토리 시작 전',
+                    'description': moment.description if moment else '현재 진행중인 분기점이 없습니다.',
+                    'is_ending': (graph.is_ending(moment.id) if graph else moment.is_ending()) if moment else False,
+                    'choices': choices_data,
+                },
+                'progress': session.get_progress_percentage(graph),
+                'status': session.status,
+                'history': session.history,
+                'start_at': session.start_at.isoformat() if session.start_at else None,
+                'end_at': session.end_at.isoformat() if session.end_at else None,
+                'updated_at': session.updated_at.isoformat() if session.updated_at else None,
+            }
+            sessions_data.append(session_detail_data)
+
+        return sessions_data
+
 # 싱글/멀티모드 게임 세션 공통 로직 View
 class BaseGameView(AuthMixin) :
     def _serialize_user_data(self, user) :
@@ -147,6 +183,15 @@ class BaseGameView(AuthMixin) :
         })
         return common_data
 
+    # 세션 변경 여부 확인 (started_at/ended_at 워터마크)
+    def _get_sessions_watermark(self, session_model, user_id) :
+        return session_model.objects.filter(user_id=user_id).aggregate(
+            session_count=Count('id'),
+            finished_count=Count('ended_at'),
+            last_started_at=Max('started_at'),
+            last_ended_at=Max('ended_at'),
+        )
+
     # 멀티모드 세션 데이터 직렬화
     def _serialize_multimode_session_data(self, session) :
         common_data = self._serialize_common_session_fields(session)
@@ -188,13 +233,11 @@ class BaseGameView(AuthMixin) :
 class SinglemodeSessionListView(BaseGameView) :
     def get(self, request, user_id) :
         try:
-            user = get_object_or_404(User, id=user_id)
-
-            sessions = SinglemodeSession.objects.filter(user=user).select_related(
-                'user', 'scenario', 'character', 'genre', 'difficulty', 'mode'
-            ).order_by('-started_at')
-
-            sessions_data = [self._serialize_session_data(session) for session in sessions]
+            watermark = self._get_sessions_watermark(SinglemodeSession, user_id)
+            sessions_data = get_or_build_session_data(
+                'singlemode', user_id, request.GET, watermark,
+                lambda : self._build_sessions_data(user_id)
+            )
 
             return JsonResponse({
                 'message': '싱글모드 세션 정보 조회 성공',
@@ -205,17 +248,25 @@ class SinglemodeSessionListView(BaseGameView) :
                 'message': f'싱글모드 세션 정보를 불러오는 중 오류가 발생했습니다: {e}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    # 싱글모드 세션 응답 데이터 생성
+    def _build_sessions_data(self, user_id) :
+        user = get_object_or_404(User, id=user_id)
+
+        sessions = SinglemodeSession.objects.filter(user=user).select_related(
+            'user', 'scenario', 'character', 'genre', 'difficulty', 'mode'
+        ).order_by('-started_at')
+
+        return [self._serialize_session_data(session) for session in sessions]
+
 # 사용자 멀티모드 세션 정보 조회
 class MultimodeSessionListView(BaseGameView) :
     def get(self, request, user_id) :
         try:
-            user = get_object_or_404(User, id=user_id)
-
-            sessions = MultimodeSession.objects.filter(user=user).select_related(
-                'user', 'gameroom', 'scenario', 'character'
-            ).order_by('-started_at')
-
-            sessions_data = [self._serialize_multimode_session_data(session) for session in sessions]
+            watermark = self._get_sessions_watermark(MultimodeSession, user_id)
+            sessions_data = get_or_build_session_data(
+                'multimode', user_id, request.GET, watermark,
+                lambda : self._build_sessions_data(user_id)
+            )
 
             return JsonResponse({
                 'message': '멀티모드 세션 정보 조회 성공',
@@ -224,4 +275,90 @@ class MultimodeSessionListView(BaseGameView) :
         except Exception as e:
             return JsonResponse({
                 'message': f'멀티모드 세션 정보를 불러오는 중 오류가 발생했습니다: {e}'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    # 멀티모드 세션 응답 데이터 생성
+    def _build_sessions_data(self, user_id) :
+        user = get_object_or_404(User, id=user_id)
+
+        sessions = MultimodeSession.objects.filter(user=user).select_related(
+            'user', 'gameroom', 'scenario', 'character'
+        ).order_by('-started_at')
+
+        return [self._serialize_multimode_session_data(session) for session in sessions]
+
+# 싱글/멀티모드 세션 choice_history / character_history JSON 포함 검색
+# 예: ?field=character_history&contains={"items": ["sword"]}&limit=50&cursor=...
+class SessionHistorySearchView(BaseGameView) :
+    def get(self, request, mode) :
+        model = SEARCH_MODELS.get(mode)
+        if model is None :
+            return JsonResponse({
+                'message': f"mode 는 {', '.join(SEARCH_MODELS)} 중 하나여야 합니다."
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        try :
+            contains = parse_contains(request.GET.get('contains'))
+            page_size = get_page_size(request.GET.get('limit'))
+            if model is SinglemodeSession :
+                queryset = model.objects.select_related('user', 'scenario', 'character', 'genre', 'difficulty', 'mode')
+                serialize = self._serialize_session_data
+            else :
+                queryset = model.objects.select_related('user', 'gameroom', 'gameroom__owner', 'scenario', 'character')
+                serialize = self._serialize_multimode_session_data
+
+            sessions, next_cursor = search_sessions(
+                model,
+                request.GET.get('field', 'choice_history'),
+                contains,
+                cursor=request.GET.get('cursor'),
+                page_size=page_size,
+                queryset=queryset,
+            )
+            return JsonResponse({
+                'message': '세션 검색 성공',
+                'sessions': [serialize(session) for session in sessions],
+                'next_cursor': next_cursor,
+            }, status=status.HTTP_200_OK)
+        except ValueError as e :
+            return JsonResponse({
+                'message': f'검색 조건이 올바르지 않습니다: {e}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e :
+            return JsonResponse({
+                'message': f'세션 검색 중 오류가 발생했습니다: {e}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# 세션 내보내기 (CSV / NDJSON 스트리밍)
+# 예: ?file_format=ndjson&from=2026-01-01&to=2026-01-31&story_id=...
+class SessionExportView(AuthMixin) :
+    def get(self, request, mode) :
+        target = EXPORT_TARGETS.get(mode)
+        if target is None :
+            return JsonResponse({
+                'message': f"mode 는 {', '.join(EXPORT_TARGETS)} 중 하나여야 합니다."
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        # format 은 DRF 응답 형식 선택 파라미터와 겹치므로 file_format 사용
+        export_format = request.GET.get('file_format', 'csv')
+        if export_format not in EXPORT_FORMATS :
+            return JsonResponse({
+                'message': f"file_format 은 {', '.join(EXPORT_FORMATS)} 중 하나여야 합니다."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try :
+            queryset = build_export_queryset(target, request.GET)
+        except ValueError as e :
+            return JsonResponse({
+                'message': f'내보내기 조건이 올바르지 않습니다: {e}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # 전체 결과를 메모리에 올리지 않고 서버 측 커서로 읽은 만큼 바로 전송
+        response = StreamingHttpResponse(
+            iter_export_rows(target, queryset, export_format),
+            content_type=EXPORT_FORMATS[export_format],
+        )
+        response['Content-Disposition'] = f'attachment; filename="{mode}_sessions.{export_format}"'
+        # nginx 가 응답 전체를 버퍼링하지 않도록
+        response['X-Accel-Buffering'] = 'no'
+        return response